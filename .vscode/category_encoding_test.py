@@ -0,0 +1,108 @@
+import os
+import sys
+
+import numpy
+import pandas
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from category_encoding import UNKNOWN_CODE, CategoryEncoder, DatasetEncoder, UnknownCategory, loadEncoded, readEncoded
+
+NATIONALITY = {"UK": 0, "USA": 1, "N": 2}
+GO = {"YES": 1, "NO": 0}
+
+CSV = """Age,Nationality,Name,Go
+36,UK,Ann,NO
+42,USA,,NO
+23,N,Bob,NO
+52,UK,Cy,YES
+"""
+
+
+def _writeCsv(tmp_path, text=CSV):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return str(path)
+
+
+class TestCategoryEncoder:
+
+    def test_matches_dict_map(self):
+        values = pandas.Series(["UK", "USA", "N", "UK"])
+        codes = CategoryEncoder(NATIONALITY).encode(values)
+        assert codes.dtype == numpy.int8
+        assert (codes == values.map(NATIONALITY).to_numpy()).all()
+
+    def test_categorical_input(self):
+        values = pandas.Series(["N", "UK", "N"], dtype="category")
+        assert CategoryEncoder(NATIONALITY).encode(values).tolist() == [2, 0, 2]
+
+    def test_unknown_policies(self):
+        with pytest.raises(UnknownCategory) as exc_info:
+            CategoryEncoder(NATIONALITY).encode(["UK", "FR"])
+        assert "FR" in str(exc_info)
+        assert CategoryEncoder(NATIONALITY, unknown="code").encode(["FR", None]).tolist() == [UNKNOWN_CODE, UNKNOWN_CODE]
+        learner = CategoryEncoder(NATIONALITY, unknown="learn")
+        assert learner.encode(["FR", "UK", None]).tolist() == [3, 0, UNKNOWN_CODE]
+        assert learner.table()["FR"] == 3
+
+    def test_decode_round_trip(self):
+        encoder = CategoryEncoder(NATIONALITY, unknown="code")
+        assert encoder.decode(encoder.encode(["USA", "FR", "N"])).tolist() == ["USA", None, "N"]
+
+    def test_codes_must_be_contiguous(self):
+        with pytest.raises(Exception) as exc_info:
+            CategoryEncoder({"UK": 0, "USA": 2})
+        assert "Codes must run" in str(exc_info)
+
+
+class TestDatasetEncoder:
+
+    def test_save_and_load(self, tmp_path):
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        encoder.save(str(tmp_path / "tables.json"))
+        loaded = DatasetEncoder.load(str(tmp_path / "tables.json"))
+        assert loaded.fingerprint() == encoder.fingerprint()
+
+    def test_read_in_chunks(self, tmp_path):
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        chunks = list(readEncoded(_writeCsv(tmp_path), encoder, chunkSize=3))
+        df = pandas.concat(chunks)
+        assert df["Nationality"].tolist() == [0, 1, 2, 0]
+        assert df["Go"].tolist() == [0, 0, 0, 1]
+
+
+class TestLoadEncoded:
+
+    def test_cache_reload_matches_first_load(self, tmp_path):
+        path = _writeCsv(tmp_path)
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        first = loadEncoded(path, encoder)
+        assert os.path.exists(path + ".encoded.npz")
+        second = loadEncoded(path, encoder)
+        assert second["Nationality"].tolist() == first["Nationality"].tolist()
+        assert second["Age"].tolist() == first["Age"].tolist()
+
+    def test_missing_text_stays_missing(self, tmp_path):
+        path = _writeCsv(tmp_path)
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        loadEncoded(path, encoder)
+        cached = loadEncoded(path, encoder)
+        assert cached["Name"].isna().tolist() == [False, True, False, False]
+        assert cached["Name"][0] == "Ann"
+
+    def test_changed_csv_rebuilds_cache(self, tmp_path):
+        path = _writeCsv(tmp_path)
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        loadEncoded(path, encoder)
+        _writeCsv(tmp_path, CSV + "18,USA,Dee,YES\n")
+        assert len(loadEncoded(path, encoder)) == 5
+
+    def test_read_options_are_part_of_the_key(self, tmp_path):
+        path = _writeCsv(tmp_path)
+        encoder = DatasetEncoder({"Nationality": NATIONALITY, "Go": GO})
+        assert len(loadEncoded(path, encoder).columns) == 4
+        assert loadEncoded(path, encoder, usecols=["Nationality", "Go"]).columns.tolist() == ["Nationality", "Go"]
+        assert loadEncoded(path, encoder, dtype={"Age": "float64"})["Age"].dtype == numpy.float64
+        assert loadEncoded(path, encoder, dtype={"Age": "float64"})["Age"].dtype == numpy.float64
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from compiled_tree import CompiledTree
+
+
+def _fitted(classes=3, seed=0, **options):
+    X, y = make_classification(2000, 6, n_informative=4, n_classes=classes, random_state=seed)
+    return DecisionTreeClassifier(random_state=seed, **options).fit(X, y), X
+
+
+class TestCompiledTree:
+
+    def test_matches_sklearn(self):
+        dtree, X = _fitted()
+        compiled = CompiledTree.fromSklearn(dtree)
+        rows = numpy.random.default_rng(1).normal(0.0, 2.0, (5000, 6))
+        for data in (X, rows):
+            assert (compiled.apply(data) == dtree.apply(data)).all()
+            assert (compiled.predict(data) == dtree.predict(data)).all()
+            assert numpy.allclose(compiled.predictProba(data), dtree.predict_proba(data))
+        assert compiled.depth == dtree.get_depth()
+
+    def test_values_on_thresholds(self):
+        # Rows sitting exactly on a split, and float64 values that only differ from it below float32 precision
+        dtree, X = _fitted(classes=2, seed=2, max_depth=5)
+        compiled = CompiledTree.fromSklearn(dtree)
+        inner = dtree.tree_.feature >= 0
+        rows = numpy.tile(X[:len(dtree.tree_.threshold[inner])], (3, 1)).astype(numpy.float64)
+        thresholds = dtree.tree_.threshold[inner]
+        for copy, offset in enumerate((0.0, 1e-9, -1e-9)):
+            block = rows[copy * len(thresholds):(copy + 1) * len(thresholds)]
+            block[numpy.arange(len(thresholds)), dtree.tree_.feature[inner]] = thresholds + offset
+        assert (compiled.predict(rows) == dtree.predict(rows)).all()
+
+    def test_string_classes_chunks_and_save(self, tmp_path):
+        X, y = make_classification(500, 4, random_state=3)
+        labels = numpy.array(["NO", "YES"])[y]
+        dtree = DecisionTreeClassifier(random_state=3).fit(X, labels)
+        compiled = CompiledTree.fromSklearn(dtree)
+        compiled.save(str(tmp_path / "tree.npz"))
+        loaded = CompiledTree.load(str(tmp_path / "tree.npz"))
+        assert (loaded.predict(X, chunkSize=37) == dtree.predict(X)).all()
+        assert loaded.predict([[40, 10, 6, 1]])[0] in ("NO", "YES")
+
+    def test_single_leaf_and_bad_input(self):
+        dtree = DecisionTreeClassifier().fit([[1.0], [2.0]], [1, 1])
+        compiled = CompiledTree.fromSklearn(dtree)
+        assert compiled.depth == 0 and compiled.predict([[0.0], [5.0]]).tolist() == [1, 1]
+        with pytest.raises(Exception) as exc_info:
+            compiled.predict([1.0, 2.0])
+        assert "X must be 2-D" in str(exc_info)
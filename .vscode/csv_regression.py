@@ -0,0 +1,134 @@
+# Chunked CSV Regression
+
+# w3school_pythonmultipleregression.py and w3school_pythonscale.py load the whole of data.csv with pandas.read_csv()
+# before fitting LinearRegression on Weight and Volume -> CO2. Real car-emission files are tens of GB.
+# fitCsv() reads only the needed columns, with fixed dtypes, a chunk at a time, and folds each chunk into the
+# normal equations (X^T X and X^T y) so memory stays the size of one chunk however big the file is.
+# The sums are kept around the running column means (the same centring LinearRegression does before solving),
+# which keeps them accurate on large values and makes two partial results exactly mergeable.
+
+# E.g.
+"""
+from csv_regression import fitCsv
+
+regr = fitCsv("data.csv", ["Weight", "Volume"], "CO2", chunkSize=100000)
+
+print(regr.coef_, regr.intercept_)
+print(regr.predict([[3300, 1300]]))
+"""
+
+import numpy
+import pandas
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class NormalEquations:
+    """
+    NormalEquations(featureCount) -> Running count, column means and centred cross products of [X | y]
+
+    The centred cross-product matrix holds (X - mean)^T (X - mean) in its top-left block and (X - mean)^T (y - mean) in its last column.
+    """
+
+    def __init__(self, featureCount):
+        self.featureCount = featureCount
+        self.n = 0
+        self.mean = numpy.zeros(featureCount + 1)
+        self.crossProducts = numpy.zeros((featureCount + 1, featureCount + 1))
+
+    def update(self, X, y):
+        """
+        update(X, y) -> Folds a chunk of rows into the sums and returns self
+        """
+        data = numpy.column_stack((numpy.asarray(X, dtype=numpy.float64), numpy.asarray(y, dtype=numpy.float64)))
+        if data.shape[1] != self.featureCount + 1:
+            raise Exception("Expected {} feature columns, got {}".format(self.featureCount, data.shape[1] - 1))
+        if numpy.isnan(data).any():
+            raise Exception("Chunk contains missing values")
+        if len(data) == 0:
+            return self
+
+        chunk = NormalEquations(self.featureCount)
+        chunk.n = len(data)
+        chunk.mean = data.mean(axis=0)
+        centred = data - chunk.mean
+        chunk.crossProducts = centred.T @ centred
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        merge(other) -> Adds the sums of another NormalEquations (e.g. from another file or process) and returns self
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.crossProducts = other.n, other.mean.copy(), other.crossProducts.copy()
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.crossProducts += other.crossProducts + numpy.outer(delta, delta) * (self.n * other.n / n)
+        self.mean += delta * (other.n / n)
+        self.n = n
+        return self
+
+    def solve(self):
+        """
+        solve() -> (coefficients, intercept) of the least squares fit
+        """
+        if self.n <= self.featureCount:
+            raise Exception("Need more than {} rows to fit {} features, got {}".format(self.featureCount, self.featureCount, self.n))
+        xx = self.crossProducts[:-1, :-1]
+        xy = self.crossProducts[:-1, -1]
+        # lstsq rather than solve so collinear columns give the minimum-norm answer, as LinearRegression does
+        coef = numpy.linalg.lstsq(xx, xy, rcond=None)[0]
+        intercept = self.mean[-1] - self.mean[:-1] @ coef
+        return coef, float(intercept)
+
+
+class StreamingLinearRegression:
+    """
+    Fitted model with the same coef_, intercept_ and predict() as sklearn's LinearRegression.
+    """
+
+    def __init__(self, coef, intercept, features, rows):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.features = list(features)
+        self.rows = rows
+
+    def predict(self, X):
+        if isinstance(X, pandas.DataFrame):
+            X = X[self.features]
+        return numpy.asarray(X, dtype=numpy.float64) @ self.coef_ + self.intercept_
+
+
+def readChunks(path, features, target, chunkSize=DEFAULT_CHUNK_SIZE, dtype=numpy.float64):
+    """
+    readChunks(path, features, target, chunkSize=100000, dtype=float64) -> Yields (X, y) NumPy arrays of at most chunkSize rows
+
+    Only the feature and target columns are parsed, and they are parsed straight into dtype.
+    """
+    columns = list(features) + [target]
+    reader = pandas.read_csv(path, usecols=columns, dtype={c: dtype for c in columns}, chunksize=chunkSize)
+    with reader:
+        for chunk in reader:
+            yield chunk[list(features)].to_numpy(), chunk[target].to_numpy()
+
+
+def fitCsv(path, features, target, chunkSize=DEFAULT_CHUNK_SIZE, dtype=numpy.float64):
+    """
+    fitCsv(path, features, target, chunkSize=100000, dtype=float64) -> StreamingLinearRegression fitted chunk by chunk
+
+    Parameters:
+    path: The CSV file (or a list of files, whose sums are merged)
+    features: Names of the independent columns, e.g. ["Weight", "Volume"]
+    target: Name of the dependent column, e.g. "CO2"
+    chunkSize: Rows parsed at a time; memory use is proportional to this, not to the file size
+    """
+    paths = [path] if isinstance(path, str) else list(path)
+    equations = NormalEquations(len(features))
+    for p in paths:
+        for X, y in readChunks(p, features, target, chunkSize, dtype):
+            equations.update(X, y)
+    coef, intercept = equations.solve()
+    return StreamingLinearRegression(coef, intercept, features, equations.n)
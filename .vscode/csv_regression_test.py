@@ -0,0 +1,66 @@
+import numpy
+import pandas
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from csv_regression import NormalEquations, fitCsv
+
+
+def _cars(rows=1000, seed=0):
+    rng = numpy.random.default_rng(seed)
+    df = pandas.DataFrame({"Car": ["Toyota"] * rows, "Volume": rng.integers(900, 2500, rows).astype(float),
+                           "Weight": rng.integers(790, 1750, rows).astype(float)})
+    df["CO2"] = 79.7 + 0.0078 * df["Weight"] + 0.0078 * df["Volume"] + rng.normal(0.0, 5.0, rows)
+    return df
+
+
+def _writeCsv(tmp_path, df, name="data.csv"):
+    path = str(tmp_path / name)
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestFitCsv:
+
+    def test_matches_linear_regression(self, tmp_path):
+        df = _cars()
+        reference = LinearRegression().fit(df[["Weight", "Volume"]], df["CO2"])
+        regr = fitCsv(_writeCsv(tmp_path, df), ["Weight", "Volume"], "CO2", chunkSize=77)
+        assert numpy.allclose(regr.coef_, reference.coef_) and numpy.isclose(regr.intercept_, reference.intercept_)
+        assert regr.rows == len(df)
+        assert numpy.allclose(regr.predict([[3300, 1300]]), reference.predict(pandas.DataFrame([[3300, 1300]], columns=["Weight", "Volume"])))
+        assert numpy.allclose(regr.predict(df), reference.predict(df[["Weight", "Volume"]]))
+
+    def test_several_files(self, tmp_path):
+        df = _cars(seed=1)
+        paths = [_writeCsv(tmp_path, df[:300], "a.csv"), _writeCsv(tmp_path, df[300:], "b.csv")]
+        reference = LinearRegression().fit(df[["Weight", "Volume"]], df["CO2"])
+        regr = fitCsv(paths, ["Weight", "Volume"], "CO2", chunkSize=128)
+        assert numpy.allclose(regr.coef_, reference.coef_) and numpy.isclose(regr.intercept_, reference.intercept_)
+
+    def test_missing_values_rejected(self, tmp_path):
+        df = _cars(rows=10)
+        df.loc[4, "Weight"] = numpy.nan
+        with pytest.raises(Exception) as exc_info:
+            fitCsv(_writeCsv(tmp_path, df), ["Weight", "Volume"], "CO2")
+        assert "missing values" in str(exc_info)
+
+
+class TestNormalEquations:
+
+    def test_large_values_and_collinear_columns(self):
+        rng = numpy.random.default_rng(2)
+        X = 1e6 + rng.normal(0.0, 10.0, (500, 2))
+        X = numpy.column_stack((X, X[:, 0]))    # third column repeats the first
+        y = X[:, :2] @ [2.0, -1.0] + rng.normal(0.0, 1.0, 500)
+        equations = NormalEquations(3)
+        for part in numpy.array_split(numpy.arange(500), 9):
+            equations.update(X[part], y[part])
+        coef, intercept = equations.solve()
+        reference = LinearRegression().fit(X, y)
+        assert numpy.allclose(coef, reference.coef_, atol=1e-6) and numpy.isclose(intercept, reference.intercept_)
+
+    def test_too_few_rows(self):
+        with pytest.raises(Exception) as exc_info:
+            NormalEquations(2).update([[1.0, 2.0], [3.0, 4.0]], [1.0, 2.0]).solve()
+        assert "Need more than 2 rows" in str(exc_info)
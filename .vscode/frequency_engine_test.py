@@ -0,0 +1,101 @@
+import os
+import sys
+from collections import Counter
+
+import numpy
+import pytest
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frequency_engine import ExactCounter, FrequencySketch, mode, topK
+
+
+def _expectedTop(data, k):
+    counts = Counter(numpy.asarray(data).tolist())
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class TestExactCounter:
+
+    def test_mode_matches_scipy(self):
+        speed = [99, 86, 87, 88, 111, 86, 103, 87, 94, 78, 77, 85, 86]
+        reference = stats.mode(speed, keepdims=True)
+        assert mode(speed) == (reference.mode[0], reference.count[0])
+
+    def test_ties_go_to_smaller_value(self):
+        assert mode([3, 3, 1, 1, 2]) == (1, 2)
+
+    def test_integers_counted(self):
+        data = numpy.random.default_rng(0).binomial(100, 0.4, 20000)
+        assert topK(data, 10, chunkSize=999) == _expectedTop(data, 10)
+
+    def test_floats_and_strings(self):
+        floats = numpy.round(numpy.random.default_rng(1).normal(0.0, 1.0, 5000), 1)
+        assert topK(floats, 5, chunkSize=777) == _expectedTop(floats, 5)
+        words = numpy.array(["b", "a", "c", "a", "b", "a"])
+        assert topK(words, 2) == [("a", 3), ("b", 2)]
+
+    def test_switch_from_counting_to_distinct(self):
+        counter = ExactCounter(countingRange=100)
+        counter.update([1, 2, 2, 3])
+        counter.update([10 ** 6, 2])
+        counter.update([2.5])
+        assert counter.n == 7
+        assert counter.topK(2) == [(2, 3), (1, 1)]
+        assert counter.count(10 ** 6) == 1 and counter.count(7) == 0
+
+    def test_merge(self):
+        rng = numpy.random.default_rng(2)
+        left, right = rng.integers(0, 50, 3000), rng.integers(-20, 30, 3000)
+        merged = ExactCounter().update(left).merge(ExactCounter().update(right))
+        assert merged.topK(10) == _expectedTop(numpy.concatenate((left, right)), 10)
+        floats = ExactCounter().update(right.astype(numpy.float64))
+        assert ExactCounter().update(left).merge(floats).topK(10) == _expectedTop(numpy.concatenate((left, right)), 10)
+
+    def test_booleans_stay_booleans(self):
+        assert mode([True, True, False]) == (True, 2)
+        counter = ExactCounter().update(numpy.array([False, True, False])).merge(ExactCounter().update([True]))
+        assert counter.topK(2) == [(False, 2), (True, 2)]
+        assert isinstance(counter.mode()[0], bool)
+
+    def test_mixed_kinds_rejected(self):
+        counter = ExactCounter().update([1, 2, 2])
+        with pytest.raises(Exception) as exc_info:
+            counter.update(numpy.array(["a", "a", "a"]))
+        assert "string values together with the numeric" in str(exc_info)
+        assert counter.count(2) == 2
+        with pytest.raises(Exception):
+            ExactCounter().update([True]).merge(ExactCounter().update([1]))
+        assert ExactCounter().update([1, 2]).update([2.0, 0.5]).count(2) == 2
+
+
+class TestFrequencySketch:
+
+    def test_heavy_hitters_found(self):
+        rng = numpy.random.default_rng(3)
+        data = numpy.concatenate((numpy.repeat(numpy.arange(5), 2000), rng.integers(100, 10 ** 6, 50000)))
+        rng.shuffle(data)
+        sketch = FrequencySketch(capacity=100)
+        for chunk in numpy.array_split(data, 20):
+            sketch.update(chunk)
+        top = sketch.topK(5)
+        assert sorted(value for value, upper, lower in top) == [0, 1, 2, 3, 4]
+        assert all(lower <= 2000 <= upper for value, upper, lower in top)
+
+    def test_estimate_is_upper_bound(self):
+        data = numpy.random.default_rng(4).zipf(1.5, 20000)
+        sketch = FrequencySketch(capacity=50, width=1024).update(data)
+        values, counts = numpy.unique(data, return_counts=True)
+        assert (sketch.estimate(values) >= counts).all()
+
+    def test_merge_and_state(self):
+        rng = numpy.random.default_rng(5)
+        shards = [rng.zipf(1.8, 10000) for _ in range(3)]
+        sketches = [FrequencySketch.fromState(FrequencySketch(capacity=50).update(shard).state()) for shard in shards]
+        total = sketches[0]
+        for sketch in sketches[1:]:
+            total.merge(sketch)
+        data = numpy.concatenate(shards)
+        assert total.n == len(data)
+        assert total.mode()[0] == mode(data)[0]
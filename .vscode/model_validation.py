@@ -0,0 +1,238 @@
+# Model Validation - Train/Test Splits and Cross Validation
+
+# w3school_pythontraintest.py splits its 100 points with x[:80] and x[80:] and scores the model once.
+# The splitters here hand out index arrays instead of copies of the data: a single shuffled train/test split,
+# k-fold, and stratified k-fold (by class label, or by quantile bins of a continuous target).
+# crossValidate() fits and scores the folds in parallel worker processes. The folds of kFold() and stratifiedKFold()
+# are one permutation of the rows cut at k bounds (a FoldPlan). x and y are copied into shared memory once, in that
+# order and written out twice; every fold's test rows are then one contiguous slice, and its training rows (the rows
+# after the fold followed by the rows before it) another. Workers are sent only a fold's start and stop and hand
+# fitScore views of the shared buffers, so no fold copies the data - the cost is twice the data, once, in shared memory.
+# Other iterables of index arrays still work, but each fold then gathers its own copy of its rows.
+# All shuffling is seeded (seed=2 by default, as numpy.random.seed(2) in the tutorial), and each fold gets its own
+# child seed from numpy.random.SeedSequence, so results do not depend on how many workers run them.
+
+# E.g.
+"""
+from functools import partial
+from model_validation import trainTestSplit, kFold, crossValidate, polynomialR2
+
+train, test = trainTestSplit(len(x), testFraction=0.2)
+mymodel = numpy.poly1d(numpy.polyfit(x[train], y[train], 4))
+
+scores = crossValidate(partial(polynomialR2, 4), x, y, kFold(len(x), k=5, shuffle=True), processes=4)
+print(scores.mean())
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from shared_array import DEFAULT_SEED, SharedArray
+
+
+def trainTestSplit(n, testFraction=0.2, shuffle=True, seed=DEFAULT_SEED):
+    """
+    trainTestSplit(n, testFraction=0.2, shuffle=True, seed=2) -> (train indices, test indices) for n rows
+
+    With shuffle=False this is the tutorial's split: the first 80% train, the rest test.
+    """
+    testSize = int(round(n * testFraction))
+    if not 0 < testSize < n:
+        raise Exception("testFraction {} leaves an empty train or test set for {} rows".format(testFraction, n))
+    order = numpy.random.default_rng(seed).permutation(n) if shuffle else numpy.arange(n)
+    return order[:n - testSize], order[n - testSize:]
+
+
+class FoldPlan:
+    """
+    FoldPlan(order, bounds) -> k folds of n rows as one permutation; fold i tests the rows order[bounds[i]:bounds[i + 1]]
+    and trains on the rest. Iterating gives (train indices, test indices) for each fold.
+    """
+
+    def __init__(self, order, bounds):
+        self.order = numpy.asarray(order, dtype=numpy.int64)
+        self.bounds = numpy.asarray(bounds, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def __iter__(self):
+        for start, stop in zip(self.bounds[:-1], self.bounds[1:]):
+            yield _foldIndices(self.order, start, stop)
+
+
+def kFold(n, k=5, shuffle=False, seed=DEFAULT_SEED):
+    """
+    kFold(n, k=5, shuffle=False, seed=2) -> FoldPlan giving (train indices, test indices) for each of k folds of n rows
+    """
+    if not 2 <= k <= n:
+        raise Exception("k must be between 2 and the number of rows, got {}".format(k))
+    order = numpy.random.default_rng(seed).permutation(n) if shuffle else numpy.arange(n)
+    return FoldPlan(order, numpy.linspace(0, n, k + 1).astype(numpy.int64))
+
+
+def stratifiedKFold(labels, k=5, shuffle=True, seed=DEFAULT_SEED, bins=None):
+    """
+    stratifiedKFold(labels, k=5, shuffle=True, seed=2, bins=None) -> FoldPlan giving (train indices, test indices) with
+    every class spread evenly over the folds
+
+    Parameters:
+    labels: Class label per row, or a continuous target when bins is given
+    bins: Number of quantile bins to stratify a continuous target by
+    """
+    labels = numpy.asarray(labels)
+    if bins is not None:
+        edges = numpy.quantile(labels, numpy.linspace(0, 1, bins + 1)[1:-1])
+        labels = numpy.searchsorted(edges, labels, side="right")
+
+    rng = numpy.random.default_rng(seed)
+    # Deal each class out to the folds in turn, so fold sizes per class differ by at most one
+    fold = numpy.empty(len(labels), dtype=numpy.int64)
+    offset = 0
+    classes, inverse = numpy.unique(labels, return_inverse=True)
+    for c in range(len(classes)):
+        members = numpy.flatnonzero(inverse == c)
+        if shuffle:
+            members = rng.permutation(members)
+        fold[members] = (offset + numpy.arange(len(members))) % k
+        offset += len(members)
+
+    sizes = numpy.bincount(fold, minlength=k)
+    if (sizes == 0).any():
+        raise Exception("Fold {} is empty, use fewer folds".format(int(numpy.argmin(sizes))))
+    # Rows grouped by fold, in row order within each fold
+    return FoldPlan(numpy.argsort(fold, kind="stable"), numpy.concatenate(([0], numpy.cumsum(sizes))))
+
+
+def crossValidate(fitScore, x, y, folds, processes=None, seed=DEFAULT_SEED):
+    """
+    crossValidate(fitScore, x, y, folds, processes=None, seed=2) -> NumPy array with one score per fold
+
+    Parameters:
+    fitScore: Function fitScore(xTrain, yTrain, xTest, yTest, rng) -> score; it must be defined at module level
+              (or be a functools.partial of one) so worker processes can load it. With a FoldPlan and processes the
+              arrays are views of shared memory, so fitScore must not change them in place.
+    x, y: The data set as arrays
+    folds: A FoldPlan from kFold() or stratifiedKFold(), or any iterable of (train indices, test indices)
+    processes: Number of worker processes, None to run the folds in this process
+    seed: Root seed; fold i gets a numpy Generator seeded with the i-th child of SeedSequence(seed)
+    """
+    if not isinstance(folds, FoldPlan):
+        folds = list(folds)
+    seeds = numpy.random.SeedSequence(seed).spawn(len(folds))
+    x = numpy.asarray(x)
+    y = numpy.asarray(y)
+
+    if processes is None:
+        return numpy.array([_scoreFold(fitScore, x, y, train, test, foldSeed) for (train, test), foldSeed in zip(folds, seeds)])
+
+    if isinstance(folds, FoldPlan):
+        # x and y in fold order, twice over; each job carries just its fold's bounds
+        shared = [_foldOrdered(x, folds.order), _foldOrdered(y, folds.order)]
+        descriptors = [array.descriptor() for array in shared]
+        arguments = [(start, stop) for start, stop in zip(folds.bounds[:-1], folds.bounds[1:])]
+        worker = _scorePlannedFold
+    else:
+        shared = [SharedArray.fromArray(x), SharedArray.fromArray(y)]
+        descriptors = [array.descriptor() for array in shared]
+        arguments = folds
+        worker = _scoreSharedFold
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            jobs = [pool.submit(worker, fitScore, *descriptors, first, second, foldSeed)
+                    for (first, second), foldSeed in zip(arguments, seeds)]
+            return numpy.array([job.result() for job in jobs])
+    finally:
+        for array in shared:
+            array.release()
+
+
+def polynomialR2(degree, xTrain, yTrain, xTest, yTest, rng=None):
+    """
+    polynomialR2(degree, xTrain, yTrain, xTest, yTest, rng=None) -> R-squared on the test set of a polynomial fitted to the train set
+    """
+    model = numpy.poly1d(numpy.polyfit(xTrain, yTrain, degree))
+    residual = ((yTest - model(xTest)) ** 2).sum()
+    total = ((yTest - yTest.mean()) ** 2).sum()
+    return 1.0 - residual / total
+
+
+def _foldIndices(order, start, stop):
+    # Training rows in the same order as the shared layout of _foldOrdered(), so both paths fit the same arrays
+    return numpy.concatenate((order[stop:], order[:start])), order[start:stop]
+
+
+def _foldOrdered(array, order):
+    # array[order] followed by array[order] again: the training rows of the fold order[start:stop] are then the
+    # contiguous rows stop .. n + start
+    n = len(order)
+    shared = SharedArray.empty((2 * n, ) + array.shape[1:], array.dtype)
+    numpy.take(array, order, axis=0, out=shared.array[:n])
+    shared.array[n:] = shared.array[:n]
+    return shared
+
+
+def _scoreFold(fitScore, x, y, train, test, foldSeed):
+    return fitScore(x[train], y[train], x[test], y[test], numpy.random.default_rng(foldSeed))
+
+
+def _scoreSharedFold(fitScore, xDescriptor, yDescriptor, train, test, foldSeed):
+    x = SharedArray.attach(xDescriptor)
+    y = SharedArray.attach(yDescriptor)
+    try:
+        return _scoreFold(fitScore, x.array, y.array, train, test, foldSeed)
+    finally:
+        x.release()
+        y.release()
+
+
+def _scorePlannedFold(fitScore, xDescriptor, yDescriptor, start, stop, foldSeed):
+    x = SharedArray.attach(xDescriptor)
+    y = SharedArray.attach(yDescriptor)
+    try:
+        # Slices, so fitScore gets views of the shared buffers rather than copies
+        n = len(x.array) // 2
+        return _scoreFold(fitScore, x.array, y.array, slice(stop, n + start), slice(start, stop), foldSeed)
+    finally:
+        x.release()
+        y.release()
+
+
+# Benchmark - private memory of the workers with a FoldPlan (shared views) against index arrays (a copy per fold)
+
+def benchmark(rows=4 * 10 ** 6, k=5, processes=4):
+    """
+    benchmark(rows=4000000, k=5, processes=4) -> Prints the largest private memory of a worker while fitScore runs, and
+    the time, for crossValidate() over a FoldPlan and over the same folds as index arrays
+
+    Private memory (Private_Clean + Private_Dirty of /proc/self/smaps_rollup) leaves out the shared buffers, so it
+    shows what each fold allocates for itself. Linux only.
+    """
+    import time
+
+    rng = numpy.random.default_rng(DEFAULT_SEED)
+    x = rng.normal(3.0, 1.0, rows)
+    y = rng.normal(150.0, 40.0, rows) / x
+    plan = kFold(rows, k, shuffle=True)
+    print("{} rows ({:,} bytes of x and y), {} folds, {} processes".format(rows, x.nbytes + y.nbytes, k, processes))
+    results = {}
+    for label, folds in (("FoldPlan", plan), ("index arrays", list(plan))):
+        start = time.perf_counter()
+        private = crossValidate(_privateBytes, x, y, folds, processes=processes)
+        seconds = time.perf_counter() - start
+        results[label] = (int(private.max()), seconds)
+        print("{:<13} peak private memory per worker {:>14,} bytes  {:8.2f} s".format(label, int(private.max()), seconds))
+    return results
+
+
+def _privateBytes(xTrain, yTrain, xTest, yTest, rng=None):
+    # A fitScore that touches its rows and reports the worker's private memory while they are held
+    float(yTrain.sum() + yTest.sum())
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if line.startswith("Private_"))
+    return 1024 * sum(int(value.split()[0]) for value in fields.values())
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql_cache
+from mysql_async import AsyncConnectionPool
+from mysql_pool import ConnectionPool
+
+
+class FakeCursor:
+    rowcount = 1
+
+    def execute(self, sql, params=None):
+        self.params = params
+
+    def fetchall(self):
+        return [self.params or ()]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _pool(size=4):
+    return ConnectionPool(size=size, connectFunction=lambda **config: FakeConnection())
+
+
+class TestAsyncConnectionPool:
+
+    def test_concurrency_defaults_to_pool_size(self):
+        db = AsyncConnectionPool(_pool(3))
+        assert db.concurrency == 3
+        db.close()
+
+    def test_concurrency_above_pool_size_rejected(self):
+        with pytest.raises(Exception) as exc_info:
+            AsyncConnectionPool(_pool(3), concurrency=4)
+        assert "pool size" in str(exc_info)
+
+    def test_gather_keeps_order_across_event_loops(self):
+        db = AsyncConnectionPool(_pool())
+        paramsList = [(i, ) for i in range(20)]
+        for _ in range(2):
+            assert asyncio.run(db.gather("SELECT * FROM customers WHERE id = %s", paramsList)) == [[params] for params in paramsList]
+        db.close()
+
+    def test_write_drops_cached_reads(self):
+        cache = mysql_cache.QueryCache()
+        cache.query(FakeConnection(), "SELECT * FROM customers", ())
+        db = AsyncConnectionPool(_pool())
+        assert asyncio.run(db.execute("UPDATE customers SET address = %s", ("Canyon 123", ))) == 1
+        db.close()
+        assert cache.stats()["entries"] == 0
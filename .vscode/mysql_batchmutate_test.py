@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_batchmutate import ChunkedMutation
+
+
+class LockError(Exception):
+
+    def __init__(self, errno):
+        super().__init__("lock error {}".format(errno))
+        self.errno = errno
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT MIN"):
+            self.result = self.connection.keyRange
+            return
+        lower, upper = [p for p in params if isinstance(p, int)][-2:]
+        self.connection.ranges.append((lower, upper))
+        if self.connection.failures:
+            raise LockError(self.connection.failures.pop(0))
+        self.rowcount = len([key for key in self.connection.keys if lower <= key < upper])
+
+    def fetchone(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self, keys, failures=()):
+        self.keys = list(keys)
+        self.keyRange = (min(self.keys), max(self.keys))
+        self.failures = list(failures)
+        self.ranges = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class TestChunkedMutation:
+
+    def test_every_key_covered_once(self):
+        connection = FakeConnection(range(1, 1001))
+        mutation = ChunkedMutation(connection, "customers", chunkSize=100, targetSeconds=1.0, maxChunk=400)
+        assert mutation.update("address = %s", ("Canyon 123", ), where="address = %s", whereParams=("Valley 345", )) == 1000
+        assert connection.ranges[0] == (1, 101)
+        assert all(a[1] == b[0] for a, b in zip(connection.ranges, connection.ranges[1:]))
+        assert connection.ranges[-1][1] > 1000
+
+    def test_retry_narrows_the_range(self, monkeypatch):
+        monkeypatch.setattr("time.sleep", lambda seconds: None)
+        connection = FakeConnection(range(1, 101), failures=[1213])
+        mutation = ChunkedMutation(connection, "customers", chunkSize=64, minChunk=1)
+        assert mutation.delete("address = %s", ("Mountain 21", )) == 100
+        assert connection.ranges[:2] == [(1, 65), (1, 33)]
+        assert connection.ranges[2][0] == 33
+        assert mutation.retries == 1 and connection.rollbacks == 1
+
+    def test_other_errors_raised(self):
+        connection = FakeConnection(range(1, 11), failures=[1064])
+        with pytest.raises(LockError):
+            ChunkedMutation(connection, "customers").delete()
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        path = str(tmp_path / "checkpoint.json")
+        connection = FakeConnection(range(1, 101))
+        mutation = ChunkedMutation(connection, "customers", chunkSize=10, checkpointPath=path)
+        statement = "DELETE FROM `customers` WHERE `id` >= %s AND `id` < %s"
+        with open(path, "w") as f:
+            json.dump({"statement": [statement, [], []], "next": 51, "chunkSize": 10}, f)
+        assert mutation.delete() == 50
+        assert connection.ranges[0] == (51, 61)
+        assert not os.path.exists(path)
@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql_cache
+from mysql_bulkload import BulkLoader
+
+
+def _render(sql, params):
+    # Roughly as the connector renders a statement: each value quoted, with the special characters backslash-escaped
+    def literal(value):
+        if value is None:
+            return "NULL"
+        text = str(value)
+        for c in ("\\", "'", '"', "\n", "\r", "\x00", "\x1a"):
+            text = text.replace(c, "\\" + c)
+        return "'" + text + "'"
+    return sql.replace("%s", "{}").format(*(literal(value) for value in params))
+
+
+class LockError(Exception):
+    errno = 1213
+
+
+class StubCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        if self.connection.failures:
+            self.connection.failures -= 1
+            raise LockError("Deadlock found when trying to get lock")
+        self.connection.statements.append((sql, params))
+
+    def fetchall(self):
+        return [("Amy", "Apple st 652")]
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return StubCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _rows(count):
+    return [("Customer {}".format(i), "Highway {}, 'Flat' \"{}\"\n".format(i, i % 7)) for i in range(count)]
+
+
+class TestBulkLoader:
+
+    def test_statements_fit_the_packet(self):
+        connection = StubConnection()
+        loader = BulkLoader(connection, "customers", ["name", "address"], maxPacket=4096)
+        assert loader.load(_rows(1000)) == 1000
+        assert len(connection.statements) > 1 and loader.stats()["batches"] == connection.commits == len(connection.statements)
+        assert all(len(_render(sql, params).encode("utf-8")) <= 4096 for sql, params in connection.statements)
+        loaded = [tuple(params[i:i + 2]) for sql, params in connection.statements for i in range(0, len(params), 2)]
+        assert loaded == _rows(1000)
+
+    def test_max_rows(self):
+        connection = StubConnection()
+        BulkLoader(connection, "customers", ["name", "address"], maxPacket=1 << 24, maxRows=300).load(_rows(1000))
+        assert [len(params) // 2 for sql, params in connection.statements] == [300, 300, 300, 100]
+
+    def test_deadlock_retried(self):
+        connection = StubConnection(failures=2)
+        loader = BulkLoader(connection, "customers", ["name", "address"], maxPacket=1 << 24)
+        assert loader.load(_rows(10)) == 10
+        assert loader.stats()["retries"] == connection.rollbacks == 2 and len(connection.statements) == 1
+
+    def test_wrong_row_length(self):
+        with pytest.raises(Exception) as exc_info:
+            BulkLoader(StubConnection(), "customers", ["name", "address"], maxPacket=4096).load([("Amy", )])
+        assert "Expected 2 values per row" in str(exc_info)
+
+    def test_cached_reads_dropped_after_commit(self):
+        cache = mysql_cache.QueryCache()
+        cache.query(StubConnection(), "SELECT * FROM customers")
+        assert cache.stats()["entries"] == 1
+        BulkLoader(StubConnection(), "customers", ["name", "address"], maxPacket=4096).load(_rows(10))
+        assert cache.stats()["entries"] == 0
+
+    def test_load_data_fields(self):
+        assert BulkLoader._loadDataField(None) == "NULL"
+        assert BulkLoader._loadDataField('Sky st "331"') == '"Sky st ""331"""'
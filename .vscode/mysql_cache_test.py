@@ -0,0 +1,145 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql_cache
+from mysql_cache import QueryCache, invalidateTables, normaliseSql, tablesIn
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+        if self.connection.duringRead is not None:
+            self.connection.duringRead()
+        self.rows = [tuple(row) for row in self.connection.rows]
+        self.rowcount = len(self.rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.commits = 0
+        self.duringRead = None
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestNormaliseSql:
+
+    def test_whitespace_collapsed_outside_literals(self):
+        assert normaliseSql("SELECT  *\n FROM customers ;") == "SELECT * FROM customers"
+
+    def test_literals_left_alone(self):
+        assert normaliseSql("SELECT * FROM customers WHERE address = 'Park  Lane 38'") == "SELECT * FROM customers WHERE address = 'Park  Lane 38'"
+
+    def test_different_literals_give_different_keys(self):
+        assert normaliseSql("SELECT 'a  b'") != normaliseSql("SELECT 'a b'")
+
+
+class TestTablesIn:
+
+    def test_schema_qualified(self):
+        assert tablesIn("SELECT * FROM mydatabase.customers") == {"customers"}
+        assert tablesIn("SELECT * FROM `mydatabase`.`Customers`") == {"customers"}
+
+    def test_comma_join(self):
+        assert tablesIn("SELECT * FROM users u, products p WHERE u.fav = p.id") == {"users", "products"}
+
+    def test_join_and_writes(self):
+        assert tablesIn("SELECT * FROM users INNER JOIN products ON users.fav = products.id") == {"users", "products"}
+        assert tablesIn("INSERT INTO customers (name, address) VALUES (%s, %s)") == {"customers"}
+        assert tablesIn("UPDATE customers SET address = %s") == {"customers"}
+
+    def test_literal_contents_ignored(self):
+        assert tablesIn("SELECT * FROM customers WHERE address = 'FROM orders'") == {"customers"}
+
+
+class TestQueryCache:
+
+    def test_repeated_query_served_from_cache(self):
+        connection = FakeConnection([(1, "John")])
+        cache = QueryCache()
+        first = cache.query(connection, "SELECT * FROM customers")
+        second = cache.query(connection, "SELECT  * FROM customers")
+        assert first == second == [(1, "John")]
+        assert len(connection.executed) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_original_sql_sent_to_server(self):
+        connection = FakeConnection()
+        sql = "SELECT * FROM customers WHERE address = 'Park  Lane 38'"
+        QueryCache().query(connection, sql)
+        assert connection.executed[0][0] == sql
+
+    def test_write_invalidates_cached_reads(self):
+        connection = FakeConnection([(1, "John")])
+        cache = QueryCache()
+        cache.query(connection, "SELECT * FROM mydatabase.customers")
+        cache.execute(connection, "UPDATE customers SET name = %s", ("Peter", ))
+        connection.rows = [(1, "Peter")]
+        assert cache.query(connection, "SELECT * FROM mydatabase.customers") == [(1, "Peter")]
+        assert cache.stats()["invalidations"] == 1
+
+    def test_invalidate_tables_reaches_every_cache(self):
+        connection = FakeConnection([(1, )])
+        caches = [QueryCache(), QueryCache()]
+        for cache in caches:
+            cache.query(connection, "SELECT * FROM users u, products p")
+        invalidateTables("products")
+        assert all(cache.stats()["entries"] == 0 for cache in caches)
+
+    def test_write_during_read_is_not_cached(self):
+        connection = FakeConnection([(1, "stale")])
+        cache = QueryCache()
+        connection.duringRead = lambda: invalidateTables("customers")
+        assert cache.query(connection, "SELECT * FROM customers") == [(1, "stale")]
+        connection.duringRead = None
+        connection.rows = [(1, "fresh")]
+        assert cache.query(connection, "SELECT * FROM customers") == [(1, "fresh")]
+
+    def test_cached_rows_cannot_be_changed_by_callers(self):
+        connection = FakeConnection([(1, "John")])
+        cache = QueryCache()
+        rows = cache.query(connection, "SELECT * FROM customers")
+        rows.append((2, "Intruder"))
+        assert cache.query(connection, "SELECT * FROM customers") == [(1, "John")]
+
+    def test_ttl_expiry(self):
+        connection = FakeConnection([(1, )])
+        cache = QueryCache(ttl=0.0)
+        cache.query(connection, "SELECT * FROM customers")
+        cache.query(connection, "SELECT * FROM customers")
+        assert len(connection.executed) == 2
+
+    def test_concurrent_queries(self):
+        connection = FakeConnection([(1, )])
+        cache = QueryCache()
+        threads = [threading.Thread(target=cache.query, args=(connection, "SELECT * FROM customers")) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert cache.stats()["hits"] + cache.stats()["misses"] == 8
+
+    def test_default_cache_is_shared(self):
+        assert mysql_cache.getCache() is mysql_cache.getCache()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_hashjoin import DimensionTable, hashJoin
+
+USERS = [("John", 154), ("Peter", 154), ("Amy", 155), ("Hannah", None), ("Michael", None), ("Susan", 158)]
+PRODUCTS = [(154, "Chocolate Heaven"), (155, "Tasty Lemons"), (156, "Vanilla Dreams")]
+
+
+class StubCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append(sql)
+        if sql.startswith("CHECKSUM"):
+            self.rows, self.description = [("products", self.connection.version)], [("Table", ), ("Checksum", )]
+        elif "products" in sql:
+            self.rows, self.description = list(self.connection.products), [("id", ), ("name", )]
+        else:
+            self.rows, self.description = list(USERS), [("name", ), ("fav", )]
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+
+    def __init__(self):
+        self.products = list(PRODUCTS)
+        self.version = 1
+        self.statements = []
+
+    def cursor(self, buffered=None):
+        return StubCursor(self)
+
+
+def _serverJoin(products, outer=False):
+    names = dict(products)
+    return [(user, fav) + ((names[fav], ) if fav in names else (None, )) for user, fav in USERS if outer or fav in names]
+
+
+class TestHashJoin:
+
+    def test_matches_inner_join(self):
+        connection = StubConnection()
+        products = DimensionTable(connection, "products", columns=["name"])
+        assert list(hashJoin(connection, "SELECT name, fav FROM users", products, keyIndex=1, batchSize=4)) == _serverJoin(PRODUCTS)
+
+    def test_outer_join_pads_with_none(self):
+        connection = StubConnection()
+        products = DimensionTable(connection, "products")
+        assert list(hashJoin(connection, "SELECT name, fav FROM users", products, keyIndex=1, outer=True)) == _serverJoin(PRODUCTS, outer=True)
+        assert products.width == 1
+
+
+class TestDimensionTable:
+
+    def test_reloads_only_when_version_changes(self):
+        connection = StubConnection()
+        products = DimensionTable(connection, "products", columns=["name"], checkInterval=0.0)
+        assert products.refresh() and not products.refresh()
+        connection.products.append((158, "Cool Cookies"))
+        assert not products.refresh()
+        connection.version = 2
+        assert products.refresh() and products.loads == 2
+        assert products.get(158) == ("Cool Cookies", ) and len(products) == 4
+
+    def test_check_interval_skips_version_query(self):
+        connection = StubConnection()
+        products = DimensionTable(connection, "products", checkInterval=60.0)
+        products.refresh()
+        checks = len(connection.statements)
+        connection.version = 2
+        assert not products.refresh()
+        assert len(connection.statements) == checks
+        assert products.refresh(force=True)
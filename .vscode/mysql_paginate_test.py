@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_paginate import KeysetPaginator, benchmark, decodeToken, encodeToken
+
+NAMES = ["Amy", "Hannah", "Betty", "Hannah", "Ben", "Amy", "Viola", "Hannah", "Chuck", "Susan", "Michael"]
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params):
+        # Rows are (id, name) followed by the key columns (name, id), as the paginator selects them
+        self.connection.statements.append(sql)
+        rows = sorted(((i + 1, name) for i, name in enumerate(NAMES)), key=lambda row: (row[1], row[0]), reverse="DESC" in sql)
+        if "WHERE" in sql:
+            name, sameName, id = params[:3]
+            after = (lambda key: key < (name, id)) if "DESC" in sql else (lambda key: key > (name, id))
+            rows = [row for row in rows if after((row[1], row[0]))]
+        self.rows = [row + (row[1], row[0]) for row in rows[:params[-1]]]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def _expected(descending=False):
+    return sorted(((i + 1, name) for i, name in enumerate(NAMES)), key=lambda row: (row[1], row[0]), reverse=descending)
+
+
+class TestKeysetPaginator:
+
+    def test_pages_cover_table_once(self):
+        for pageSize in (1, 3, 4, 11, 20):
+            paginator = KeysetPaginator(FakeConnection(), "customers", sortKey="name", pageSize=pageSize)
+            assert [row for rows in paginator.pages() for row in rows] == _expected()
+
+    def test_descending(self):
+        paginator = KeysetPaginator(FakeConnection(), "customers", sortKey="name", pageSize=4, descending=True)
+        assert [row for rows in paginator.pages() for row in rows] == _expected(descending=True)
+
+    def test_token_round_trip(self):
+        connection = FakeConnection()
+        paginator = KeysetPaginator(connection, "customers", sortKey="name", pageSize=3)
+        rows, token = paginator.page()
+        assert decodeToken(token) == ["Ben", 5]
+        assert decodeToken(encodeToken(("Hannah", 4))) == ["Hannah", 4]
+        assert paginator.page(token)[0] == _expected()[3:6]
+        assert "OFFSET" not in connection.statements[-1]
+
+    def test_last_page_has_no_token(self):
+        paginator = KeysetPaginator(FakeConnection(), "customers", sortKey="name", pageSize=4)
+        token = None
+        for i in range(3):
+            rows, token = paginator.page(token)
+        assert len(rows) == 3 and token is None
+
+    def test_bad_tokens_rejected(self):
+        paginator = KeysetPaginator(FakeConnection(), "customers", sortKey="name", pageSize=3)
+        with pytest.raises(Exception) as exc_info:
+            paginator.page("not a token")
+        assert "Invalid page token" in str(exc_info)
+        with pytest.raises(Exception) as exc_info:
+            paginator.page(encodeToken(("Amy", )))
+        assert "does not belong" in str(exc_info)
+
+    def test_benchmark_needs_a_deep_page(self):
+        with pytest.raises(Exception) as exc_info:
+            benchmark(deepPage=1)
+        assert "deepPage" in str(exc_info)
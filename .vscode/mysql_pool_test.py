@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_pool import ConnectionPool, PoolExhausted
+
+
+class StubConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.healthy
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnect:
+
+    def __init__(self):
+        self.made = []
+
+    def __call__(self, **config):
+        connection = StubConnection()
+        self.made.append(connection)
+        return connection
+
+
+def _pool(**options):
+    connect = StubConnect()
+    return ConnectionPool(connectFunction=connect, **options), connect
+
+
+class TestConnectionPool:
+
+    def test_connection_reused(self):
+        pool, connect = _pool()
+        for _ in range(5):
+            pool.checkout().close()
+        assert len(connect.made) == 1
+        assert pool.stats()["checkouts"] == 5 and pool.stats()["connectsMade"] == 1
+
+    def test_exhausted(self):
+        pool, connect = _pool(size=1, checkoutTimeout=0.05)
+        held = pool.checkout()
+        with pytest.raises(PoolExhausted):
+            pool.checkout()
+        held.close()
+        pool.checkout().close()
+
+    def test_closed_connection_cannot_be_used(self):
+        pool, connect = _pool()
+        mydb = pool.checkout()
+        mydb.close()
+        with pytest.raises(Exception) as exc_info:
+            mydb.is_connected()
+        assert "returned to the pool" in str(exc_info)
+
+    def test_uncommitted_work_rolled_back(self):
+        pool, connect = _pool()
+        with pool.checkout() as mydb:
+            mydb.raw.in_transaction = True
+        assert connect.made[0].rollbacks == 1
+
+    def test_unhealthy_connection_replaced(self):
+        pool, connect = _pool(healthCheckAfter=0.0)
+        pool.checkout().close()
+        connect.made[0].healthy = False
+        pool.checkout().close()
+        assert len(connect.made) == 2 and connect.made[0].closed
+        assert pool.stats()["healthCheckFailures"] == 1
+
+    def test_idle_connections_evicted(self):
+        pool, connect = _pool(idleTimeout=0.0)
+        pool.checkout().close()
+        pool.checkout().close()
+        assert connect.made[0].closed
+        assert pool.stats()["evictions"] == 1
+
+    def test_failed_connect_frees_its_slot(self):
+        def failing(**config):
+            raise Exception("connect failed")
+        pool = ConnectionPool(size=1, connectFunction=failing, checkoutTimeout=0.05)
+        for _ in range(2):
+            with pytest.raises(Exception) as exc_info:
+                pool.checkout()
+            assert "connect failed" in str(exc_info)
+        assert pool.stats()["open"] == 0
+
+    def test_concurrent_checkouts(self):
+        pool, connect = _pool(size=3)
+
+        def work():
+            for _ in range(200):
+                pool.checkout().close()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+        assert stats["checkouts"] == 1600
+        assert stats["connectsMade"] == len(connect.made) <= 3
+        assert stats["inUse"] == 0
+
+    def test_close_all(self):
+        pool, connect = _pool()
+        first, second = pool.checkout(), pool.checkout()
+        first.close()
+        second.close()
+        pool.closeAll()
+        assert all(connection.closed for connection in connect.made)
+        assert pool.stats()["open"] == 0
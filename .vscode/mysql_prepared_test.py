@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql_cache
+from mysql_prepared import StatementCache
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 1
+
+    def execute(self, sql, params=None):
+        self.connection.events.append(("execute", sql))
+
+    def fetchall(self):
+        return [(1, )]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.events = []
+
+    def cursor(self, prepared=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.events.append(("commit", None))
+
+
+class TestStatementCache:
+
+    def test_prepared_once_per_statement(self):
+        statements = StatementCache(FakeConnection())
+        for adr in ["Park Lane 38", "Highway 21", "Sky st 331"]:
+            statements.query("SELECT * FROM customers WHERE address = %s", (adr, ))
+        assert statements.stats()["hits"] == 2 and statements.stats()["misses"] == 1
+
+    def test_least_recently_used_closed(self):
+        statements = StatementCache(FakeConnection(), maxStatements=2)
+        for table in ["a", "b", "c"]:
+            statements.query("SELECT * FROM {}".format(table))
+        assert statements.stats()["prepared"] == 2 and statements.evictions == 1
+
+    def test_invalidated_after_commit(self, monkeypatch):
+        connection = FakeConnection()
+        monkeypatch.setattr("mysql_prepared.invalidateTables", lambda *tables: connection.events.append(("invalidate", set(tables))))
+        statements = StatementCache(connection)
+        statements.execute("INSERT INTO customers (name, address) VALUES (%s, %s)", ("Michelle", "Blue Village"))
+        assert [event for event, detail in connection.events] == ["execute", "commit", "invalidate"]
+        assert connection.events[-1][1] == {"customers"}
+
+    def test_deferred_commit(self, monkeypatch):
+        connection = FakeConnection()
+        monkeypatch.setattr("mysql_prepared.invalidateTables", lambda *tables: connection.events.append(("invalidate", set(tables))))
+        statements = StatementCache(connection)
+        statements.execute("UPDATE customers SET address = %s", ("Canyon 123", ), commit=False)
+        statements.execute("DELETE FROM orders WHERE id = %s", (1, ), commit=False)
+        assert "invalidate" not in [event for event, detail in connection.events]
+        statements.commit()
+        assert connection.events[-2:] == [("commit", None), ("invalidate", {"customers", "orders"})]
+
+    def test_write_drops_cached_reads(self):
+        connection = FakeConnection()
+        cache = mysql_cache.QueryCache()
+        cache.query(connection, "SELECT * FROM customers")
+        StatementCache(connection).execute("UPDATE customers SET address = %s", ("Canyon 123", ))
+        assert cache.stats()["entries"] == 0
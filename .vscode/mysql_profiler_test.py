@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_profiler import indexStatement, proposeIndexes
+
+
+class TestProposeIndexes:
+
+    def test_equality_then_order(self):
+        assert proposeIndexes("SELECT * FROM customers WHERE address = %s ORDER BY name") == [("customers", ("address", "name"))]
+
+    def test_range_ends_the_key(self):
+        assert proposeIndexes("SELECT * FROM customers c WHERE c.address = %s AND id > 5 ORDER BY name") == [("customers", ("address", "id"))]
+        assert proposeIndexes("SELECT * FROM customers WHERE id > 5 AND name LIKE 'P%'") == [("customers", ("id", ))]
+
+    def test_order_on_the_range_column(self):
+        assert proposeIndexes("SELECT * FROM customers WHERE id > 5 ORDER BY id, name") == [("customers", ("id", "name"))]
+
+    def test_covering_columns_follow_the_key(self):
+        sql = "SELECT name, address FROM customers WHERE address = %s AND id > 5 ORDER BY name"
+        assert proposeIndexes(sql) == [("customers", ("address", "id", "name"))]
+
+    def test_join_and_leading_wildcard(self):
+        sql = "SELECT users.name FROM users INNER JOIN products ON users.fav = products.id WHERE users.name LIKE '%a'"
+        assert proposeIndexes(sql) == [("users", ("fav", "name")), ("products", ("id", ))]
+        assert indexStatement("users", ("fav", )) == "CREATE INDEX `idx_users_fav` ON `users` (`fav`)"
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mysql_stream import streamBatches, streamQuery
+
+ROWS = [(i, "Customer {}".format(i)) for i in range(10)]
+
+
+class StubCursor:
+
+    def __init__(self, buffered):
+        self.buffered = buffered
+        self.remaining = None
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.remaining = list(ROWS)
+
+    def fetchmany(self, size):
+        rows, self.remaining = self.remaining[:size], self.remaining[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnection:
+
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, buffered=None):
+        self.cursors.append(StubCursor(buffered))
+        return self.cursors[-1]
+
+
+class TestStreamQuery:
+
+    def test_rows_in_order(self):
+        connection = StubConnection()
+        assert list(streamQuery(connection, "SELECT * FROM customers", batchSize=3)) == ROWS
+        cursor = connection.cursors[0]
+        assert cursor.buffered is False and cursor.closed
+
+    def test_batches_are_at_most_batch_size(self):
+        batches = list(streamBatches(StubConnection(), "SELECT * FROM customers", batchSize=4))
+        assert [len(rows) for rows in batches] == [4, 4, 2]
+
+    def test_early_break_drains_the_cursor(self):
+        connection = StubConnection()
+        batches = streamBatches(connection, "SELECT * FROM customers", batchSize=3)
+        next(batches)
+        batches.close()
+        cursor = connection.cursors[0]
+        assert cursor.remaining == [] and cursor.closed
+
+    def test_batch_size_must_be_positive(self):
+        with pytest.raises(Exception) as exc_info:
+            list(streamBatches(StubConnection(), "SELECT * FROM customers", batchSize=0))
+        assert "batchSize" in str(exc_info)
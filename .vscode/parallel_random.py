@@ -0,0 +1,192 @@
+# Parallel Random Numbers
+
+# The distribution, scatter plot and train/test scripts draw from the legacy global numpy.random state
+# (numpy.random.seed(2), numpy.random.normal(...)). That is one stream in one thread, and it cannot be split up.
+# RandomService fills arrays in fixed-size blocks. Every block has its own numpy.random.Generator seeded from
+# SeedSequence(seed, spawn_key=(stream, block)), so a block's numbers depend only on the seed, the stream and the block
+# number. Threads (or processes, for .npy memory-mapped files) can fill the blocks in any order and the array comes
+# out bit for bit the same for any number of workers.
+
+# E.g.
+"""
+from parallel_random import RandomService
+
+service = RandomService(seed=2, workers=4)
+x = service.normal(5.0, 1.0, 1000)
+y = service.normal(10.0, 2.0, 1000)
+
+out = numpy.empty(10 ** 8)
+service.uniform(0.0, 5.0, out=out)                      # fills a preallocated array in place
+big = service.normalFile("normal.npy", 5.0, 1.0, 10 ** 9, processes=4)    # memory-mapped, filled by worker processes
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy
+
+from shared_array import DEFAULT_SEED
+
+# Values per block; part of the definition of the output, so changing it changes the numbers
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+class RandomService:
+    """
+    RandomService(seed=2, workers=None, blockSize=1048576) -> Reproducible uniform and normal arrays filled in parallel
+
+    Parameters:
+    seed: Root seed
+    workers: Threads used to fill arrays, None for os.cpu_count()
+    blockSize: Values per independently seeded block
+
+    Each call without an explicit stream takes the next stream number (0, 1, 2 ...), so the same sequence of calls
+    gives the same arrays, as with numpy.random.seed(); pass stream= to fetch a particular stream again.
+    """
+
+    def __init__(self, seed=DEFAULT_SEED, workers=None, blockSize=DEFAULT_BLOCK_SIZE):
+        self.seed = seed
+        self.workers = workers or os.cpu_count()
+        self.blockSize = int(blockSize)
+        self.nextStream = 0
+
+    def uniform(self, low=0.0, high=1.0, size=None, out=None, stream=None, dtype=numpy.float64):
+        """
+        uniform(low=0.0, high=1.0, size=None, out=None, stream=None, dtype=float64) -> Array of values in [low, high)
+
+        low + (high - low) * u can round up to high, often in float32 when high - low is small next to low, so
+        values are clamped to the largest float below high.
+        Give either size (a new array is made) or out (a preallocated array, or a numpy.memmap, filled in place).
+        """
+        return self._fill("uniform", low, high, size, out, stream, dtype)
+
+    def normal(self, loc=0.0, scale=1.0, size=None, out=None, stream=None, dtype=numpy.float64):
+        """
+        normal(loc=0.0, scale=1.0, size=None, out=None, stream=None, dtype=float64) -> Array of normally distributed values
+        """
+        return self._fill("normal", loc, scale, size, out, stream, dtype)
+
+    def uniformFile(self, path, low, high, size, processes=None, stream=None, dtype=numpy.float64):
+        """
+        uniformFile(path, low, high, size, processes=None, stream=None, dtype=float64) -> numpy.memmap of a new .npy file of uniform values
+
+        processes=None fills the file with threads; a number fills it with that many worker processes, each writing
+        its blocks straight into the mapped file.
+        """
+        return self._fillFile("uniform", path, low, high, size, processes, stream, dtype)
+
+    def normalFile(self, path, loc, scale, size, processes=None, stream=None, dtype=numpy.float64):
+        return self._fillFile("normal", path, loc, scale, size, processes, stream, dtype)
+
+    def generator(self, stream=None):
+        """
+        generator(stream=None) -> A numpy.random.Generator of its own stream, for anything the fill methods do not cover
+        """
+        return numpy.random.default_rng(numpy.random.SeedSequence(self.seed, spawn_key=(self._stream(stream),)))
+
+    def _stream(self, stream):
+        if stream is None:
+            stream = self.nextStream
+            self.nextStream += 1
+        return stream
+
+    def _fill(self, distribution, a, b, size, out, stream, dtype):
+        if (size is None) == (out is None):
+            raise Exception("Give either size or out")
+        if out is None:
+            out = numpy.empty(size, dtype=dtype)
+        if not out.flags.c_contiguous or out.dtype not in (numpy.float64, numpy.float32):
+            raise Exception("out must be a C-contiguous float64 or float32 array")
+        flat = out.reshape(-1)
+        job = (distribution, a, b, self.seed, self._stream(stream), self.blockSize)
+        blocks = range(_blockCount(len(flat), self.blockSize))
+        if self.workers == 1 or len(blocks) == 1:
+            for block in blocks:
+                _fillBlock(flat, job, block)
+        else:
+            # The Generator fill methods release the GIL, so the threads run in parallel
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(lambda block: _fillBlock(flat, job, block), blocks))
+        return out
+
+    def _fillFile(self, distribution, path, a, b, size, processes, stream, dtype):
+        out = numpy.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(size,) if numpy.isscalar(size) else tuple(size))
+        if processes is None:
+            self._fill(distribution, a, b, None, out, stream, dtype)
+            out.flush()
+            return out
+
+        job = (distribution, a, b, self.seed, self._stream(stream), self.blockSize)
+        count = _blockCount(out.size, self.blockSize)
+        # A few contiguous runs of blocks per process keeps each worker writing one region of the file at a time
+        bounds = numpy.linspace(0, count, min(count, 4 * processes) + 1).astype(numpy.int64)
+        out.flush()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            list(pool.map(_fillFileBlocks, [path] * (len(bounds) - 1), [job] * (len(bounds) - 1), bounds[:-1], bounds[1:]))
+        return out
+
+
+def _blockCount(size, blockSize):
+    return (size + blockSize - 1) // blockSize
+
+
+def _fillBlock(flat, job, block):
+    distribution, a, b, seed, stream, blockSize = job
+    view = flat[block * blockSize:(block + 1) * blockSize]
+    rng = numpy.random.Generator(numpy.random.PCG64(numpy.random.SeedSequence(seed, spawn_key=(stream, block))))
+    if distribution == "uniform":
+        rng.random(out=view, dtype=view.dtype)
+        view *= b - a
+        view += a
+        if b > a:
+            numpy.minimum(view, numpy.nextafter(view.dtype.type(b), view.dtype.type(a)), out=view)
+    else:
+        rng.standard_normal(out=view, dtype=view.dtype)
+        view *= b
+        view += a
+
+
+def _fillFileBlocks(path, job, first, last):
+    out = numpy.load(path, mmap_mode="r+")
+    flat = out.reshape(-1)
+    for block in range(first, last):
+        _fillBlock(flat, job, block)
+    out.flush()
+    del out
+
+
+# Benchmark - fill time for 1 to all threads, checked to give identical arrays, against the legacy numpy.random
+
+def benchmark(size=10 ** 8, maxWorkers=None):
+    """
+    benchmark(size=10**8, maxWorkers=None) -> Prints normal() fill times per thread count and numpy.random.normal()
+    """
+    maxWorkers = maxWorkers or os.cpu_count()
+    out = numpy.empty(size)
+
+    start = time.perf_counter()
+    numpy.random.seed(DEFAULT_SEED)
+    numpy.random.normal(0.0, 1.0, size)
+    legacySeconds = time.perf_counter() - start
+    print("{} normal values".format(size))
+    print("legacy numpy.random.normal: {:8.3f} s".format(legacySeconds))
+
+    reference = None
+    timings = {}
+    for workers in range(1, maxWorkers + 1):
+        start = time.perf_counter()
+        RandomService(DEFAULT_SEED, workers).normal(0.0, 1.0, out=out, stream=0)
+        timings[workers] = time.perf_counter() - start
+        digest = hashlib.sha256(out).hexdigest()
+        if reference is None:
+            reference = digest
+        elif digest != reference:
+            raise Exception("Output with {} workers differs".format(workers))
+        print("RandomService, {:>3} threads: {:8.3f} s  ({:.1f}x legacy)".format(workers, timings[workers], legacySeconds / timings[workers]))
+    return legacySeconds, timings
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from parallel_random import RandomService
+
+SIZE = 10007    # not a multiple of the block size, so the last block is partial
+BLOCK_SIZE = 1000
+
+
+class TestRandomService:
+
+    def test_same_output_for_any_number_of_workers(self):
+        serial = RandomService(workers=1, blockSize=BLOCK_SIZE)
+        threaded = RandomService(workers=4, blockSize=BLOCK_SIZE)
+        assert (serial.normal(5.0, 1.0, SIZE) == threaded.normal(5.0, 1.0, SIZE)).all()
+        assert (serial.uniform(0.0, 5.0, SIZE) == threaded.uniform(0.0, 5.0, SIZE)).all()
+
+    def test_streams_are_reproducible_and_distinct(self):
+        service = RandomService(blockSize=BLOCK_SIZE)
+        first, second = service.normal(size=SIZE), service.normal(size=SIZE)
+        assert not (first == second).all()
+        assert (RandomService(blockSize=BLOCK_SIZE).normal(size=SIZE, stream=1) == second).all()
+
+    def test_out_filled_in_place(self):
+        out = numpy.empty((10, 1000), dtype=numpy.float32)
+        assert RandomService(blockSize=BLOCK_SIZE).uniform(0.0, 1.0, out=out, stream=0) is out
+        assert (out.ravel() == RandomService(blockSize=BLOCK_SIZE).uniform(0.0, 1.0, out.size, stream=0, dtype=numpy.float32)).all()
+        with pytest.raises(Exception):
+            RandomService().uniform(0.0, 1.0, out=numpy.empty(10, dtype=numpy.int64))
+
+    def test_file_filled_by_processes_matches_memory(self, tmp_path):
+        service = RandomService(workers=1, blockSize=BLOCK_SIZE)
+        expected = service.uniform(1.0, 3.0, SIZE, stream=0)
+        mapped = service.uniformFile(str(tmp_path / "uniform.npy"), 1.0, 3.0, SIZE, processes=2, stream=0)
+        assert (mapped == expected).all()
+        assert (numpy.load(str(tmp_path / "uniform.npy")) == expected).all()
+
+    def test_uniform_stays_below_high(self):
+        # float32 spacing near 1e6 is 1/16, so without clamping about 3% of the values round up to high
+        values = RandomService(blockSize=BLOCK_SIZE).uniform(1e6, 1e6 + 1.0, SIZE, dtype=numpy.float32)
+        assert values.max() < numpy.float32(1e6 + 1.0)
+        assert values.min() >= numpy.float32(1e6)
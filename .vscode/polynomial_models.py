@@ -0,0 +1,237 @@
+# Polynomial Models
+
+# w3school_pythonpolynomialregression.py and w3school_pythontraintest.py build models with numpy.poly1d(numpy.polyfit(x, y, deg))
+# and the degree is picked by hand. Every polyfit call builds and factorises its own Vandermonde matrix.
+# PolynomialBasis builds the Vandermonde matrix for the highest degree once and takes its QR factorisation once.
+# The first d+1 columns of that factorisation are the factorisation for degree d, so every lower degree is fitted
+# (and scored) from the same Q and R. Degree selection cross-validates all degrees at once, and PolynomialModel
+# evaluates with Horner's rule over whole arrays, chunk by chunk for very large linspace grids.
+
+# E.g.
+"""
+from polynomial_models import fitPolynomial, selectDegree
+
+mymodel = fitPolynomial(x, y, 3)
+myline = numpy.linspace(1, 22, 100)
+plt.plot(myline, mymodel(myline))
+
+best, scores = selectDegree(x, y, maxDegree=8)
+mymodel = fitPolynomial(x, y, best)
+"""
+
+import time
+
+import numpy
+from scipy.linalg import solve_triangular
+
+from model_validation import kFold
+
+# Points evaluated at a time by PolynomialModel.evaluateInto()
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class PolynomialModel:
+    """
+    PolynomialModel(coefficients, shift=0.0, scale=1.0) -> p(x) = c0 + c1*t + c2*t**2 + ... with t = (x - shift) / scale
+
+    Fitting in the scaled variable t keeps the Vandermonde matrix well conditioned for larger degrees.
+    Calling the model works like calling a numpy.poly1d.
+    """
+
+    def __init__(self, coefficients, shift=0.0, scale=1.0):
+        self.coefficients = numpy.asarray(coefficients, dtype=numpy.float64)
+        self.shift = float(shift)
+        self.scale = float(scale)
+
+    @property
+    def degree(self):
+        return len(self.coefficients) - 1
+
+    def __call__(self, x, out=None):
+        """
+        model(x, out=None) -> Value of the polynomial at x, computed with Horner's rule over the whole array
+        """
+        t = (numpy.asarray(x, dtype=numpy.float64) - self.shift) / self.scale
+        if out is None:
+            out = numpy.full(t.shape, self.coefficients[-1])
+        else:
+            out[...] = self.coefficients[-1]
+        for c in self.coefficients[-2::-1]:
+            out *= t
+            out += c
+        return out if out.ndim else float(out)
+
+    def evaluateInto(self, x, out, chunkSize=DEFAULT_CHUNK_SIZE):
+        """
+        evaluateInto(x, out, chunkSize=1048576) -> Fills out with the model values at x, one chunk at a time (works with numpy.memmap)
+        """
+        for start in range(0, len(x), chunkSize):
+            self(x[start:start + chunkSize], out=out[start:start + chunkSize])
+        return out
+
+    def evaluateLinspace(self, start, stop, num, chunkSize=DEFAULT_CHUNK_SIZE, out=None):
+        """
+        evaluateLinspace(start, stop, num, chunkSize=1048576, out=None) -> Model values on numpy.linspace(start, stop, num)
+
+        The grid itself is generated chunk by chunk, so only the output array is ever full size.
+        """
+        out = numpy.empty(num) if out is None else out
+        step = (stop - start) / (num - 1) if num > 1 else 0.0
+        for first in range(0, num, chunkSize):
+            last = min(num, first + chunkSize)
+            grid = start + step * numpy.arange(first, last, dtype=numpy.float64)
+            if last == num and num > 1:
+                grid[-1] = stop
+            self(grid, out=out[first:last])
+        return out
+
+    def toPoly1d(self):
+        """
+        toPoly1d() -> The same polynomial as a numpy.poly1d in x
+        """
+        series = numpy.polynomial.Polynomial(self.coefficients, domain=[self.shift - self.scale, self.shift + self.scale], window=[-1, 1])
+        return numpy.poly1d(series.convert().coef[::-1])
+
+    def __repr__(self):
+        return "PolynomialModel(degree={})".format(self.degree)
+
+
+class PolynomialBasis:
+    """
+    PolynomialBasis(x, maxDegree) -> Vandermonde matrix of x up to maxDegree with its QR factorisation, built once
+
+    Parameters:
+    x: The x values of the data set
+    maxDegree: The highest degree that will be fitted
+    """
+
+    def __init__(self, x, maxDegree, shift=None, scale=None):
+        x = numpy.asarray(x, dtype=numpy.float64).ravel()
+        if maxDegree >= len(x):
+            raise Exception("Degree {} needs more than {} points".format(maxDegree, len(x)))
+        self.maxDegree = maxDegree
+        self.shift = float((x.max() + x.min()) / 2) if shift is None else shift
+        self.scale = float((x.max() - x.min()) / 2 or 1.0) if scale is None else scale
+        self.vandermonde = vandermonde(x, maxDegree, self.shift, self.scale)
+        self.q, self.r = numpy.linalg.qr(self.vandermonde)
+
+    def coefficientTable(self, y):
+        """
+        coefficientTable(y) -> (maxDegree+1) x (maxDegree+1) array whose column d holds the degree d coefficients (zero padded)
+        """
+        return _coefficientTable(self.q, self.r, y)
+
+    def fit(self, y, degree):
+        if degree > self.maxDegree:
+            raise Exception("Basis was built for degree {} at most".format(self.maxDegree))
+        z = self.q[:, :degree + 1].T @ numpy.asarray(y, dtype=numpy.float64)
+        return PolynomialModel(solve_triangular(self.r[:degree + 1, :degree + 1], z), self.shift, self.scale)
+
+    def r2Scores(self, y):
+        """
+        r2Scores(y) -> R-squared on the fitted data for every degree 0..maxDegree, the same values as r2_score(y, model(x))
+        """
+        # Centring y first keeps y @ y from dwarfing the residuals when the mean is large. The first orthonormal column
+        # is the constant, which the centred y has nothing of; the residual of degree d is what columns 1..d cannot explain.
+        centred = numpy.asarray(y, dtype=numpy.float64) - numpy.mean(y)
+        z = self.q[:, 1:].T @ centred
+        total = float(centred @ centred)
+        residual = total - numpy.concatenate(([0.0], numpy.cumsum(z * z)))
+        return 1.0 - numpy.maximum(residual, 0.0) / total
+
+
+def vandermonde(x, degree, shift=0.0, scale=1.0):
+    """
+    vandermonde(x, degree, shift=0.0, scale=1.0) -> Columns 1, t, t**2 ... t**degree with t = (x - shift) / scale
+    """
+    t = (numpy.asarray(x, dtype=numpy.float64) - shift) / scale
+    return numpy.vander(t, degree + 1, increasing=True)
+
+
+def fitPolynomial(x, y, degree):
+    """
+    fitPolynomial(x, y, degree) -> PolynomialModel, the drop-in for numpy.poly1d(numpy.polyfit(x, y, degree))
+    """
+    return PolynomialBasis(x, degree).fit(y, degree)
+
+
+def selectDegree(x, y, maxDegree=10, folds=5, seed=2):
+    """
+    selectDegree(x, y, maxDegree=10, folds=5, seed=2) -> (best degree, mean squared error of each degree 0..maxDegree)
+
+    k-fold cross validation of every degree at once: each fold takes one QR factorisation of its training rows,
+    the coefficients of all degrees come from it, and one matrix product predicts the held-out rows for all degrees.
+    """
+    x = numpy.asarray(x, dtype=numpy.float64).ravel()
+    y = numpy.asarray(y, dtype=numpy.float64).ravel()
+    shift = float((x.max() + x.min()) / 2)
+    scale = float((x.max() - x.min()) / 2 or 1.0)
+    full = vandermonde(x, maxDegree, shift, scale)
+
+    errors = numpy.zeros(maxDegree + 1)
+    for train, test in kFold(len(x), folds, shuffle=True, seed=seed):
+        if len(train) <= maxDegree:
+            raise Exception("Not enough points per fold for degree {}".format(maxDegree))
+        q, r = numpy.linalg.qr(full[train])
+        table = _coefficientTable(q, r, y[train])
+        predictions = full[test] @ table    # one column of predictions per degree
+        errors += ((predictions - y[test, None]) ** 2).sum(axis=0)
+
+    errors /= len(x)
+    return int(numpy.argmin(errors)), errors
+
+
+def _coefficientTable(q, r, y):
+    # Column d holds the degree d coefficients: the leading (d+1) x (d+1) block of R solved against Q^T y
+    z = q.T @ numpy.asarray(y, dtype=numpy.float64)
+    size = r.shape[0]
+    table = numpy.zeros((size, size))
+    for degree in range(size):
+        table[:degree + 1, degree] = solve_triangular(r[:degree + 1, :degree + 1], z[:degree + 1])
+    return table
+
+
+# Benchmark - one polyfit per degree against one factorisation, and poly1d against Horner evaluation
+
+def benchmark(points=100000, maxDegree=10, gridSize=10 ** 7):
+    """
+    benchmark(points=100000, maxDegree=10, gridSize=10**7) -> Prints fit times for all degrees and evaluation times on a large grid
+    """
+    rng = numpy.random.default_rng(2)
+    x = rng.uniform(1, 22, points)
+    y = 100 - 8 * x + 0.4 * x ** 2 + rng.normal(0, 5, points)
+
+    start = time.perf_counter()
+    for degree in range(maxDegree + 1):
+        model = numpy.poly1d(numpy.polyfit(x, y, degree))
+        r2 = 1 - ((y - model(x)) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+    polyfitSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    basis = PolynomialBasis(x, maxDegree)
+    basis.r2Scores(y)
+    models = [basis.fit(y, degree) for degree in range(maxDegree + 1)]
+    basisSeconds = time.perf_counter() - start
+
+    print("fit and score degrees 0..{} on {} points".format(maxDegree, points))
+    print("repeated polyfit: {:8.3f} s".format(polyfitSeconds))
+    print("PolynomialBasis:  {:8.3f} s  ({:.1f}x)".format(basisSeconds, polyfitSeconds / basisSeconds))
+
+    reference = models[3].toPoly1d()
+    start = time.perf_counter()
+    reference(numpy.linspace(1, 22, gridSize))
+    poly1dSeconds = time.perf_counter() - start
+
+    out = numpy.empty(gridSize)
+    start = time.perf_counter()
+    models[3].evaluateLinspace(1, 22, gridSize, out=out)
+    hornerSeconds = time.perf_counter() - start
+
+    print("evaluate degree 3 on a {} point linspace".format(gridSize))
+    print("poly1d:           {:8.3f} s".format(poly1dSeconds))
+    print("Horner, chunked:  {:8.3f} s  ({:.1f}x)".format(hornerSeconds, poly1dSeconds / hornerSeconds))
+    return polyfitSeconds, basisSeconds, poly1dSeconds, hornerSeconds
+
+
+if __name__ == "__main__":
+    benchmark()
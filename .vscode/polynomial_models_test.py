@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy
+import pytest
+from sklearn.metrics import r2_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from model_validation import kFold
+from polynomial_models import PolynomialBasis, fitPolynomial, selectDegree
+
+X = [1, 2, 3, 5, 6, 7, 8, 9, 10, 12, 13, 14, 15, 16, 18, 19, 21, 22]
+Y = [100, 90, 80, 60, 60, 55, 60, 65, 70, 70, 75, 76, 78, 79, 90, 99, 99, 100]
+
+
+class TestPolynomialModel:
+
+    def test_matches_polyfit(self):
+        line = numpy.linspace(1, 22, 100)
+        for degree in range(6):
+            reference = numpy.poly1d(numpy.polyfit(X, Y, degree))
+            model = fitPolynomial(X, Y, degree)
+            assert numpy.allclose(model(line), reference(line))
+            assert numpy.allclose(model.toPoly1d().coeffs, reference.coeffs)
+        assert numpy.isclose(fitPolynomial(X, Y, 3)(17), numpy.poly1d(numpy.polyfit(X, Y, 3))(17))
+
+    def test_chunked_evaluation(self):
+        model = fitPolynomial(X, Y, 3)
+        reference = numpy.poly1d(numpy.polyfit(X, Y, 3))
+        assert numpy.allclose(model.evaluateLinspace(1, 22, 1001, chunkSize=64), reference(numpy.linspace(1, 22, 1001)))
+        x = numpy.random.default_rng(0).uniform(1, 22, 1000)
+        assert numpy.allclose(model.evaluateInto(x, numpy.empty_like(x), chunkSize=100), reference(x))
+
+
+class TestPolynomialBasis:
+
+    def test_every_degree_from_one_factorisation(self):
+        basis = PolynomialBasis(X, 6)
+        table = basis.coefficientTable(Y)
+        scores = basis.r2Scores(Y)
+        for degree in range(7):
+            model = basis.fit(Y, degree)
+            assert numpy.allclose(table[:degree + 1, degree], model.coefficients)
+            assert numpy.isclose(scores[degree], r2_score(Y, numpy.poly1d(numpy.polyfit(X, Y, degree))(X)), atol=1e-12)
+        with pytest.raises(Exception):
+            basis.fit(Y, 7)
+
+    def test_r2_with_large_mean(self):
+        rng = numpy.random.default_rng(1)
+        x = rng.uniform(0, 10, 200)
+        y = 1e8 + 3.0 * x - 0.5 * x ** 2 + rng.normal(0.0, 1.0, 200)
+        assert numpy.isclose(PolynomialBasis(x, 2).r2Scores(y)[2], r2_score(y, numpy.poly1d(numpy.polyfit(x, y, 2))(x)))
+
+    def test_select_degree_matches_polyfit_cross_validation(self):
+        rng = numpy.random.default_rng(2)
+        x = rng.uniform(0, 6, 200)
+        y = 80 - 5 * x + 2 * x ** 2 - 0.3 * x ** 3 + rng.normal(0.0, 1.0, 200)
+        best, errors = selectDegree(x, y, maxDegree=6)
+        expected = numpy.zeros(7)
+        for train, test in kFold(len(x), 5, shuffle=True):
+            for degree in range(7):
+                expected[degree] += ((numpy.polyval(numpy.polyfit(x[train], y[train], degree), x[test]) - y[test]) ** 2).sum()
+        assert numpy.allclose(errors, expected / len(x))
+        assert best == int(numpy.argmin(expected)) and best >= 3
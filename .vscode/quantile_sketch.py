@@ -0,0 +1,222 @@
+# Quantile Sketch
+
+# w3school_pythonpercentile.py's statPercentile() calls numpy.percentile() on the whole list, which partitions all of
+# the data for every query and needs every value in memory.
+# QuantileSketch is a t-digest: the data is summarised by a bounded number of centroids (a mean and a weight each),
+# kept small near the median and very small near the tails, where percentiles like 99 or 99.9 need the resolution.
+# Values are added a chunk at a time and folded in with array operations, so memory stays at one chunk plus the
+# centroids however long the stream is. Any number of percentiles are read from the same sketch, and sketches from
+# separate shards merge and serialise to a few kilobytes.
+
+# E.g.
+"""
+from quantile_sketch import QuantileSketch
+
+sketch = QuantileSketch(compression=200)
+for chunk in chunks:
+    sketch.update(chunk)
+print(sketch.percentile([50, 90, 99]))
+
+blob = sketch.toBytes()    # send a shard's summary elsewhere
+total = QuantileSketch.fromBytes(blob).merge(otherSketch)
+"""
+
+import time
+
+import numpy
+
+DEFAULT_COMPRESSION = 100
+# Values held back before they are folded into the centroids
+DEFAULT_BUFFER_SIZE = 50000
+
+
+class QuantileSketch:
+    """
+    QuantileSketch(compression=100, bufferSize=50000) -> Mergeable t-digest of a stream of numbers
+
+    Parameters:
+    compression: Accuracy/memory trade-off; the sketch keeps at most about compression centroids (plus the buffer),
+                 and the rank error near the median is roughly 1 / compression, much smaller towards the tails
+    bufferSize: Values collected before they are folded in; larger buffers fold less often
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, bufferSize=DEFAULT_BUFFER_SIZE):
+        self.compression = float(compression)
+        self.bufferSize = bufferSize
+        self.means = numpy.empty(0)
+        self.weights = numpy.empty(0)
+        self.n = 0.0
+        self.min = numpy.inf
+        self.max = -numpy.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values, weights=None):
+        """
+        update(values, weights=None) -> Adds a chunk of values (any shape, flattened) and returns self
+        """
+        values = numpy.asarray(values, dtype=numpy.float64).ravel()
+        if len(values) == 0:
+            return self
+        if numpy.isnan(values).any():
+            raise Exception("Data contains NaN")
+        weights = numpy.ones(len(values)) if weights is None else numpy.broadcast_to(numpy.asarray(weights, dtype=numpy.float64), values.shape)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        # Copies, because callers often refill the same buffer for the next chunk
+        self._buffer.append((values.copy(), numpy.array(weights)))
+        self._buffered += len(values)
+        if self._buffered >= self.bufferSize:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        merge(other) -> Folds another sketch (e.g. from another shard) into this one and returns self
+        """
+        other._compress()
+        if other.n:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._buffer.append((other.means, other.weights))
+            self._buffered += len(other.means)
+            self._compress()
+        return self
+
+    @property
+    def count(self):
+        self._compress()
+        return self.n
+
+    @property
+    def centroids(self):
+        self._compress()
+        return len(self.means)
+
+    def percentile(self, q):
+        """
+        percentile(q) -> Estimate of numpy.percentile(data, q) for a percentile or a list of them (0-100)
+        """
+        return self.quantile(numpy.asarray(q, dtype=numpy.float64) / 100.0)
+
+    def quantile(self, q):
+        self._compress()
+        if self.n == 0:
+            raise Exception("No data")
+        q = numpy.asarray(q, dtype=numpy.float64)
+        if ((q < 0) | (q > 1)).any():
+            raise Exception("Quantiles must be between 0 and 1")
+        # Each centroid stands at the middle of the ranks it covers; between them the value is interpolated, and the
+        # first and last ranks are pinned to the exact min and max. The +0.5 lines rank h of numpy's linear
+        # interpolation (h = (n - 1) q) up with those centres, so a sketch of single values reproduces numpy exactly.
+        centres = numpy.cumsum(self.weights) - self.weights / 2.0
+        positions = numpy.concatenate(([0.0], centres, [self.n]))
+        values = numpy.concatenate(([self.min], self.means, [self.max]))
+        result = numpy.interp((self.n - 1) * q + 0.5, positions, values)
+        return result if result.ndim else float(result)
+
+    def cdf(self, x):
+        """
+        cdf(x) -> Estimated fraction of the data <= x
+        """
+        self._compress()
+        if self.n == 0:
+            raise Exception("No data")
+        centres = numpy.cumsum(self.weights) - self.weights / 2.0
+        positions = numpy.concatenate(([0.0], centres, [self.n]))
+        values = numpy.concatenate(([self.min], self.means, [self.max]))
+        return numpy.interp(x, values, positions) / self.n
+
+    def state(self):
+        """
+        state() -> (compression, n, min, max, means, weights), small enough to send between processes
+        """
+        self._compress()
+        return (self.compression, self.n, self.min, self.max, self.means, self.weights)
+
+    @classmethod
+    def fromState(cls, state):
+        sketch = cls(state[0])
+        sketch.n, sketch.min, sketch.max, sketch.means, sketch.weights = state[1:]
+        return sketch
+
+    def toBytes(self):
+        """
+        toBytes() -> The sketch as bytes: compression, n, min, max, then the centroid means and weights (float64)
+        """
+        compression, n, low, high, means, weights = self.state()
+        return numpy.concatenate(([compression, n, low, high], means, weights)).astype("<f8").tobytes()
+
+    @classmethod
+    def fromBytes(cls, data):
+        array = numpy.frombuffer(data, dtype="<f8")
+        size = (len(array) - 4) // 2
+        return cls.fromState((array[0], array[1], array[2], array[3], array[4:4 + size].copy(), array[4 + size:].copy()))
+
+    def nbytes(self):
+        return len(self.toBytes())
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = numpy.concatenate([self.means] + [values for values, weights in self._buffer])
+        weights = numpy.concatenate([self.weights] + [weights for values, weights in self._buffer])
+        self._buffer = []
+        self._buffered = 0
+
+        order = numpy.argsort(means)
+        means, weights = means[order], weights[order]
+        n = weights.sum()
+        # Scale function k(q) = compression / pi * asin(2q - 1): one unit of k is narrow in q near 0 and 1 and
+        # wide near the median. Everything starting in the same unit of k becomes one centroid.
+        left = (numpy.cumsum(weights) - weights) / n
+        cluster = numpy.floor(self.compression / numpy.pi * numpy.arcsin(2 * left - 1)).astype(numpy.int64)
+        # Sorted input gives non-decreasing cluster numbers, so the boundaries are where the number changes
+        starts = numpy.flatnonzero(numpy.concatenate(([True], cluster[1:] != cluster[:-1])))
+        self.weights = numpy.add.reduceat(weights, starts)
+        self.means = numpy.add.reduceat(means * weights, starts) / self.weights
+        self.n = float(n)
+
+
+# Benchmark - accuracy and size of the sketch against exact numpy.percentile
+
+def benchmark(size=10 ** 7, shards=8, compressions=(25, 50, 100, 200, 500), percentiles=(1, 5, 25, 50, 75, 90, 95, 99, 99.9)):
+    """
+    benchmark(size=10**7, shards=8, ...) -> Prints, per compression, the sketch size, the worst rank error over the
+    percentiles and the time to build it from shards and merge, against numpy.percentile on the whole array
+    """
+    rng = numpy.random.default_rng(2)
+    data = rng.gamma(4.0, 9.0, size)    # skewed, like ages or latencies
+    q = numpy.asarray(percentiles, dtype=numpy.float64)
+
+    start = time.perf_counter()
+    exact = numpy.percentile(data, q)
+    exactSeconds = time.perf_counter() - start
+    ordered = numpy.sort(data)
+    print("{} values, {} shards; exact numpy.percentile: {:.3f} s, {:,} bytes".format(size, shards, exactSeconds, data.nbytes))
+    print("compression  centroids    bytes   max rank error   max relative error   seconds")
+
+    results = {}
+    for compression in compressions:
+        start = time.perf_counter()
+        sketches = []
+        for shard in numpy.array_split(data, shards):
+            sketch = QuantileSketch(compression)
+            for chunk in numpy.array_split(shard, max(1, len(shard) // 100000)):
+                sketch.update(chunk)
+            sketches.append(QuantileSketch.fromBytes(sketch.toBytes()))
+        total = sketches[0]
+        for sketch in sketches[1:]:
+            total.merge(sketch)
+        estimate = total.percentile(q)
+        seconds = time.perf_counter() - start
+
+        rankError = numpy.abs(numpy.searchsorted(ordered, estimate) / size - q / 100.0).max()
+        relativeError = numpy.abs((estimate - exact) / exact).max()
+        results[compression] = (total.centroids, total.nbytes(), rankError, relativeError, seconds)
+        print("{:>11} {:>10} {:>8} {:>16.5f} {:>20.5f} {:>9.3f}".format(compression, total.centroids, total.nbytes(), rankError, relativeError, seconds))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
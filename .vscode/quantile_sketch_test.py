@@ -0,0 +1,61 @@
+import numpy
+
+from quantile_sketch import QuantileSketch
+
+PERCENTILES = numpy.array([1, 10, 50, 90, 99])
+
+
+def _rankError(data, estimate):
+    ordered = numpy.sort(data)
+    return numpy.abs(numpy.searchsorted(ordered, estimate) / len(data) - PERCENTILES / 100.0).max()
+
+
+class TestQuantileSketch:
+
+    def test_small_data_exact(self):
+        data = [1.0, 5.0, 2.0, 8.0, 3.0]
+        sketch = QuantileSketch().update(data)
+        assert numpy.allclose(sketch.percentile(PERCENTILES), numpy.percentile(data, PERCENTILES))
+
+    def test_accuracy(self):
+        data = numpy.random.default_rng(0).gamma(4.0, 9.0, 200000)
+        sketch = QuantileSketch(compression=100, bufferSize=10000)
+        for chunk in numpy.array_split(data, 20):
+            sketch.update(chunk)
+        assert sketch.count == len(data)
+        assert _rankError(data, sketch.percentile(PERCENTILES)) < 0.01
+        assert sketch.centroids <= 200
+
+    def test_reused_buffer(self):
+        rng = numpy.random.default_rng(1)
+        buffer = numpy.empty(1000)
+        sketch = QuantileSketch(bufferSize=100000)
+        seen = []
+        for _ in range(20):
+            rng.standard_normal(out=buffer)
+            buffer += len(seen)
+            seen.append(buffer.copy())
+            sketch.update(buffer)
+        assert _rankError(numpy.concatenate(seen), sketch.percentile(PERCENTILES)) < 0.01
+
+    def test_reused_weights(self):
+        weights = numpy.ones(3)
+        sketch = QuantileSketch().update([1.0, 2.0, 3.0], weights)
+        weights[:] = 100.0
+        assert sketch.count == 3
+
+    def test_merge_and_bytes(self):
+        rng = numpy.random.default_rng(2)
+        shards = [rng.normal(0.0, 1.0, 50000) for _ in range(4)]
+        sketches = [QuantileSketch.fromBytes(QuantileSketch().update(shard).toBytes()) for shard in shards]
+        total = sketches[0]
+        for sketch in sketches[1:]:
+            total.merge(sketch)
+        data = numpy.concatenate(shards)
+        assert total.count == len(data)
+        assert total.min == data.min() and total.max == data.max()
+        assert _rankError(data, total.percentile(PERCENTILES)) < 0.01
+
+    def test_cdf(self):
+        data = numpy.random.default_rng(3).uniform(0.0, 1.0, 100000)
+        assert abs(QuantileSketch().update(data).cdf(0.25) - 0.25) < 0.01
@@ -0,0 +1,198 @@
+# Batched Linear Regression
+
+# w3school_pythonlinearregression.py fits one line at a time with stats.linregress(x2, y2).
+# Fitting tens of thousands of groups (one line per vehicle fleet) that way is mostly Python call overhead.
+# linregressMany() fits every group at once with vectorized NumPy sums, from either layout:
+# - padded: 2-D x and y with one group per row, plus the number of real values in each row (or NaN padding)
+# - ragged: flat x and y with a group number for every point
+# For very large batches the groups can be split over a process pool.
+
+# E.g.
+"""
+from regression_batch import linregressMany
+
+fit = linregressMany(x, y, groups=fleetIds)    # flat arrays, one fleet id per point
+print(fit.slope[fleet], fit.intercept[fleet], fit.r[fleet])
+
+fit = linregressMany(x2d, y2d, lengths=counts)    # one fleet per row, counts[i] real points in row i
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+from scipy import stats
+
+# Same guard as stats.linregress for t when r is exactly 1 or -1
+TINY = 1.0e-20
+
+# Arrays indexed by group. Groups with fewer than two points or constant x get NaN.
+BatchRegression = namedtuple("BatchRegression", ["slope", "intercept", "r", "p", "std_err", "n"])
+
+
+def linregressPadded(x, y, lengths=None):
+    """
+    linregressPadded(x, y, lengths=None) -> BatchRegression for a 2-D layout with one group per row
+
+    Parameters:
+    x, y: Arrays of shape (groups, maxLength)
+    lengths: Number of real values at the start of each row; when None, NaN marks the padding
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    if x.shape != y.shape or x.ndim != 2:
+        raise Exception("x and y must be 2-D arrays of the same shape, got {} and {}".format(x.shape, y.shape))
+
+    if lengths is None:
+        mask = ~(numpy.isnan(x) | numpy.isnan(y))
+    else:
+        mask = numpy.arange(x.shape[1]) < numpy.asarray(lengths)[:, None]
+
+    n = mask.sum(axis=1)
+    x = numpy.where(mask, x, 0.0)
+    y = numpy.where(mask, y, 0.0)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        meanX = x.sum(axis=1) / n
+        meanY = y.sum(axis=1) / n
+    # Deviations from the group means keep the sums accurate when values sit far from zero
+    dx = numpy.where(mask, x - meanX[:, None], 0.0)
+    dy = numpy.where(mask, y - meanY[:, None], 0.0)
+    return _finish(n, meanX, meanY, (dx * dx).sum(axis=1), (dy * dy).sum(axis=1), (dx * dy).sum(axis=1))
+
+
+def linregressRagged(x, y, groups, groupCount=None):
+    """
+    linregressRagged(x, y, groups, groupCount=None) -> BatchRegression for flat arrays with a group number (0, 1, 2 ...) per point
+    """
+    x = numpy.asarray(x, dtype=numpy.float64).ravel()
+    y = numpy.asarray(y, dtype=numpy.float64).ravel()
+    groups = numpy.asarray(groups).ravel()
+    if not (len(x) == len(y) == len(groups)):
+        raise Exception("x, y and groups must have the same length")
+    groupCount = groupCount or (int(groups.max()) + 1 if len(groups) else 0)
+
+    n = numpy.bincount(groups, minlength=groupCount)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        meanX = numpy.bincount(groups, weights=x, minlength=groupCount) / n
+        meanY = numpy.bincount(groups, weights=y, minlength=groupCount) / n
+    dx = x - meanX[groups]
+    dy = y - meanY[groups]
+    sxx = numpy.bincount(groups, weights=dx * dx, minlength=groupCount)
+    syy = numpy.bincount(groups, weights=dy * dy, minlength=groupCount)
+    sxy = numpy.bincount(groups, weights=dx * dy, minlength=groupCount)
+    return _finish(n, meanX, meanY, sxx, syy, sxy)
+
+
+def linregressMany(x, y, groups=None, lengths=None, processes=None, shards=None):
+    """
+    linregressMany(x, y, groups=None, lengths=None, processes=None, shards=None) -> BatchRegression for every group
+
+    Parameters:
+    x, y: Flat arrays (with groups) or 2-D padded arrays (with lengths, or NaN padding)
+    groups: Group number for every point of flat x and y
+    lengths: Real values per row of padded x and y
+    processes: Fit in a process pool with this many workers (0 means one per CPU); None fits in this process
+    shards: Number of pieces the groups are split into for the pool, defaults to 4 per worker
+    """
+    ragged = groups is not None
+    if processes is None:
+        return linregressRagged(x, y, groups) if ragged else linregressPadded(x, y, lengths)
+
+    workers = processes or os.cpu_count()
+    pieces = _shardRagged(x, y, groups, shards or 4 * workers) if ragged else _shardPadded(x, y, lengths, shards or 4 * workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_fitShard, pieces))
+    return BatchRegression(*(numpy.concatenate(field) for field in zip(*results)))
+
+
+def _finish(n, meanX, meanY, sxx, syy, sxy):
+    # The formulas of stats.linregress, applied to every group at once
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        slope = sxy / sxx
+        intercept = meanY - slope * meanX
+        r = numpy.clip(sxy / numpy.sqrt(sxx * syy), -1.0, 1.0)
+        r = numpy.where(syy == 0.0, numpy.where(sxy == 0.0, numpy.nan, 0.0), r)
+
+        df = n - 2
+        t = r * numpy.sqrt(df / ((1.0 - r + TINY) * (1.0 + r + TINY)))
+        p = 2 * stats.t.sf(numpy.abs(t), df)
+        std_err = numpy.sqrt((1 - r ** 2) * syy / sxx / df)
+
+    # Two points always fit exactly
+    two = n == 2
+    p = numpy.where(two, numpy.where(syy == 0.0, 1.0, 0.0), p)
+    std_err = numpy.where(two, 0.0, std_err)
+
+    bad = (n < 2) | (sxx == 0.0)
+    slope, intercept, r, p, std_err = (numpy.where(bad, numpy.nan, value) for value in (slope, intercept, r, p, std_err))
+    return BatchRegression(slope, intercept, r, p, std_err, n)
+
+
+def _fitShard(piece):
+    kind, x, y, extra, groupCount = piece
+    if kind == "ragged":
+        return linregressRagged(x, y, extra, groupCount)
+    return linregressPadded(x, y, extra)
+
+
+def _shardPadded(x, y, lengths, shards):
+    x = numpy.asarray(x)
+    y = numpy.asarray(y)
+    bounds = numpy.linspace(0, len(x), min(shards, len(x)) + 1).astype(int)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        yield ("padded", x[start:stop], y[start:stop], None if lengths is None else numpy.asarray(lengths)[start:stop], None)
+
+
+def _shardRagged(x, y, groups, shards):
+    # Sort the points by group so every shard gets whole groups, numbered from 0 within the shard
+    groups = numpy.asarray(groups).ravel()
+    order = numpy.argsort(groups, kind="stable")
+    x = numpy.asarray(x).ravel()[order]
+    y = numpy.asarray(y).ravel()[order]
+    groups = groups[order]
+    groupCount = int(groups[-1]) + 1 if len(groups) else 0
+    cuts = numpy.linspace(0, groupCount, min(shards, groupCount) + 1).astype(int)
+    positions = numpy.searchsorted(groups, cuts)
+    for (first, last), (start, stop) in zip(zip(cuts[:-1], cuts[1:]), zip(positions[:-1], positions[1:])):
+        yield ("ragged", x[start:stop], y[start:stop], groups[start:stop] - first, int(last - first))
+
+
+# Benchmark - a stats.linregress() call per group against linregressMany()
+
+def benchmark(groupCount=20000, pointsPerGroup=20, processes=None):
+    """
+    benchmark(groupCount=20000, pointsPerGroup=20, processes=None) -> Prints the time of the per-group loop and the batched fit
+    """
+    rng = numpy.random.default_rng(2)
+    groups = numpy.repeat(numpy.arange(groupCount), pointsPerGroup)
+    x = rng.uniform(0, 20, groups.size)
+    y = rng.normal(100, 10, groupCount)[groups] - rng.uniform(0, 3, groupCount)[groups] * x + rng.normal(0, 5, groups.size)
+
+    start = time.perf_counter()
+    bounds = numpy.arange(0, groups.size + 1, pointsPerGroup)
+    loopSlopes = numpy.array([stats.linregress(x[a:b], y[a:b]).slope for a, b in zip(bounds[:-1], bounds[1:])])
+    loopSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fit = linregressMany(x, y, groups=groups)
+    batchSeconds = time.perf_counter() - start
+
+    if not numpy.allclose(loopSlopes, fit.slope):
+        raise Exception("Batched slopes do not match stats.linregress")
+
+    print("{} groups x {} points".format(groupCount, pointsPerGroup))
+    print("per-group loop: {:8.3f} s".format(loopSeconds))
+    print("linregressMany: {:8.3f} s  ({:.0f}x)".format(batchSeconds, loopSeconds / batchSeconds))
+
+    if processes is not None:
+        start = time.perf_counter()
+        linregressMany(x, y, groups=groups, processes=processes)
+        poolSeconds = time.perf_counter() - start
+        print("process pool:   {:8.3f} s  ({:.0f}x)".format(poolSeconds, loopSeconds / poolSeconds))
+    return loopSeconds, batchSeconds
+
+
+if __name__ == "__main__":
+    benchmark()
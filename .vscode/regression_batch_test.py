@@ -0,0 +1,54 @@
+import numpy
+from scipy import stats
+
+from regression_batch import linregressMany
+
+
+def _data(groupCount=50, seed=0):
+    rng = numpy.random.default_rng(seed)
+    lengths = rng.integers(3, 30, groupCount)
+    groups = numpy.repeat(numpy.arange(groupCount), lengths)
+    x = rng.uniform(0, 20, groups.size)
+    y = rng.normal(100, 10, groupCount)[groups] - rng.uniform(0, 3, groupCount)[groups] * x + rng.normal(0, 5, groups.size)
+    return x, y, groups, lengths
+
+
+def _padded(values, groups, lengths, fill=0.0):
+    out = numpy.full((len(lengths), lengths.max()), fill)
+    starts = numpy.concatenate(([0], numpy.cumsum(lengths)[:-1]))
+    out[groups, numpy.arange(len(groups)) - starts[groups]] = values
+    return out
+
+
+def _assertSameFits(fit, expected):
+    for field in ("slope", "intercept", "r", "p", "std_err", "n"):
+        assert numpy.allclose(getattr(fit, field), getattr(expected, field), equal_nan=True), field
+
+
+class TestLinregressMany:
+
+    def test_ragged_matches_linregress(self):
+        x, y, groups, lengths = _data()
+        fit = linregressMany(x, y, groups=groups)
+        for group in range(len(lengths)):
+            reference = stats.linregress(x[groups == group], y[groups == group])
+            assert numpy.allclose((fit.slope[group], fit.intercept[group], fit.r[group], fit.p[group], fit.std_err[group]),
+                                  (reference.slope, reference.intercept, reference.rvalue, reference.pvalue, reference.stderr))
+        assert (fit.n == lengths).all()
+
+    def test_padded_layouts_match_ragged(self):
+        x, y, groups, lengths = _data(seed=1)
+        ragged = linregressMany(x, y, groups=groups)
+        _assertSameFits(linregressMany(_padded(x, groups, lengths), _padded(y, groups, lengths), lengths=lengths), ragged)
+        _assertSameFits(linregressMany(_padded(x, groups, lengths, numpy.nan), _padded(y, groups, lengths, numpy.nan)), ragged)
+
+    def test_process_pool_matches_serial(self):
+        x, y, groups, lengths = _data(groupCount=37, seed=2)
+        _assertSameFits(linregressMany(x, y, groups=groups, processes=2, shards=5), linregressMany(x, y, groups=groups))
+        px, py = _padded(x, groups, lengths), _padded(y, groups, lengths)
+        _assertSameFits(linregressMany(px, py, lengths=lengths, processes=2, shards=5), linregressMany(px, py, lengths=lengths))
+
+    def test_degenerate_groups_are_nan(self):
+        fit = linregressMany([1.0, 1.0, 1.0, 5.0, 2.0, 3.0], [1.0, 2.0, 3.0, 4.0, 1.0, 2.0], groups=[0, 0, 0, 1, 2, 2])
+        assert numpy.isnan(fit.slope[:2]).all()
+        assert fit.slope[2] == 1.0 and fit.p[2] == 0.0 and fit.std_err[2] == 0.0
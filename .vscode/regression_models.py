@@ -0,0 +1,248 @@
+# Regression Models
+
+# w3school_pythonlinearregression.py computes the line with list(map(myfunc, x)), where myfunc reads the global slope and intercept.
+# That is a Python function call per point, and after the second stats.linregress() call the globals no longer match the line being drawn.
+# LinearModel keeps its own fitted parameters and predicts a whole NumPy array at once.
+
+# E.g.
+"""
+from regression_models import LinearModel
+
+model = LinearModel.fit(x, y)
+mymodel = model.predict(x)     # or model(x)
+
+print("{:.2f}".format(model.r))
+print("{:.2f} mph".format(model.predict(10)))
+"""
+
+import time
+
+import numpy
+from scipy import stats
+
+# Points predicted at a time when working through a large (e.g. memory-mapped) input
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class LinearModel:
+    """
+    LinearModel(slope, intercept, r=None, p=None, std_err=None) -> A fitted line y = slope * x + intercept
+
+    Use LinearModel.fit(x, y) to build one from data; the other values match what stats.linregress() returns.
+    """
+
+    def __init__(self, slope, intercept, r=None, p=None, std_err=None):
+        self.slope = float(slope)
+        self.intercept = float(intercept)
+        self.r = r
+        self.p = p
+        self.std_err = std_err
+
+    @classmethod
+    def fit(cls, x, y):
+        result = stats.linregress(x, y)
+        return cls(result.slope, result.intercept, result.rvalue, result.pvalue, result.stderr)
+
+    def predict(self, x, out=None):
+        """
+        predict(x, out=None) -> slope * x + intercept for a number or a whole array
+
+        Parameters:
+        x: A number, list or NumPy array
+        out: Optional float array of the same shape to write into instead of allocating a new one
+        """
+        x = numpy.asarray(x, dtype=numpy.float64)
+        out = numpy.multiply(x, self.slope, out=out)
+        out += self.intercept
+        return out if out.ndim else float(out)
+
+    __call__ = predict
+
+    def predictChunks(self, chunks):
+        """
+        predictChunks(chunks) -> Yields the predictions for each array in an iterable of chunks (e.g. read from a file piece by piece)
+        """
+        for chunk in chunks:
+            yield self.predict(chunk)
+
+    def predictInto(self, x, out, chunkSize=DEFAULT_CHUNK_SIZE):
+        """
+        predictInto(x, out, chunkSize=1048576) -> Fills out with the predictions for x, chunkSize points at a time
+
+        Works on numpy.memmap arrays too, so inputs and outputs larger than memory only ever have one chunk loaded.
+        """
+        if len(out) != len(x):
+            raise Exception("out has {} points but x has {}".format(len(out), len(x)))
+        for start in range(0, len(x), chunkSize):
+            stop = start + chunkSize
+            out[start:stop] = self.predict(x[start:stop])
+        return out
+
+    def __repr__(self):
+        return "LinearModel(slope={!r}, intercept={!r})".format(self.slope, self.intercept)
+
+
+# Online Linear Regression
+# stats.linregress(x, y) needs every observation in memory. OnlineLinearRegression takes the age/speed observations
+# in mini-batches as they arrive and keeps only a handful of running values: the count, the means and the sums of squared
+# deviations from the means (the numerically stable form of n, Σx, Σy, Σxy, Σx² and Σy²).
+# Two partial states merge exactly (Chan et al.), so shards fitted in different processes can be combined.
+
+# E.g.
+"""
+from regression_models import OnlineLinearRegression
+
+online = OnlineLinearRegression()
+for ages, speeds in batches:
+    online.update(ages, speeds)
+
+slope, intercept, r, p, std_err = online.result()    # same values as stats.linregress on all the data
+"""
+
+# Keeps t finite when r is exactly 1 or -1, as stats.linregress does
+TINY = 1.0e-20
+
+
+class OnlineLinearRegression:
+
+    def __init__(self):
+        self.n = 0
+        self.meanX = 0.0
+        self.meanY = 0.0
+        self.sxx = 0.0    # Σ(x - meanX)²
+        self.syy = 0.0    # Σ(y - meanY)²
+        self.sxy = 0.0    # Σ(x - meanX)(y - meanY)
+
+    def update(self, x, y):
+        """
+        update(x, y) -> Adds a mini-batch of observations and returns self
+        """
+        x = numpy.asarray(x, dtype=numpy.float64).ravel()
+        y = numpy.asarray(y, dtype=numpy.float64).ravel()
+        if len(x) != len(y):
+            raise Exception("x has {} values but y has {}".format(len(x), len(y)))
+        if len(x) == 0:
+            return self
+
+        batch = OnlineLinearRegression()
+        batch.n = len(x)
+        batch.meanX = float(x.mean())
+        batch.meanY = float(y.mean())
+        dx = x - batch.meanX
+        dy = y - batch.meanY
+        batch.sxx = float(dx @ dx)
+        batch.syy = float(dy @ dy)
+        batch.sxy = float(dx @ dy)
+        return self.merge(batch)
+
+    def merge(self, other):
+        """
+        merge(other) -> Folds another OnlineLinearRegression (e.g. from another shard) into this one and returns self
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.meanX, self.meanY = other.n, other.meanX, other.meanY
+            self.sxx, self.syy, self.sxy = other.sxx, other.syy, other.sxy
+            return self
+
+        n = self.n + other.n
+        dx = other.meanX - self.meanX
+        dy = other.meanY - self.meanY
+        weight = self.n * other.n / n
+
+        self.meanX += dx * other.n / n
+        self.meanY += dy * other.n / n
+        self.sxx += other.sxx + dx * dx * weight
+        self.syy += other.syy + dy * dy * weight
+        self.sxy += other.sxy + dx * dy * weight
+        self.n = n
+        return self
+
+    def result(self):
+        """
+        result() -> (slope, intercept, r, p, std_err) computed the same way as stats.linregress
+        """
+        if self.n < 2:
+            raise Exception("At least two observations are needed, got {}".format(self.n))
+        if self.sxx == 0.0:
+            raise Exception("Cannot fit a line when all x values are identical")
+
+        if self.syy == 0.0:
+            r = numpy.nan if self.sxy == 0 else 0.0
+        else:
+            r = min(1.0, max(-1.0, self.sxy / numpy.sqrt(self.sxx * self.syy)))
+
+        slope = self.sxy / self.sxx
+        intercept = self.meanY - slope * self.meanX
+
+        if self.n == 2:
+            p = 1.0 if self.syy == 0.0 else 0.0
+            std_err = 0.0
+        else:
+            df = self.n - 2
+            t = r * numpy.sqrt(df / ((1.0 - r + TINY) * (1.0 + r + TINY)))
+            p = 2 * stats.t.sf(abs(t), df)
+            std_err = numpy.sqrt((1 - r ** 2) * self.syy / self.sxx / df)
+
+        return slope, intercept, r, p, std_err
+
+    def model(self):
+        """
+        model() -> The current fit as a LinearModel
+        """
+        return LinearModel(*self.result())
+
+    def state(self):
+        """
+        state() -> Plain tuple of the running values, small enough to send between processes
+        """
+        return (self.n, self.meanX, self.meanY, self.sxx, self.syy, self.sxy)
+
+    @classmethod
+    def fromState(cls, state):
+        online = cls()
+        online.n, online.meanX, online.meanY, online.sxx, online.syy, online.sxy = state
+        return online
+
+
+# Benchmark - list(map(myfunc, x)) against LinearModel.predict()
+
+def benchmark(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8), mapLimit=10 ** 7):
+    """
+    benchmark(sizes=(10**3 ... 10**8), mapLimit=10**7) -> Prints the time of both paths for each number of points
+
+    The map path builds a Python list of floats (about 32 bytes a point), so it is skipped above mapLimit points.
+    """
+    model = LinearModel(-1.75, 103.1)
+    slope, intercept = model.slope, model.intercept
+
+    def myfunc(x):
+        return slope * x + intercept
+
+    results = {}
+    for size in sizes:
+        x = numpy.random.default_rng(size).uniform(0, 20, size)
+
+        mapSeconds = None
+        if size <= mapLimit:
+            values = x.tolist()
+            start = time.perf_counter()
+            list(map(myfunc, values))
+            mapSeconds = time.perf_counter() - start
+
+        out = numpy.empty_like(x)
+        start = time.perf_counter()
+        model.predict(x, out=out)
+        vectorSeconds = time.perf_counter() - start
+
+        results[size] = (mapSeconds, vectorSeconds)
+        if mapSeconds is None:
+            print("{:>11} points  map: {:>10}  predict: {:9.4f} s".format(size, "skipped", vectorSeconds))
+        else:
+            print("{:>11} points  map: {:8.4f} s  predict: {:9.4f} s  ({:.0f}x)".format(size, mapSeconds, vectorSeconds, mapSeconds / vectorSeconds))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,83 @@
+import numpy
+import pytest
+from scipy import stats
+
+from regression_models import LinearModel, OnlineLinearRegression
+
+X = [5, 7, 8, 7, 2, 17, 2, 9, 4, 11, 12, 9, 6]
+Y = [99, 86, 87, 88, 111, 86, 103, 87, 94, 78, 77, 85, 86]
+
+
+class TestLinearModel:
+
+    def test_matches_linregress(self):
+        model = LinearModel.fit(X, Y)
+        slope, intercept, r, p, std_err = stats.linregress(X, Y)
+        assert (model.slope, model.intercept, model.r, model.p, model.std_err) == (slope, intercept, r, p, std_err)
+        assert numpy.allclose(model.predict(X), [slope * x + intercept for x in X])
+        assert model(10) == slope * 10 + intercept
+
+    def test_out_and_chunks(self):
+        model = LinearModel(-1.75, 103.1)
+        x = numpy.random.default_rng(0).uniform(0, 20, 1001)
+        expected = -1.75 * x + 103.1
+        out = numpy.empty_like(x)
+        assert model.predict(x, out=out) is out and numpy.allclose(out, expected)
+        assert numpy.allclose(model.predictInto(x, numpy.empty_like(x), chunkSize=100), expected)
+        assert numpy.allclose(numpy.concatenate(list(model.predictChunks(numpy.array_split(x, 7)))), expected)
+
+    def test_predict_into_memmap(self, tmp_path):
+        x = numpy.arange(1000.0)
+        out = numpy.lib.format.open_memmap(str(tmp_path / "predictions.npy"), mode="w+", dtype=numpy.float64, shape=x.shape)
+        LinearModel(2.0, 1.0).predictInto(x, out, chunkSize=64)
+        out.flush()
+        assert (numpy.load(str(tmp_path / "predictions.npy")) == 2.0 * x + 1.0).all()
+        with pytest.raises(Exception) as exc_info:
+            LinearModel(2.0, 1.0).predictInto(x, numpy.empty(10))
+        assert "out has 10 points" in str(exc_info)
+
+
+class TestOnlineLinearRegression:
+
+    def _assertMatchesLinregress(self, online, x, y, rtol=1e-9):
+        expected = stats.linregress(x, y)
+        assert numpy.allclose(online.result(), (expected.slope, expected.intercept, expected.rvalue, expected.pvalue, expected.stderr), rtol=rtol, atol=1e-12)
+
+    def test_batches_match_linregress(self):
+        rng = numpy.random.default_rng(1)
+        x = rng.uniform(0, 20, 5000)
+        y = 103.1 - 1.75 * x + rng.normal(0.0, 4.0, 5000)
+        online = OnlineLinearRegression()
+        for xs, ys in zip(numpy.array_split(x, 13), numpy.array_split(y, 13)):
+            online.update(xs, ys)
+        self._assertMatchesLinregress(online, x, y)
+        self._assertMatchesLinregress(OnlineLinearRegression().update(X, Y), X, Y)
+
+    def test_large_offset_stays_accurate(self):
+        # Raw sums of squares would lose every significant digit here; float64 x itself only holds about 7 digits of
+        # the spread, so that is all either fit can agree on
+        rng = numpy.random.default_rng(2)
+        x = 1e9 + rng.uniform(0, 1, 2000)
+        y = 3.0 * (x - 1e9) + rng.normal(0.0, 0.1, 2000)
+        online = OnlineLinearRegression()
+        for start in range(0, 2000, 300):
+            online.update(x[start:start + 300], y[start:start + 300])
+        self._assertMatchesLinregress(online, x, y, rtol=1e-6)
+
+    def test_merged_shards_and_state(self):
+        rng = numpy.random.default_rng(3)
+        x, y = rng.normal(5.0, 2.0, 3000), rng.normal(0.0, 1.0, 3000)
+        shards = [OnlineLinearRegression.fromState(OnlineLinearRegression().update(x[i::3], y[i::3]).state()) for i in range(3)]
+        total = OnlineLinearRegression()
+        for shard in shards:
+            total.merge(shard)
+        self._assertMatchesLinregress(total, numpy.concatenate([x[i::3] for i in range(3)]), numpy.concatenate([y[i::3] for i in range(3)]))
+        assert total.model().slope == total.result()[0]
+
+    def test_two_points_and_bad_input(self):
+        self._assertMatchesLinregress(OnlineLinearRegression().update([1.0, 2.0], [3.0, 5.0]), [1.0, 2.0], [3.0, 5.0])
+        with pytest.raises(Exception) as exc_info:
+            OnlineLinearRegression().update([1.0, 1.0, 1.0], [1.0, 2.0, 3.0]).result()
+        assert "all x values are identical" in str(exc_info)
+        with pytest.raises(Exception):
+            OnlineLinearRegression().update([1.0, 2.0], [1.0])
@@ -0,0 +1,105 @@
+import os
+import sys
+
+import numpy
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from stats_engine import StatsAccumulator, _longestRun, describe
+
+
+def _expected(data, percentiles):
+    return (numpy.mean(data), numpy.var(data), numpy.min(data), numpy.max(data), stats.mode(data, keepdims=True).mode[0],
+            {q: numpy.percentile(data, q) for q in percentiles})
+
+
+def _assertMatches(summary, data, percentiles=(10, 50, 90)):
+    mean, var, low, high, mode, expected = _expected(data, percentiles)
+    assert summary.count == len(data)
+    assert numpy.isclose(summary.mean, mean)
+    assert numpy.isclose(summary.var, var)
+    assert summary.min == low and summary.max == high
+    assert summary.mode == mode
+    for q in percentiles:
+        assert numpy.isclose(summary.percentiles[q], expected[q])
+
+
+class TestDescribe:
+
+    def test_speed_example(self):
+        speed = [99, 86, 87, 88, 111, 86, 103, 87, 94, 78, 77, 85, 86]
+        summary = describe(speed)
+        assert summary.mode == 86 and summary.modeCount == 3
+        assert summary.percentiles[50] == 87.0
+
+    def test_integers_counted(self):
+        data = numpy.random.default_rng(0).integers(0, 100, 10000)
+        _assertMatches(describe(data, percentiles=(10, 50, 90), chunkSize=999), data)
+
+    def test_floats_stored(self):
+        data = numpy.random.default_rng(1).normal(0.0, 1.0, 10000)
+        _assertMatches(describe(data, percentiles=(10, 50, 90), chunkSize=999), data)
+
+    def test_sample_variance(self):
+        data = numpy.random.default_rng(2).normal(5.0, 2.0, 1000)
+        assert numpy.isclose(describe(data, ddof=1).var, numpy.var(data, ddof=1))
+
+
+class TestStatsAccumulator:
+
+    def test_reused_buffer(self):
+        rng = numpy.random.default_rng(3)
+        buffer = numpy.empty(1000)
+        stats = StatsAccumulator(percentiles=(10, 50, 90))
+        seen = []
+        for _ in range(10):
+            rng.standard_normal(out=buffer)
+            seen.append(buffer.copy())
+            stats.update(buffer)
+        _assertMatches(stats.result(), numpy.concatenate(seen))
+
+    def test_result_again_after_more_data(self):
+        rng = numpy.random.default_rng(6)
+        first, second = numpy.round(rng.normal(0.0, 3.0, 2000), 1), numpy.round(rng.normal(0.0, 3.0, 2000), 1)
+        accumulator = StatsAccumulator(percentiles=(10, 50, 90)).update(first)
+        _assertMatches(accumulator.result(), first)
+        _assertMatches(accumulator.update(second).result(), numpy.concatenate((first, second)))
+
+    def test_mode_runs_across_blocks(self):
+        rng = numpy.random.default_rng(7)
+        for _ in range(100):
+            data = numpy.sort(rng.integers(0, 20, 50)).astype(numpy.float64)
+            reference = stats.mode(data, keepdims=True)
+            for blockSize in (1, 2, 3, 7, 64):
+                assert _longestRun(data, blockSize) == (reference.mode[0], reference.count[0])
+
+    def test_switch_from_counting_to_stored(self):
+        rng = numpy.random.default_rng(4)
+        chunks = [rng.integers(0, 10, 500), rng.integers(0, 10, 500) * 1000, rng.normal(0.0, 1.0, 500)]
+        stats = StatsAccumulator(percentiles=(10, 50, 90), countingRange=100)
+        for chunk in chunks:
+            stats.update(chunk)
+        assert not stats.counting
+        _assertMatches(stats.result(), numpy.concatenate(chunks))
+
+    def test_merge(self):
+        rng = numpy.random.default_rng(5)
+        for make in (lambda: rng.integers(-50, 50, 1000), lambda: rng.normal(0.0, 1.0, 1000)):
+            left, right = make(), make()
+            merged = StatsAccumulator(percentiles=(10, 50, 90)).update(left).merge(StatsAccumulator().update(right))
+            _assertMatches(merged.result(), numpy.concatenate((left, right)))
+
+    def test_merge_counting_into_stored(self):
+        rng = numpy.random.default_rng(6)
+        floats, integers = rng.normal(0.0, 1.0, 1000), rng.integers(0, 5, 1000)
+        merged = StatsAccumulator(percentiles=(10, 50, 90)).update(floats).merge(StatsAccumulator().update(integers))
+        _assertMatches(merged.result(), numpy.concatenate((floats, integers)))
+
+    def test_nan_rejected(self):
+        try:
+            StatsAccumulator().update([1.0, numpy.nan])
+        except Exception as error:
+            assert "NaN" in str(error)
+        else:
+            raise AssertionError("NaN was accepted")
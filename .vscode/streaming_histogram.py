@@ -0,0 +1,259 @@
+# Streaming Histogram
+
+# w3school_pythondatadistribution.py and w3school_pythonnormaldatadistribution.py generate all their samples into one
+# array and pass it to plt.hist(), so memory grows with the sample count.
+# StreamingHistogram counts values a chunk at a time, so only one chunk and the bin counts are ever in memory.
+# Bins are either fixed (a range and a bin count, as plt.hist(x, 100, range=...) would use) or adaptive: the bin width
+# is a power of two and doubles, merging neighbouring bins, whenever the data outgrows the current range. Because
+# adaptive bins always sit on the same power-of-two grid, histograms counted in separate worker processes merge
+# exactly. plot() draws from the counts alone.
+
+# E.g.
+"""
+from streaming_histogram import StreamingHistogram
+
+hist = StreamingHistogram(100, range=(0.0, 5.0))
+for _ in range(1000):
+    hist.update(numpy.random.uniform(0.0, 5.0, 100000))
+hist.plot()
+plt.title("Randomdly Distributed Numbers")
+plt.show()
+
+hist = StreamingHistogram(100).fit(chunks)    # adaptive bins
+"""
+
+import math
+import time
+
+import numpy
+
+
+class StreamingHistogram:
+    """
+    StreamingHistogram(bins=100, range=None) -> Bin counts accumulated over chunks of values
+
+    Parameters:
+    bins: Number of bins
+    range: (low, high) for fixed, equal-width bins, with values outside counted in underflow/overflow as plt.hist leaves them out;
+           None for adaptive bins that always cover every value seen
+    """
+
+    def __init__(self, bins=100, range=None):
+        self.bins = int(bins)
+        self.fixed = range is not None
+        self.counts = numpy.zeros(self.bins, dtype=numpy.int64)
+        self.n = 0
+        self.min = numpy.inf
+        self.max = -numpy.inf
+        self.underflow = 0
+        self.overflow = 0
+        if self.fixed:
+            low, high = float(range[0]), float(range[1])
+            if not high > low:
+                raise Exception("range must be (low, high) with high > low, got {}".format(range))
+            self.low = low
+            self.width = (high - low) / self.bins
+            self.high = high
+        else:
+            # Set by the first chunk; the low edge is always a whole multiple of the width
+            self.low = None
+            self.width = None
+
+    @property
+    def edges(self):
+        if self.low is None:
+            raise Exception("No data")
+        if self.fixed:
+            return numpy.linspace(self.low, self.high, self.bins + 1)
+        return self.low + self.width * numpy.arange(self.bins + 1)
+
+    def update(self, chunk):
+        """
+        update(chunk) -> Counts the values of chunk (any shape, flattened) and returns self
+        """
+        values = numpy.asarray(chunk, dtype=numpy.float64).ravel()
+        if len(values) == 0:
+            return self
+        low, high = float(values.min()), float(values.max())
+        if math.isnan(low) or math.isnan(high):
+            raise Exception("Data contains NaN")
+        self.n += len(values)
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+        if self.fixed:
+            inside = (values >= self.low) & (values <= self.high)
+            self.underflow += int((values < self.low).sum())
+            self.overflow += int((values > self.high).sum())
+            values = values[inside]
+            index = ((values - self.low) * (self.bins / (self.high - self.low))).astype(numpy.int64)
+            # The top edge belongs to the last bin; then the same rounding corrections numpy.histogram makes against the
+            # edges, so values on an edge land in the same bin
+            numpy.minimum(index, self.bins - 1, out=index)
+            edges = self.edges
+            index -= values < edges[index]
+            index += (values >= edges[index + 1]) & (index != self.bins - 1)
+        else:
+            self._cover(low, high)
+            index = ((values - self.low) / self.width).astype(numpy.int64)
+        self.counts += numpy.bincount(index, minlength=self.bins)
+        return self
+
+    def fit(self, chunks):
+        """
+        fit(chunks) -> Runs update over an iterable of chunks and returns self
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other):
+        """
+        merge(other) -> Adds the counts of another histogram (e.g. from a worker process) and returns self
+
+        Fixed histograms must have the same bins and range. Adaptive histograms are brought to the wider of the two
+        bin widths first, which is exact because both sit on the same power-of-two grid.
+        """
+        if other.n == 0:
+            return self
+        if self.fixed != other.fixed or self.bins != other.bins:
+            raise Exception("Can only merge histograms with the same number and kind of bins")
+        if self.fixed:
+            if (self.low, self.high) != (other.low, other.high):
+                raise Exception("Fixed histograms have different ranges: {} and {}".format((self.low, self.high), (other.low, other.high)))
+            self.counts += other.counts
+            self.underflow += other.underflow
+            self.overflow += other.overflow
+        elif self.low is None:
+            self.low, self.width, self.counts = other.low, other.width, other.counts.copy()
+        else:
+            other = StreamingHistogram.fromState(other.state())
+            while other.width < self.width:
+                other._double()
+            while self.width < other.width:
+                self._double()
+            # Covering other's bins can double self's width again; other follows so both stay on the same grid
+            used = numpy.flatnonzero(other.counts)
+            while not self._coverBins(self._offset(other) + used[0], self._offset(other) + used[-1]):
+                self._double()
+                other._double()
+                used = numpy.flatnonzero(other.counts)
+            self.counts[self._offset(other) + used] += other.counts[used]
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def density(self):
+        """
+        density() -> Counts scaled so the histogram's area is 1, as plt.hist(density=True) draws it
+        """
+        return self.counts / (self.counts.sum() * numpy.diff(self.edges))
+
+    def plot(self, ax=None, **options):
+        """
+        plot(ax=None, **options) -> Draws the bars with plt.hist from the counts; options go to hist (e.g. density=True, color=...)
+        """
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        edges = self.edges
+        return ax.hist(edges[:-1], bins=edges, weights=self.counts, **options)
+
+    def state(self):
+        """
+        state() -> Picklable tuple; fromState(state()) rebuilds the histogram
+        """
+        return (self.bins, self.fixed, self.low, self.width, self.high if self.fixed else None, self.counts.copy(), self.n,
+                self.min, self.max, self.underflow, self.overflow)
+
+    @classmethod
+    def fromState(cls, state):
+        bins, fixed, low, width, high, counts, n, minimum, maximum, underflow, overflow = state
+        histogram = cls(bins, (low, high) if fixed else None)
+        histogram.low, histogram.width = low, width
+        histogram.counts = numpy.array(counts, dtype=numpy.int64)
+        histogram.n, histogram.min, histogram.max = n, minimum, maximum
+        histogram.underflow, histogram.overflow = underflow, overflow
+        return histogram
+
+    def _offset(self, other):
+        # Bin number in self of other's first bin; exact because both low edges are multiples of the shared width
+        return int(round((other.low - self.low) / self.width))
+
+    def _cover(self, low, high):
+        # Adaptive bins: make [low, high] fall inside the bins, doubling the width as often as needed
+        if self.low is None:
+            span = high - low or abs(low) or 1.0
+            # Round the width up to a power of two so that high itself lands inside the last bin
+            self.width = 2.0 ** math.ceil(math.log2(span / self.bins))
+            while math.floor(high / self.width) - math.floor(low / self.width) >= self.bins:
+                self.width *= 2.0
+            self.low = math.floor(low / self.width) * self.width
+            return
+        while not self._coverBins(math.floor((low - self.low) / self.width), math.floor((high - self.low) / self.width)):
+            self._double()
+
+    def _coverBins(self, first, last):
+        # Slides the bins so that bin numbers first..last (relative to the current low edge) fit; False if they cannot at this width
+        used = numpy.flatnonzero(self.counts)
+        if len(used):
+            first, last = min(first, used[0]), max(last, used[-1])
+        if last - first >= self.bins:
+            return False
+        shift = first if first < 0 else (last - self.bins + 1 if last >= self.bins else 0)
+        if shift:
+            shifted = numpy.zeros_like(self.counts)
+            kept = self.counts[max(0, shift):self.bins + min(0, shift)]
+            shifted[max(0, -shift):max(0, -shift) + len(kept)] = kept
+            self.counts = shifted
+            self.low += shift * self.width
+        return True
+
+    def _double(self):
+        # Merge neighbouring bins pairwise onto the grid of twice the width
+        wider = 2.0 * self.width
+        newLow = math.floor(self.low / wider) * wider
+        start = int(round((self.low - newLow) / self.width))    # 0 or 1
+        target = (numpy.arange(self.bins) + start) // 2
+        self.counts = numpy.bincount(target, weights=self.counts, minlength=self.bins).astype(numpy.int64)[:self.bins]
+        self.low, self.width = newLow, wider
+
+
+# Benchmark - peak memory and time of chunked counting against building the whole array for numpy.histogram
+
+def benchmark(samples=10 ** 8, chunkSize=10 ** 6, bins=100):
+    """
+    benchmark(samples=10**8, chunkSize=10**6, bins=100) -> Prints time and peak traced memory of StreamingHistogram over
+    generated chunks, and of numpy.histogram on one array of the same samples (for fewer samples if that would not fit)
+    """
+    import tracemalloc
+
+    def chunks(count):
+        rng = numpy.random.default_rng(2)
+        for start in range(0, count, chunkSize):
+            yield rng.normal(5.0, 1.0, min(chunkSize, count - start))
+
+    for label, histogram in (("fixed", StreamingHistogram(bins, range=(0.0, 10.0))), ("adaptive", StreamingHistogram(bins))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        histogram.fit(chunks(samples))
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("StreamingHistogram {:<8} {} samples: {:8.2f} s, peak {:>14,} bytes".format(label, samples, seconds, peak))
+
+    wholeSamples = min(samples, 10 ** 7)
+    tracemalloc.start()
+    start = time.perf_counter()
+    x = numpy.concatenate(list(chunks(wholeSamples)))
+    numpy.histogram(x, bins)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del x
+    print("numpy.histogram on one array, {} samples: {:8.2f} s, peak {:>14,} bytes".format(wholeSamples, seconds, peak))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,66 @@
+import numpy
+import pytest
+
+from streaming_histogram import StreamingHistogram
+
+
+class TestFixedBins:
+
+    def test_matches_numpy_histogram(self):
+        data = numpy.random.default_rng(0).uniform(0.0, 5.0, 100000)
+        histogram = StreamingHistogram(100, range=(0.0, 5.0)).fit(numpy.array_split(data, 7))
+        counts, edges = numpy.histogram(data, 100, range=(0.0, 5.0))
+        assert (histogram.counts == counts).all()
+        assert numpy.allclose(histogram.edges, edges)
+
+    def test_values_on_edges(self):
+        data = numpy.linspace(0.0, 1.0, 11)
+        histogram = StreamingHistogram(10, range=(0.0, 1.0)).update(data)
+        assert (histogram.counts == numpy.histogram(data, 10, range=(0.0, 1.0))[0]).all()
+
+    def test_outside_range_counted_separately(self):
+        histogram = StreamingHistogram(4, range=(0.0, 1.0)).update([-1.0, 0.5, 2.0, 3.0])
+        assert histogram.counts.sum() == 1
+        assert (histogram.underflow, histogram.overflow) == (1, 2)
+
+    def test_merge_needs_same_range(self):
+        left = StreamingHistogram(10, range=(0.0, 1.0)).update([0.5])
+        with pytest.raises(Exception) as exc_info:
+            left.merge(StreamingHistogram(10, range=(0.0, 2.0)).update([0.5]))
+        assert "different ranges" in str(exc_info)
+
+    def test_nan_rejected(self):
+        with pytest.raises(Exception) as exc_info:
+            StreamingHistogram(10, range=(0.0, 1.0)).update([numpy.nan])
+        assert "NaN" in str(exc_info)
+
+
+class TestAdaptiveBins:
+
+    def _assertExact(self, histogram, data):
+        # Every value must land in the bin whose edges hold it
+        assert histogram.counts.sum() == len(data) == histogram.n
+        assert (histogram.counts == numpy.histogram(data, histogram.edges)[0]).all()
+        assert histogram.edges[0] <= data.min() and data.max() < histogram.edges[-1]
+
+    def test_covers_growing_data(self):
+        rng = numpy.random.default_rng(1)
+        chunks = [rng.normal(5.0, 1.0, 1000), rng.normal(50.0, 1.0, 1000), rng.normal(-200.0, 5.0, 1000)]
+        histogram = StreamingHistogram(64).fit(chunks)
+        self._assertExact(histogram, numpy.concatenate(chunks))
+        assert numpy.log2(histogram.width) == int(numpy.log2(histogram.width))
+
+    def test_merge_is_exact(self):
+        rng = numpy.random.default_rng(2)
+        left, right = rng.normal(0.0, 1.0, 5000), rng.normal(30.0, 10.0, 5000)
+        merged = StreamingHistogram(50).update(left).merge(StreamingHistogram(50).update(right))
+        self._assertExact(merged, numpy.concatenate((left, right)))
+
+    def test_state_round_trip(self):
+        histogram = StreamingHistogram(20).update(numpy.arange(100.0))
+        copy = StreamingHistogram.fromState(histogram.state())
+        assert (copy.counts == histogram.counts).all() and (copy.edges == histogram.edges).all()
+
+    def test_density_integrates_to_one(self):
+        histogram = StreamingHistogram(30).update(numpy.random.default_rng(3).normal(0.0, 1.0, 1000))
+        assert numpy.isclose((histogram.density() * numpy.diff(histogram.edges)).sum(), 1.0)
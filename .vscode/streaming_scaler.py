@@ -0,0 +1,188 @@
+# Streaming Standard Scaler
+
+# w3school_pythonscale.py scales with StandardScaler().fit_transform(X) on the whole DataFrame, and its commented block
+# works out mean() and std() column by column by hand.
+# StreamingScaler computes every column's mean and variance in one pass over chunked or streamed input: each chunk's
+# mean and squared deviations are taken with NumPy, then folded into the running values with Chan's pairwise formula,
+# so partial results from several workers merge exactly.
+# transform() scales a float array in place, so scaling a chunk does not allocate a second copy of it.
+
+# E.g.
+"""
+from streaming_scaler import StreamingScaler
+
+scale = StreamingScaler()
+for chunk in chunks:
+    scale.partialFit(chunk)
+
+scaledX = scale.transform(X.to_numpy(dtype="float64"))    # X's values are overwritten with the scaled ones
+scaled = scale.transform([[2300, 1.3]], copy=True)
+"""
+
+import time
+
+import numpy
+
+
+class StreamingScaler:
+    """
+    StreamingScaler() -> Running count, mean and sum of squared deviations for every column
+
+    mean_, var_ and scale_ match sklearn's StandardScaler (population variance, scale 1 for constant columns).
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_ = None
+        self.m2 = None    # Σ(x - mean)² per column
+
+    def partialFit(self, X):
+        """
+        partialFit(X) -> Adds a chunk of rows (2-D, one column per feature) and returns self
+        """
+        X = numpy.asarray(X, dtype=numpy.float64)
+        if X.ndim == 1:
+            X = X[:, None]
+        if len(X) == 0:
+            return self
+        chunk = StreamingScaler()
+        chunk.n = len(X)
+        chunk.mean_ = X.mean(axis=0)
+        chunk.m2 = ((X - chunk.mean_) ** 2).sum(axis=0)
+        return self.merge(chunk)
+
+    def fit(self, chunks):
+        """
+        fit(chunks) -> Runs partialFit over an iterable of chunks and returns self
+        """
+        for chunk in chunks:
+            self.partialFit(chunk)
+        return self
+
+    def merge(self, other):
+        """
+        merge(other) -> Combines the statistics of another StreamingScaler (e.g. from another worker) into this one and returns self
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean_, self.m2 = other.n, other.mean_.copy(), other.m2.copy()
+            return self
+        if other.mean_.shape != self.mean_.shape:
+            raise Exception("Cannot merge scalers with {} and {} columns".format(len(self.mean_), len(other.mean_)))
+        n = self.n + other.n
+        delta = other.mean_ - self.mean_
+        self.m2 += other.m2 + delta * delta * (self.n * other.n / n)
+        self.mean_ += delta * (other.n / n)
+        self.n = n
+        return self
+
+    @property
+    def var_(self):
+        self._checkFitted()
+        return self.m2 / self.n
+
+    @property
+    def scale_(self):
+        scale = numpy.sqrt(self.var_)
+        return numpy.where(scale == 0.0, 1.0, scale)
+
+    def std(self, ddof=0):
+        """
+        std(ddof=0) -> Standard deviation per column; ddof=1 gives the sample value that pandas' std() reports
+        """
+        self._checkFitted()
+        return numpy.sqrt(self.m2 / (self.n - ddof))
+
+    def transform(self, X, copy=False):
+        """
+        transform(X, copy=False) -> (X - mean_) / scale_
+
+        A writable float64 NumPy array is scaled in place and returned; anything else (lists, ints, read-only arrays)
+        is converted to a new float64 array first, as is X when copy=True.
+        """
+        self._checkFitted()
+        X = self._floatBuffer(X, copy)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+    def inverseTransform(self, X, copy=False):
+        self._checkFitted()
+        X = self._floatBuffer(X, copy)
+        X *= self.scale_
+        X += self.mean_
+        return X
+
+    def state(self):
+        """
+        state() -> (n, mean, m2), small enough to send between processes
+        """
+        return (self.n, self.mean_, self.m2)
+
+    @classmethod
+    def fromState(cls, state):
+        scaler = cls()
+        scaler.n, scaler.mean_, scaler.m2 = state
+        return scaler
+
+    def _checkFitted(self):
+        if self.n == 0:
+            raise Exception("StreamingScaler has not seen any data yet")
+
+    @staticmethod
+    def _floatBuffer(X, copy):
+        inPlace = isinstance(X, numpy.ndarray) and X.dtype == numpy.float64 and X.flags.writeable and not copy
+        return X if inPlace else numpy.array(X, dtype=numpy.float64)
+
+
+# Benchmark - rows/sec for fitting and in-place scaling of generated chunks
+
+def benchmark(rows=10 ** 8, columns=2, chunkRows=10 ** 6, compareSklearn=True):
+    """
+    benchmark(rows=10**8, columns=2, chunkRows=10**6, compareSklearn=True) -> Prints fit and transform throughput
+
+    The chunks are generated into one reused buffer, so memory stays at a single chunk for any number of rows.
+    """
+    rng = numpy.random.default_rng(2)
+    buffer = numpy.empty((chunkRows, columns))
+
+    def chunks():
+        for start in range(0, rows, chunkRows):
+            chunk = buffer[:min(chunkRows, rows - start)]
+            rng.standard_normal(out=chunk)
+            chunk *= 100.0
+            chunk += 1000.0
+            yield chunk
+
+    scaler = StreamingScaler()
+    fitSeconds = 0.0
+    for chunk in chunks():
+        start = time.perf_counter()
+        scaler.partialFit(chunk)
+        fitSeconds += time.perf_counter() - start
+
+    transformSeconds = 0.0
+    for chunk in chunks():
+        start = time.perf_counter()
+        scaler.transform(chunk)
+        transformSeconds += time.perf_counter() - start
+
+    print("{} rows x {} columns in chunks of {}".format(rows, columns, chunkRows))
+    print("StreamingScaler fit:       {:>14,.0f} rows/sec".format(rows / fitSeconds))
+    print("StreamingScaler transform: {:>14,.0f} rows/sec (in place)".format(rows / transformSeconds))
+
+    if compareSklearn:
+        from sklearn.preprocessing import StandardScaler
+        reference = StandardScaler()
+        sklearnSeconds = 0.0
+        for chunk in chunks():
+            start = time.perf_counter()
+            reference.partial_fit(chunk)
+            sklearnSeconds += time.perf_counter() - start
+        print("StandardScaler.partial_fit:{:>14,.0f} rows/sec".format(rows / sklearnSeconds))
+    return fitSeconds, transformSeconds
+
+
+if __name__ == "__main__":
+    benchmark()
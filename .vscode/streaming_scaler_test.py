@@ -0,0 +1,56 @@
+import numpy
+import pandas
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from streaming_scaler import StreamingScaler
+
+
+def _cars(rows=1000, seed=0):
+    rng = numpy.random.default_rng(seed)
+    return numpy.column_stack((rng.integers(790, 1750, rows), rng.uniform(0.9, 2.5, rows)))
+
+
+class TestStreamingScaler:
+
+    def test_matches_standard_scaler(self):
+        X = _cars()
+        reference = StandardScaler().fit(X)
+        scaler = StreamingScaler().fit(numpy.array_split(X, 13))
+        assert numpy.allclose(scaler.mean_, reference.mean_) and numpy.allclose(scaler.var_, reference.var_)
+        assert numpy.allclose(scaler.transform(X, copy=True), reference.transform(X))
+        assert numpy.allclose(scaler.std(ddof=1), pandas.DataFrame(X).std().to_numpy())
+
+    def test_transform_in_place_and_back(self):
+        X = _cars(seed=1)
+        scaler = StreamingScaler().partialFit(X)
+        buffer = X.copy()
+        assert scaler.transform(buffer) is buffer
+        assert numpy.allclose(scaler.inverseTransform(buffer), X)
+        ints = numpy.array([[1000, 2]])
+        assert scaler.transform(ints).dtype == numpy.float64 and ints.tolist() == [[1000, 2]]
+
+    def test_merged_workers_and_state(self):
+        X = _cars(rows=3000, seed=2)
+        workers = [StreamingScaler.fromState(StreamingScaler().fit(numpy.array_split(part, 4)).state()) for part in numpy.array_split(X, 3)]
+        total = StreamingScaler()
+        for worker in workers:
+            total.merge(worker)
+        reference = StandardScaler().fit(X)
+        assert total.n == len(X)
+        assert numpy.allclose(total.mean_, reference.mean_) and numpy.allclose(total.var_, reference.var_)
+
+    def test_large_offset_and_constant_column(self):
+        rng = numpy.random.default_rng(3)
+        X = numpy.column_stack((1e9 + rng.normal(0.0, 1.0, 2000), numpy.full(2000, 5.0)))
+        scaler = StreamingScaler().fit(numpy.array_split(X, 7))
+        assert numpy.isclose(scaler.var_[0], X[:, 0].var(), rtol=1e-6)
+        assert scaler.scale_[1] == 1.0 and (scaler.transform(X, copy=True)[:, 1] == 0.0).all()
+
+    def test_errors(self):
+        with pytest.raises(Exception) as exc_info:
+            StreamingScaler().transform([[1.0]])
+        assert "has not seen any data" in str(exc_info)
+        with pytest.raises(Exception) as exc_info:
+            StreamingScaler().partialFit([[1.0, 2.0]]).merge(StreamingScaler().partialFit([[1.0]]))
+        assert "2 and 1 columns" in str(exc_info)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tree_ensemble import BaggedTrees
+
+X, Y = make_classification(600, 5, n_informative=3, n_classes=3, random_state=0)
+TEST = numpy.random.default_rng(1).normal(0.0, 2.0, (2000, 5))
+
+
+def _assertSameForest(left, right):
+    assert len(left.trees) == len(right.trees)
+    for a, b in zip(left.trees, right.trees):
+        assert (a.feature == b.feature).all() and (a.threshold == b.threshold).all() and (a.value == b.value).all()
+
+
+class TestBaggedTrees:
+
+    def test_process_pool_matches_serial(self):
+        serial = BaggedTrees(trees=12, max_depth=6).fit(X, Y)
+        pooled = BaggedTrees(trees=12, processes=2, max_depth=6).fit(X, Y)
+        _assertSameForest(serial, pooled)
+        assert (serial.predict(TEST) == pooled.predict(TEST)).all()
+        assert numpy.allclose(serial.predictProba(TEST), pooled.predictProba(TEST))
+
+    def test_votes_match_sklearn_trees(self):
+        forest = BaggedTrees(trees=8, voting="soft", seed=5).fit(X, Y)
+        hard = BaggedTrees(trees=8, seed=5).fit(X, Y)
+        # Rebuild each bootstrap tree with sklearn and count its votes the slow way
+        expectedVotes = numpy.zeros((len(TEST), 3))
+        expectedProba = numpy.zeros((len(TEST), 3))
+        for treeSeed in numpy.random.SeedSequence(5).spawn(8):
+            rng = numpy.random.default_rng(treeSeed)
+            sample = rng.integers(0, len(X), len(X))
+            tree = DecisionTreeClassifier(random_state=int(rng.integers(2 ** 31 - 1))).fit(X[sample].astype(numpy.float32), Y[sample])
+            expectedVotes[numpy.arange(len(TEST)), tree.predict(TEST)] += 1.0    # labels are 0, 1, 2
+            expectedProba[:, tree.classes_] += tree.predict_proba(TEST)
+        assert (hard.votes(TEST) == expectedVotes).all()
+        assert numpy.allclose(forest.votes(TEST), expectedProba)
+
+    def test_labels_and_errors(self):
+        labels = numpy.array(["NO", "YES", "MAYBE"])[Y]
+        forest = BaggedTrees(trees=5).fit(X, labels)
+        assert set(forest.predict(TEST)) <= {"NO", "YES", "MAYBE"}
+        assert numpy.allclose(forest.predictProba(TEST).sum(axis=1), 1.0)
+        with pytest.raises(Exception):
+            BaggedTrees(voting="average")
+        with pytest.raises(Exception) as exc_info:
+            BaggedTrees().predict(TEST)
+        assert "not been fitted" in str(exc_info)
@@ -29,7 +29,20 @@ plt.show()
 import numpy
 import matplotlib.pyplot as plt 
 
-x = numpy.random.uniform(0.0,5.0,100000)
-plt.hist(x,100)
+# x = numpy.random.uniform(0.0,5.0,100000)
+# plt.hist(x,100)
+
+# Count the numbers a chunk at a time instead, so memory does not grow with the amount of numbers (see streaming_histogram.py)
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # shared_array.py, used by parallel_random, lives in the repository root 
+from streaming_histogram import StreamingHistogram
+from parallel_random import RandomService
+
+service = RandomService(seed=2)    # reproducible, and filled by several threads (see parallel_random.py)
+hist = StreamingHistogram(100, range=(0.0,5.0))
+for _ in range(10):
+    hist.update(service.uniform(0.0,5.0,10000))
+hist.plot()
 plt.title("Randomdly Distributed Numbers")
 plt.show()
\ No newline at end of file
@@ -9,6 +9,7 @@
 
 import matplotlib.pyplot as plt 
 from scipy import stats 
+from regression_models import LinearModel # fitted line with vectorized predictions 
 
 # Data set representing recorded ages and corresponding speeds of vehicles 
 x = [5,7,8,7,2,17,2,9,4,11,12,9,6]
@@ -71,11 +72,13 @@ print("{:.2f} mph".format(speed))
 x2 = [89,43,36,36,95,10,66,34,38,20,26,29,48,64,6,5,36,66,72,40]
 y2 = [21,46,3,35,67,95,53,72,58,10,26,34,90,33,38,20,56,2,47,15]
 
-slope, intercept, r, p, std_err = stats.linregress(x2,y2)
+# LinearModel keeps its own slope and intercept, so the line always matches the data it was fitted to 
+# (myfunc above reads the global slope and intercept) and predict() works on the whole array at once instead of one point at a time 
+model = LinearModel.fit(x2,y2)
 
-mymodel = list(map(myfunc,x2))
+mymodel = model.predict(x2)
 
-print(r)
+print(model.r)
 
 plt.scatter(x2,y2)
 plt.plot(x2,mymodel)
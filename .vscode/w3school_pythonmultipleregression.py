@@ -36,4 +36,16 @@ regr.fit(X,y) # Fill regr with data representing relationship between X and y da
 # print(regr.coef_)
 
 predictedCO2 = regr.predict([[3300,1300]])
-print(predictedCO2)
\ No newline at end of file
+print(predictedCO2)
+
+# Large Files 
+# read_csv() loads the whole file into memory. For files too big for that, fitCsv() reads only the Weight, Volume and CO2 columns 
+# a chunk at a time and builds up the same fit (the same coef_ and intercept_ as LinearRegression) in constant memory: 
+"""
+from csv_regression import fitCsv
+
+regr = fitCsv("data.csv", ["Weight", "Volume"], "CO2", chunkSize=100000)
+
+print(regr.coef_)
+print(regr.predict([[3300,1300]]))
+"""
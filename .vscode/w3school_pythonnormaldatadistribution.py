@@ -8,8 +8,21 @@
 import numpy
 import matplotlib.pyplot as plt 
 
-x = numpy.random.normal(5.0,1.0,10000)
+# x = numpy.random.normal(5.0,1.0,10000)
 
-plt.hist(x,100)
+# plt.hist(x,100)
+
+# The same histogram counted a chunk at a time; the bins adapt to the data (see streaming_histogram.py)
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # shared_array.py, used by parallel_random, lives in the repository root 
+from streaming_histogram import StreamingHistogram
+from parallel_random import RandomService
+
+service = RandomService(seed=2)    # reproducible, and filled by several threads (see parallel_random.py)
+hist = StreamingHistogram(100)
+for _ in range(10):
+    hist.update(service.normal(5.0,1.0,1000))
+hist.plot()
 
 plt.show()
\ No newline at end of file
@@ -17,3 +17,8 @@ def statPercentile(dataSet,percentile):
 
 statPercentile(ages,90)
 
+
+# For data too big to keep in memory, a quantile sketch summarises it in one pass and answers many percentiles at once (see quantile_sketch.py)
+# from quantile_sketch import QuantileSketch
+# sketch = QuantileSketch(compression=200).update(ages)
+# print(sketch.percentile([50, 90, 99]))
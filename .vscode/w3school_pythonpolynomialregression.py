@@ -8,6 +8,10 @@
 import numpy
 import matplotlib.pyplot as plt 
 from sklearn.metrics import r2_score
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # shared_array.py, used by model_validation, lives in the repository root 
+from polynomial_models import fitPolynomial # fast polynomial fitting and evaluation 
 
 # Data set  representing 18 registered cars they were passing a certain tollbooth 
 x = [1,2,3,5,6,7,8,9,10,12,13,14,15,16,18,19,21,22]
@@ -36,7 +40,8 @@ plt.show()
 # Example - How well does a dataset fit in a polynomial regression? 
 
 # Make a polynomial model for the data-set 
-mymodel = numpy.poly1d(numpy.polyfit(x,y,3))
+# fitPolynomial() returns a model that is called like numpy.poly1d(numpy.polyfit(x,y,3)) but evaluates with Horner's rule 
+mymodel = fitPolynomial(x,y,3)
 
 """
 print("{:.2f}".format(r2_score(y,mymodel(x))))
@@ -48,4 +53,15 @@ print("{:.2f}".format(r2_score(y,mymodel(x))))
 speed = mymodel(17)
 
 print("{:.2f} mph".format(speed))
-"""
\ No newline at end of file
+"""
+
+# Choosing the Degree 
+# Instead of picking the degree by hand, cross validation scores every degree on held-out points and picks the best one: 
+"""
+from polynomial_models import selectDegree # cross-validated degree selection 
+
+best, errors = selectDegree(x,y,maxDegree=6)
+
+mymodel = fitPolynomial(x,y,best)
+print("Best degree: {}".format(best))
+"""
@@ -56,4 +56,24 @@ scaled = scale.transform([[2300,1.3]])
 predictedC02 = regr.predict([scaled[0]])
 
 print(predictedC02)
-"""
\ No newline at end of file
+"""
+
+# Scaling Large or Streamed Data 
+# fit_transform() needs all of X at once. StreamingScaler learns the mean and variance of each column in one pass over chunks 
+# (and can merge what several workers learned), then scales NumPy arrays in place without making a copy: 
+"""
+from streaming_scaler import StreamingScaler
+
+scale = StreamingScaler()
+for chunk in pandas.read_csv('data.csv', usecols=["Weight", "Volume"], chunksize=10):
+    scale.partialFit(chunk[["Weight", "Volume"]])
+
+scaledX = scale.transform(X.to_numpy(dtype="float64"))
+
+regr = linear_model.LinearRegression()
+regr.fit(scaledX,y)
+
+scaled = scale.transform([[2300,1.3]], copy=True)
+
+print(regr.predict(scaled))
+"""
@@ -18,8 +18,18 @@ plt.show()
 # Random Data Distributions 
 # E.g. A scatter plot with 1000 dots 
 
-x = numpy.random.normal(5.0,1.0,1000)
-y = numpy.random.normal(10.0,2.0,1000)
+# x = numpy.random.normal(5.0,1.0,1000)
+# y = numpy.random.normal(10.0,2.0,1000)
+
+# The same dots from a seeded generator service instead of the global numpy.random state (see parallel_random.py)
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # shared_array.py, used by parallel_random, lives in the repository root 
+from parallel_random import RandomService
+
+service = RandomService(seed=2)
+x = service.normal(5.0,1.0,1000)
+y = service.normal(10.0,2.0,1000)
 
 plt.scatter(x,y)
 plt.show()
\ No newline at end of file
@@ -17,6 +17,13 @@ numpy.random.seed(2)
 x = numpy.random.normal(3,1,100) 
 y = numpy.random.normal(150,40,100) / x 
 
+# The same data set from the seeded generator service, which gives other numbers than numpy.random.seed(2) but the same
+# ones on every run and for any number of threads (see parallel_random.py)
+# from parallel_random import RandomService
+# service = RandomService(seed=2)
+# x = service.normal(3,1,100)
+# y = service.normal(150,40,100) / x
+
 # print(x)
 # print(y)
 
@@ -57,3 +64,18 @@ plt.show()
 
 # Predict Future Values 
 print(mymodel(5))
+
+
+# Cross Validation 
+# A single 80/20 split scores the model on one particular set of 20 points. k-fold cross validation rotates the test set 
+# through the whole data set and can score the folds in parallel processes: 
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # shared_array.py lives in the repository root 
+from functools import partial
+from model_validation import kFold, crossValidate, polynomialR2
+
+scores = crossValidate(partial(polynomialR2, 4), x, y, kFold(len(x), k=5, shuffle=True), processes=4)
+print("{:.3f}".format(scores.mean()))
+"""
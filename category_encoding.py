@@ -0,0 +1,262 @@
+# Category Encoding
+
+# w3school_pythondecisiontree.py turns Nationality and Go into numbers with df[...].map({"UK":0, "USA":1, "N":2}) on every run,
+# and any value missing from the dict quietly becomes NaN.
+# CategoryEncoder keeps one column's category -> code table, encodes to small integer codes (int8 while it fits),
+# and looks each distinct string up once per chunk rather than once per row. Unknown values are an error by default,
+# or can be given a reserved code, or added to the table.
+# DatasetEncoder holds the tables of several columns and saves them as JSON, and loadEncoded() caches the encoded
+# data set next to the CSV so a reload reads the integer codes back without touching the strings again.
+
+# E.g.
+"""
+from category_encoding import DatasetEncoder, loadEncoded, readEncoded
+
+encoder = DatasetEncoder({"Nationality": {"UK": 0, "USA": 1, "N": 2}, "Go": {"YES": 1, "NO": 0}})
+df = loadEncoded("data2.csv", encoder, cachePath="data2.encoded.npz")
+
+encoder.save("data2.categories.json")
+encoder = DatasetEncoder.load("data2.categories.json")
+for chunk in readEncoded("big.csv", encoder, chunkSize=100000):
+    ...
+"""
+
+import hashlib
+import json
+import os
+
+import numpy
+import pandas
+
+UNKNOWN_CODE = -1
+UNKNOWN_POLICIES = ("error", "code", "learn")
+# Part of the cache key of loadEncoded(), so caches written in an older layout are rebuilt
+CACHE_FORMAT = 2
+
+
+class UnknownCategory(Exception):
+    pass
+
+
+class CategoryEncoder:
+    """
+    CategoryEncoder(table=None, unknown="error") -> category -> integer code table for one column
+
+    Parameters:
+    table: dict of category -> code, codes must be 0..n-1 (e.g. {"UK": 0, "USA": 1, "N": 2}), or a list of
+           categories in code order; None starts empty, to be filled by fit()
+    unknown: What encode() does with a value that is not in the table (missing values included)
+             "error" - raise UnknownCategory naming the values
+             "code"  - give it UNKNOWN_CODE (-1)
+             "learn" - append it to the table with the next free code (missing values still get UNKNOWN_CODE)
+    """
+
+    def __init__(self, table=None, unknown="error"):
+        if unknown not in UNKNOWN_POLICIES:
+            raise Exception("unknown must be one of {}, got {!r}".format(UNKNOWN_POLICIES, unknown))
+        self.unknown = unknown
+        if table is None:
+            categories = []
+        elif isinstance(table, dict):
+            categories = sorted(table, key=table.get)
+            if [table[c] for c in categories] != list(range(len(categories))):
+                raise Exception("Codes must run from 0 to {}, got {}".format(len(categories) - 1, sorted(table.values())))
+        else:
+            categories = list(table)
+        self.categories = []
+        self.codes = {}
+        self._add(categories)
+
+    @property
+    def dtype(self):
+        # int8 holds 127 categories plus the unknown code; wider tables move up a size
+        return numpy.int8 if len(self.categories) <= 127 else numpy.int16 if len(self.categories) <= 32767 else numpy.int32
+
+    def table(self):
+        return dict(self.codes)
+
+    def fit(self, values):
+        """
+        fit(values) -> Adds any categories of values not yet in the table (in order of first appearance) and returns self
+        """
+        categories = pandas.unique(pandas.Series(values).dropna())
+        self._add([c for c in categories if c not in self.codes])
+        return self
+
+    def encode(self, values):
+        """
+        encode(values) -> NumPy array of codes (dtype int8 while the table has at most 127 categories)
+
+        values may be a list, array, Series or pandas Categorical. The strings are reduced to their distinct values
+        first, so the table lookup runs once per distinct value and the rows are then mapped with one array index.
+        """
+        if isinstance(getattr(values, "dtype", None), pandas.CategoricalDtype):
+            categorical = pandas.Categorical(values).remove_unused_categories()
+            rowCodes, distinct = categorical.codes, list(categorical.categories)
+        else:
+            rowCodes, distinct = pandas.factorize(values if isinstance(values, (pandas.Series, numpy.ndarray)) else numpy.asarray(values, dtype=object))
+            distinct = list(distinct)
+        unknown = [c for c in distinct if c not in self.codes]
+        hasMissing = bool((rowCodes == -1).any())
+        if self.unknown == "error" and (unknown or hasMissing):
+            raise UnknownCategory("Values not in the table: {}{}".format(unknown, " and missing values" if hasMissing else ""))
+        if self.unknown == "learn":
+            self._add(unknown)
+
+        # One slot per distinct value plus a last slot for missing values, which both code paths mark as -1
+        lookup = numpy.array([self.codes.get(c, UNKNOWN_CODE) for c in distinct] + [UNKNOWN_CODE], dtype=self.dtype)
+        return lookup[rowCodes]
+
+    def decode(self, codes):
+        """
+        decode(codes) -> Object array of categories, None where the code is UNKNOWN_CODE
+        """
+        lookup = numpy.array(self.categories + [None], dtype=object)
+        codes = numpy.asarray(codes)
+        return lookup[numpy.where(codes < 0, len(self.categories), codes)]
+
+    def toCategorical(self, codes):
+        """
+        toCategorical(codes) -> pandas Categorical over the table, without building any strings
+        """
+        return pandas.Categorical.from_codes(numpy.asarray(codes), categories=self.categories)
+
+    def _add(self, categories):
+        for category in categories:
+            if category in self.codes:
+                raise Exception("Category {!r} appears twice".format(category))
+            self.codes[category] = len(self.categories)
+            self.categories.append(category)
+
+
+class DatasetEncoder:
+    """
+    DatasetEncoder(tables, unknown="error") -> A CategoryEncoder per column
+
+    Parameters:
+    tables: dict of column name -> table (dict, list or None) or CategoryEncoder
+    unknown: Unknown-value policy for the columns given as tables
+    """
+
+    def __init__(self, tables, unknown="error"):
+        self.encoders = {column: table if isinstance(table, CategoryEncoder) else CategoryEncoder(table, unknown)
+                         for column, table in tables.items()}
+
+    @property
+    def columns(self):
+        return list(self.encoders)
+
+    def fit(self, df):
+        for column, encoder in self.encoders.items():
+            encoder.fit(df[column])
+        return self
+
+    def transform(self, df):
+        """
+        transform(df) -> Copy of df with every encoded column replaced by its integer codes
+        """
+        df = df.copy()
+        for column, encoder in self.encoders.items():
+            df[column] = encoder.encode(df[column])
+        return df
+
+    def inverseTransform(self, df):
+        df = df.copy()
+        for column, encoder in self.encoders.items():
+            df[column] = encoder.decode(df[column].to_numpy())
+        return df
+
+    def fingerprint(self):
+        """
+        fingerprint() -> Hash of the tables; an encoded cache is only valid for the same fingerprint
+        """
+        return hashlib.sha256(json.dumps(self.state(), sort_keys=True).encode()).hexdigest()
+
+    def state(self):
+        return {column: {"categories": encoder.categories, "unknown": encoder.unknown} for column, encoder in self.encoders.items()}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.state(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        return cls({column: CategoryEncoder(entry["categories"], entry["unknown"]) for column, entry in state.items()})
+
+
+def readEncoded(path, encoder, chunkSize=None, **readOptions):
+    """
+    readEncoded(path, encoder, chunkSize=None, **readOptions) -> Encoded DataFrame, or a generator of encoded chunks when chunkSize is given
+
+    The encoded columns are parsed as pandas categoricals, so every distinct string is stored once and then
+    mapped once per chunk.
+    """
+    dtype = dict(readOptions.pop("dtype", {}))
+    dtype.update({column: "category" for column in encoder.columns})
+    if chunkSize is None:
+        return encoder.transform(pandas.read_csv(path, dtype=dtype, **readOptions))
+    return _encodedChunks(path, encoder, chunkSize, dtype, readOptions)
+
+
+def loadEncoded(path, encoder, cachePath=None, **readOptions):
+    """
+    loadEncoded(path, encoder, cachePath=None, **readOptions) -> Encoded DataFrame, read from cachePath when it is still valid
+
+    The cache (a .npz file, default path + ".encoded.npz") records the CSV's size and modification time, the
+    encoder's fingerprint and the read options (usecols, dtype ...). If all of them still match it is loaded as plain
+    arrays; otherwise the CSV is encoded again and the cache rewritten. With unknown="learn" the tables may grow while encoding, so save the encoder
+    after a rebuild.
+    """
+    cachePath = cachePath or path + ".encoded.npz"
+    source = os.stat(path)
+    key = _cacheKey(source, encoder, readOptions)
+
+    if os.path.exists(cachePath):
+        with numpy.load(cachePath, allow_pickle=False) as cache:
+            if str(cache["__key__"]) == key:
+                columns = [str(c) for c in cache["__columns__"]]
+                return pandas.DataFrame({column: _restored(cache, i) for i, column in enumerate(columns)})
+
+    df = readEncoded(path, encoder, **readOptions)
+    # The fingerprint is taken after encoding, in case unknown="learn" added categories
+    key = _cacheKey(source, encoder, readOptions)
+    arrays = {}
+    for i, column in enumerate(df.columns):
+        arrays.update(_storable(df[column], i))
+    temporary = cachePath + ".tmp.npz"
+    numpy.savez(temporary, __key__=numpy.array(key), __columns__=numpy.array([str(c) for c in df.columns]), **arrays)
+    os.replace(temporary, cachePath)
+    return df
+
+
+def _encodedChunks(path, encoder, chunkSize, dtype, readOptions):
+    with pandas.read_csv(path, dtype=dtype, chunksize=chunkSize, **readOptions) as reader:
+        for chunk in reader:
+            yield encoder.transform(chunk)
+
+
+def _cacheKey(source, encoder, readOptions):
+    # Options that are not JSON (e.g. dtype=numpy.int64) are keyed by their repr
+    options = hashlib.sha256(json.dumps(readOptions, sort_keys=True, default=repr).encode()).hexdigest()
+    return "{}:{}:{}:{}:{}".format(CACHE_FORMAT, source.st_size, source.st_mtime_ns, encoder.fingerprint(), options)
+
+
+def _storable(column, i):
+    values = column.to_numpy()
+    if values.dtype != object:
+        return {"column{}".format(i): values}
+    # Non-encoded text columns are stored as fixed-width unicode so the cache never needs pickle; missing values
+    # would become the string "nan", so they are blanked and recorded in a mask of their own
+    missing = pandas.isna(values)
+    return {"column{}".format(i): numpy.where(missing, "", values).astype(str), "missing{}".format(i): missing}
+
+
+def _restored(cache, i):
+    values = cache["column{}".format(i)]
+    if "missing{}".format(i) not in cache.files:
+        return values
+    values = values.astype(object)
+    values[cache["missing{}".format(i)]] = numpy.nan
+    return values
@@ -0,0 +1,166 @@
+# Compiled Decision Tree
+
+# w3school_pythondecisiontree.py fits a DecisionTreeClassifier and predicts one comedian at a time with dtree.predict([[40, 10, 6, 1]]).
+# Scoring millions of profiles that way spends nearly all its time on per-call overhead.
+# CompiledTree copies the fitted tree into five flat NumPy arrays (feature, threshold, left, right, value) and predicts
+# a whole batch by walking it one level at a time: every row still inside the tree takes one step per level, as array operations.
+
+# E.g.
+"""
+from compiled_tree import CompiledTree
+
+compiled = CompiledTree.fromSklearn(dtree)
+print(compiled.predict([[40, 10, 6, 1], [36, 10, 9, 0]]))
+
+compiled.save("decision_tree.npz")
+compiled = CompiledTree.load("decision_tree.npz")
+"""
+
+import time
+
+import numpy
+
+# Rows walked through the tree at a time, which bounds the size of the temporary index arrays
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class CompiledTree:
+    """
+    CompiledTree(feature, threshold, left, right, value, classes) -> Array-backed binary decision tree
+
+    Parameters:
+    feature, threshold: Split of each node - rows with X[:, feature] <= threshold go left
+    left, right: Child node numbers; a leaf points to itself on both sides
+    value: Class counts (or weights) per node, shape (nodes, classes)
+    classes: The class label of each value column
+    """
+
+    def __init__(self, feature, threshold, left, right, value, classes):
+        self.feature = numpy.asarray(feature, dtype=numpy.intp)
+        self.threshold = numpy.asarray(threshold, dtype=numpy.float64)
+        self.left = numpy.asarray(left, dtype=numpy.intp)
+        self.right = numpy.asarray(right, dtype=numpy.intp)
+        self.value = numpy.asarray(value, dtype=numpy.float64)
+        self.classes = numpy.asarray(classes)
+        self.leafClass = self.value.argmax(axis=1)
+        self.depth = self._depth()
+
+    @classmethod
+    def fromSklearn(cls, estimator):
+        """
+        fromSklearn(estimator) -> CompiledTree of a fitted single-output DecisionTreeClassifier
+        """
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise Exception("Only single-output trees can be compiled")
+        nodes = numpy.arange(tree.node_count)
+        isLeaf = tree.children_left == -1
+        # Leaves loop back to themselves and split on feature 0, so they can take part in every step unchanged
+        left = numpy.where(isLeaf, nodes, tree.children_left)
+        right = numpy.where(isLeaf, nodes, tree.children_right)
+        feature = numpy.where(isLeaf, 0, tree.feature)
+        threshold = numpy.where(isLeaf, numpy.inf, tree.threshold)
+        return cls(feature, threshold, left, right, tree.value[:, 0, :], estimator.classes_)
+
+    def apply(self, X, chunkSize=DEFAULT_CHUNK_SIZE):
+        """
+        apply(X, chunkSize=1048576) -> Leaf node number reached by each row of X
+        """
+        # sklearn compares float32 feature values with its thresholds; doing the same gives identical splits
+        X = numpy.asarray(X, dtype=numpy.float32)
+        if X.ndim != 2:
+            raise Exception("X must be 2-D, one row per sample")
+        leaves = numpy.empty(len(X), dtype=numpy.intp)
+        for start in range(0, len(X), chunkSize):
+            leaves[start:start + chunkSize] = self._walk(X[start:start + chunkSize])
+        return leaves
+
+    def predict(self, X, chunkSize=DEFAULT_CHUNK_SIZE):
+        return self.classes[self.leafClass[self.apply(X, chunkSize)]]
+
+    def predictProba(self, X, chunkSize=DEFAULT_CHUNK_SIZE):
+        value = self.value[self.apply(X, chunkSize)]
+        return value / value.sum(axis=1, keepdims=True)
+
+    def save(self, path):
+        numpy.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right, value=self.value, classes=self.classes)
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path, allow_pickle=False) as data:
+            return cls(data["feature"], data["threshold"], data["left"], data["right"], data["value"], data["classes"])
+
+    def _walk(self, X):
+        node = numpy.zeros(len(X), dtype=numpy.intp)
+        active = numpy.arange(len(X))
+        for level in range(self.depth):
+            current = node[active]
+            goLeft = X[active, self.feature[current]] <= self.threshold[current]
+            nextNode = numpy.where(goLeft, self.left[current], self.right[current])
+            node[active] = nextNode
+            # Rows that reached a leaf drop out, so deeper levels only touch the rows still travelling
+            moving = nextNode != current
+            active = active[moving]
+            if len(active) == 0:
+                break
+        return node
+
+    def _depth(self):
+        # Longest root-to-leaf path, found breadth first
+        depth = 0
+        level = numpy.array([0])
+        while True:
+            children = numpy.concatenate((self.left[level], self.right[level]))
+            children = numpy.unique(children[children != numpy.concatenate((level, level))])
+            if len(children) == 0:
+                return depth
+            depth += 1
+            level = children
+
+
+# Benchmark - per-row dtree.predict() against CompiledTree.predict() on a batch
+
+def benchmark(rows=1000000, perRowSample=2000):
+    """
+    benchmark(rows=1000000, perRowSample=2000) -> Prints rows/sec of per-row predict(), sklearn batch predict() and CompiledTree
+
+    The per-row path is timed on perRowSample rows; it is far too slow to run over all of them.
+    """
+    import pandas
+    from sklearn.tree import DecisionTreeClassifier
+
+    df = pandas.read_csv("data2.csv")
+    df["Nationality"] = df["Nationality"].map({"UK": 0, "USA": 1, "N": 2})
+    df["Go"] = df["Go"].map({"YES": 1, "NO": 0})
+    features = ["Age", "Experience", "Rank", "Nationality"]
+    dtree = DecisionTreeClassifier(random_state=0).fit(df[features].to_numpy(), df["Go"])
+    compiled = CompiledTree.fromSklearn(dtree)
+
+    rng = numpy.random.default_rng(2)
+    X = numpy.column_stack((rng.integers(18, 70, rows), rng.integers(0, 40, rows), rng.integers(1, 10, rows), rng.integers(0, 3, rows))).astype(numpy.float64)
+
+    start = time.perf_counter()
+    for row in X[:perRowSample]:
+        dtree.predict([row])
+    perRowSeconds = (time.perf_counter() - start) / perRowSample * rows
+
+    start = time.perf_counter()
+    expected = dtree.predict(X)
+    sklearnSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = compiled.predict(X)
+    compiledSeconds = time.perf_counter() - start
+
+    if not numpy.array_equal(expected, predicted):
+        raise Exception("CompiledTree predictions differ from sklearn")
+
+    print("{} rows, tree depth {}".format(rows, compiled.depth))
+    print("per-row predict (estimated): {:>14,.0f} rows/sec".format(rows / perRowSeconds))
+    print("sklearn batch predict:       {:>14,.0f} rows/sec".format(rows / sklearnSeconds))
+    print("CompiledTree:                {:>14,.0f} rows/sec".format(rows / compiledSeconds))
+    return perRowSeconds, sklearnSeconds, compiledSeconds
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,380 @@
+# Mode and Top-k Frequencies
+
+# w3school_pythonmeanmedianmode.py finds the mode with stats.mode(dataSet, keepdims=True), which needs the whole array
+# and sorts it. Finding the k most common values of a stream needs more than that.
+# ExactCounter counts every distinct value exactly: small-range integers with numpy.bincount (stats_engine's
+# IntegerCounter), anything else (floats, strings, wide integers) as sorted arrays of distinct values and their counts,
+# merged chunk by chunk.
+# FrequencySketch keeps bounded memory for unbounded streams: a Space-Saving summary of the heaviest values with
+# per-value error bounds, plus a Count-Min sketch that gives an upper bound for the count of any value.
+# Both are merged from shards, so each worker can count its own part of the data.
+
+# E.g.
+"""
+from frequency_engine import ExactCounter, FrequencySketch, mode
+
+print(mode(speed))                      # (86, 3), as stats.mode gives
+
+counter = ExactCounter()
+sketch = FrequencySketch(capacity=1000)
+for chunk in chunks:
+    counter.update(chunk)
+    sketch.update(chunk)
+print(counter.topK(10))
+print(sketch.topK(10))                  # [(value, estimated count, guaranteed minimum count), ...]
+"""
+
+import time
+
+import numpy
+import pandas
+
+from stats_engine import DEFAULT_COUNTING_RANGE, IntegerCounter, _scalar
+
+DEFAULT_SEED = 2
+
+
+class ExactCounter:
+    """
+    ExactCounter(countingRange=1048576) -> Exact count of every distinct value seen, over chunks
+    """
+
+    def __init__(self, countingRange=DEFAULT_COUNTING_RANGE):
+        self.countingRange = countingRange
+        self.n = 0
+        self.kind = None    # kind of the values counted so far, see _kind()
+        # Counting path
+        self.counter = IntegerCounter(countingRange)
+        # Distinct-value path: sorted distinct values and their counts
+        self.values = None
+        self.valueCounts = None
+
+    def update(self, chunk):
+        """
+        update(chunk) -> Counts the values of chunk (any shape, flattened) and returns self
+        """
+        values = numpy.asarray(chunk).ravel()
+        if len(values) == 0:
+            return self
+        if values.dtype.kind == "f" and numpy.isnan(values).any():
+            raise Exception("Data contains NaN")
+        self._checkKind(_kind(values.dtype))
+        if values.dtype.kind in "iub" and self.values is None:
+            values = values.astype(numpy.int64)
+            low, high = int(values.min()), int(values.max())
+            if self.counter.fits(low, high):
+                self.counter.update(values, low, high)
+                self.n += len(values)
+                return self
+        distinct, counts = numpy.unique(values, return_counts=True)
+        return self._addDistinct(distinct, counts)
+
+    def merge(self, other):
+        """
+        merge(other) -> Adds the counts of another ExactCounter and returns self
+        """
+        if other.n == 0:
+            return self
+        self._checkKind(other.kind)
+        distinct, counts = other.items()
+        if self.values is None and other.values is None and self.counter.fits(int(distinct[0]), int(distinct[-1])):
+            self.counter.add(distinct, counts)
+            self.n += int(counts.sum())
+            return self
+        return self._addDistinct(distinct, counts)
+
+    def items(self):
+        """
+        items() -> (distinct values in ascending order, their counts)
+        """
+        if self.values is not None:
+            return self.values, self.valueCounts
+        distinct, counts = self.counter.items()
+        return (distinct.astype(numpy.bool_), counts) if self.kind == "b" else (distinct, counts)
+
+    def count(self, value):
+        distinct, counts = self.items()
+        at = numpy.searchsorted(distinct, value)
+        return int(counts[at]) if at < len(distinct) and distinct[at] == value else 0
+
+    def topK(self, k=10):
+        """
+        topK(k=10) -> [(value, count), ...] of the k most common values; equal counts go to the smaller value first
+        """
+        distinct, counts = self.items()
+        k = min(k, len(counts))
+        if k == 0:
+            return []
+        # Partial selection of the k largest counts, then a stable sort of those few (distinct values are ascending)
+        chosen = numpy.argpartition(-counts, k - 1)[:k] if k < len(counts) else numpy.arange(len(counts))
+        # argpartition breaks ties arbitrarily; take every value tied with the k-th count so the smallest ones win
+        threshold = counts[chosen].min()
+        chosen = numpy.flatnonzero(counts >= threshold)
+        chosen = chosen[numpy.argsort(-counts[chosen], kind="stable")][:k]
+        return [(_scalar(distinct[i]), int(counts[i])) for i in chosen]
+
+    def mode(self):
+        """
+        mode() -> (value, count) of the most common value, the smallest one on ties as stats.mode gives
+        """
+        if self.n == 0:
+            raise Exception("No data")
+        return self.topK(1)[0]
+
+    def _checkKind(self, kind):
+        # numpy.unique over mixed kinds would turn every value into a string, so 2 and "2" would be counted as one value
+        if self.kind is None:
+            self.kind = kind
+        elif kind != self.kind:
+            raise Exception("Cannot count {} values together with the {} values already counted".format(_KIND_NAMES.get(kind, kind), _KIND_NAMES.get(self.kind, self.kind)))
+
+    def _addDistinct(self, distinct, counts):
+        if self.values is None:
+            # Leave the counting path: the counts so far (if any) become the first distinct values
+            self.values, self.valueCounts = self.items() if self.counter.n else (distinct[:0], counts[:0])
+            self.counter = None
+        merged, inverse = numpy.unique(numpy.concatenate((self.values, distinct)), return_inverse=True)
+        self.valueCounts = numpy.bincount(inverse, weights=numpy.concatenate((self.valueCounts, counts))).astype(numpy.int64)
+        self.values = merged
+        self.n += int(counts.sum())
+        return self
+
+
+_KIND_NAMES = {"b": "boolean", "n": "numeric", "U": "string", "S": "bytes", "O": "object", "M": "datetime", "m": "timedelta"}
+
+
+def _kind(dtype):
+    # Integers and floats compare by value and can be counted together; every other dtype kind only with itself
+    return "n" if dtype.kind in "iuf" else dtype.kind
+
+
+class FrequencySketch:
+    """
+    FrequencySketch(capacity=1000, width=65536, depth=4, seed=2) -> Bounded-memory heavy hitters over a stream
+
+    Parameters:
+    capacity: Values tracked by the Space-Saving summary; floor, the most an untracked value can have occurred, stays near n / capacity
+    width, depth: Count-Min table size; its over-estimate is at most about e * n / width with probability 1 - e ** -depth
+    seed: Seed of the Count-Min hash functions; only sketches with the same width, depth and seed can be merged
+
+    The summary keeps, for each tracked value, an upper bound on its count and the largest possible over-count.
+    floor is an upper bound on the count of any value the summary is not tracking.
+    """
+
+    def __init__(self, capacity=1000, width=1 << 16, depth=4, seed=DEFAULT_SEED):
+        if width & (width - 1):
+            raise Exception("width must be a power of two, got {}".format(width))
+        self.capacity = capacity
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.n = 0
+        self.values = None
+        self.counts = numpy.empty(0, dtype=numpy.int64)
+        self.errors = numpy.empty(0, dtype=numpy.int64)
+        self.floor = 0
+        self.table = numpy.zeros((depth, width), dtype=numpy.int64)
+        rng = numpy.random.default_rng(seed)
+        # Multiply-shift hashing of 64-bit keys: odd multipliers, one per row
+        self.multipliers = rng.integers(1, 2 ** 63, depth, dtype=numpy.uint64) * numpy.uint64(2) + numpy.uint64(1)
+        self.shift = numpy.uint64(64 - int(width).bit_length() + 1)
+
+    def update(self, chunk):
+        """
+        update(chunk) -> Adds the values of chunk (any shape, flattened) and returns self
+        """
+        values = numpy.asarray(chunk).ravel()
+        if len(values) == 0:
+            return self
+        if values.dtype.kind == "f" and numpy.isnan(values).any():
+            raise Exception("Data contains NaN")
+        # The chunk is counted exactly first, so both structures see each distinct value once per chunk
+        distinct, counts = numpy.unique(values, return_counts=True)
+        for row, column in enumerate(self._columns(distinct)):
+            self.table[row] += numpy.bincount(column, weights=counts, minlength=self.width).astype(numpy.int64)
+        self._mergeSummary(distinct, counts.astype(numpy.int64), numpy.zeros(len(counts), dtype=numpy.int64), 0)
+        self.n += len(values)
+        return self
+
+    def merge(self, other):
+        """
+        merge(other) -> Adds another FrequencySketch (e.g. from another shard) and returns self
+        """
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise Exception("Sketches need the same width, depth and seed to merge")
+        if other.n == 0:
+            return self
+        self.table += other.table
+        self._mergeSummary(other.values, other.counts, other.errors, other.floor)
+        self.n += other.n
+        return self
+
+    def estimate(self, values):
+        """
+        estimate(values) -> Upper bound on the count of each value: the smaller of the Count-Min and Space-Saving bounds
+        """
+        values = numpy.atleast_1d(numpy.asarray(values))
+        rows = numpy.arange(self.depth)[:, None]
+        countMin = self.table[rows, numpy.stack(list(self._columns(values)))].min(axis=0)
+        return numpy.minimum(countMin, self._summaryBound(values))
+
+    def topK(self, k=10):
+        """
+        topK(k=10) -> [(value, estimated count, guaranteed minimum count), ...] of the k heaviest tracked values
+        """
+        if self.values is None or k == 0:
+            return []
+        upper = self.estimate(self.values)
+        lower = numpy.maximum(self.counts - self.errors, 0)
+        order = numpy.lexsort((self.values, -upper))[:k]
+        return [(_scalar(self.values[i]), int(upper[i]), int(lower[i])) for i in order]
+
+    def mode(self):
+        """
+        mode() -> (value, estimated count) of the heaviest value
+        """
+        if self.n == 0:
+            raise Exception("No data")
+        value, upper, lower = self.topK(1)[0]
+        return value, upper
+
+    def state(self):
+        """
+        state() -> Picklable tuple; fromState(state()) rebuilds the sketch
+        """
+        return (self.capacity, self.width, self.depth, self.seed, self.n, self.values, self.counts, self.errors, self.floor, self.table)
+
+    @classmethod
+    def fromState(cls, state):
+        capacity, width, depth, seed, n, values, counts, errors, floor, table = state
+        sketch = cls(capacity, width, depth, seed)
+        sketch.n, sketch.values, sketch.counts, sketch.errors, sketch.floor, sketch.table = n, values, counts, errors, floor, table
+        return sketch
+
+    def _columns(self, values):
+        # Vectorised 64-bit hash of any values (numbers or strings), then one multiply-shift per row
+        values = numpy.asarray(values)
+        keys = pandas.util.hash_array(values.astype(object) if values.dtype.kind in "US" else values)
+        for multiplier in self.multipliers:
+            yield ((keys * multiplier) >> self.shift).astype(numpy.intp)
+
+    def _summaryBound(self, values):
+        # Tracked values: their count; anything else: at most floor
+        if self.values is None:
+            return numpy.zeros(len(values), dtype=numpy.int64)
+        at = numpy.minimum(numpy.searchsorted(self.values, values), len(self.values) - 1)
+        tracked = self.values[at] == values
+        return numpy.where(tracked, self.counts[at], self.floor)
+
+    def _mergeSummary(self, values, counts, errors, floor):
+        # Mergeable Space-Saving: a value missing from one side may have occurred up to that side's floor times there
+        if self.values is None:
+            mergedValues, mergedCounts, mergedErrors = values, counts, errors + floor
+        else:
+            allValues = numpy.concatenate((self.values, values))
+            mergedValues, inverse = numpy.unique(allValues, return_inverse=True)
+            mine = numpy.zeros(len(mergedValues), dtype=bool)
+            mine[inverse[:len(self.values)]] = True
+            theirs = numpy.zeros(len(mergedValues), dtype=bool)
+            theirs[inverse[len(self.values):]] = True
+            mergedCounts = numpy.bincount(inverse, weights=numpy.concatenate((self.counts, counts)), minlength=len(mergedValues)).astype(numpy.int64)
+            mergedErrors = numpy.bincount(inverse, weights=numpy.concatenate((self.errors, errors)), minlength=len(mergedValues)).astype(numpy.int64)
+            mergedCounts += numpy.where(mine, 0, self.floor) + numpy.where(theirs, 0, floor)
+            mergedErrors += numpy.where(mine, 0, self.floor) + numpy.where(theirs, 0, floor)
+
+        newFloor = self.floor + floor
+        if len(mergedValues) > self.capacity:
+            keep = numpy.argpartition(-mergedCounts, self.capacity - 1)[:self.capacity]
+            dropped = numpy.ones(len(mergedValues), dtype=bool)
+            dropped[keep] = False
+            newFloor = max(newFloor, int(mergedCounts[dropped].max()))
+            keep.sort()
+            mergedValues, mergedCounts, mergedErrors = mergedValues[keep], mergedCounts[keep], mergedErrors[keep]
+        self.values, self.counts, self.errors, self.floor = mergedValues, mergedCounts, mergedErrors, newFloor
+
+
+def topK(data, k=10, exact=True, chunkSize=None, **sketchOptions):
+    """
+    topK(data, k=10, exact=True, chunkSize=None, **sketchOptions) -> The k most common values of an array or an iterable of chunks
+
+    exact=True counts with ExactCounter and returns (value, count) pairs; exact=False uses a FrequencySketch and
+    returns (value, estimated count, guaranteed minimum count).
+    """
+    counter = ExactCounter() if exact else FrequencySketch(**sketchOptions)
+    for chunk in _chunks(data, chunkSize):
+        counter.update(chunk)
+    return counter.topK(k)
+
+
+def mode(data, chunkSize=None):
+    """
+    mode(data, chunkSize=None) -> (value, count), the same value and count as stats.mode(data, keepdims=True)
+    """
+    counter = ExactCounter()
+    for chunk in _chunks(data, chunkSize):
+        counter.update(chunk)
+    return counter.mode()
+
+
+def _chunks(data, chunkSize):
+    if isinstance(data, (list, tuple, numpy.ndarray)):
+        data = numpy.asarray(data).ravel()
+        step = chunkSize or max(1, len(data))
+        return (data[start:start + step] for start in range(0, len(data), step))
+    return data
+
+
+# Benchmark - stats.mode on one array against chunked ExactCounter and FrequencySketch
+
+def benchmark(size=10 ** 8, chunkSize=10 ** 6, compareScipy=True):
+    """
+    benchmark(size=10**8, chunkSize=10**6, compareScipy=True) -> Prints mode times for small-range integers and for
+    high-cardinality floats, and the sketch's top 10 against the exact one
+
+    The scipy comparison needs the whole array in memory (8 bytes per value).
+    """
+    from scipy import stats
+
+    def chunks(kind):
+        rng = numpy.random.default_rng(DEFAULT_SEED)
+        for start in range(0, size, chunkSize):
+            count = min(chunkSize, size - start)
+            if kind == "ages":
+                yield rng.binomial(100, 0.4, count)
+            else:
+                # Heavy-tailed values with millions of distinct floats
+                yield numpy.round(rng.pareto(1.2, count), 3)
+
+    results = {}
+    for kind in ("ages", "floats"):
+        print("{} ({} values)".format(kind, size))
+        if compareScipy:
+            data = numpy.concatenate(list(chunks(kind)))
+            start = time.perf_counter()
+            reference = stats.mode(data, keepdims=True)
+            scipySeconds = time.perf_counter() - start
+            del data
+            print("  stats.mode:     {:8.2f} s  mode {} x{}".format(scipySeconds, reference[0][0], reference[1][0]))
+
+        # Only the counting is timed, not the generation of the chunks
+        counter = ExactCounter()
+        sketch = FrequencySketch()
+        exactSeconds = sketchSeconds = 0.0
+        for chunk in chunks(kind):
+            start = time.perf_counter()
+            counter.update(chunk)
+            exactSeconds += time.perf_counter() - start
+            start = time.perf_counter()
+            sketch.update(chunk)
+            sketchSeconds += time.perf_counter() - start
+        exactTop = counter.topK(10)
+        sketchTop = sketch.topK(10)
+        print("  ExactCounter:   {:8.2f} s  mode {} x{}".format(exactSeconds, *exactTop[0]))
+        found = len({value for value, count in exactTop} & {value for value, upper, lower in sketchTop})
+        print("  FrequencySketch:{:8.2f} s  mode {} x{} (at least {}), {}/10 of the exact top 10".format(sketchSeconds, *sketchTop[0], found))
+        results[kind] = (exactSeconds, sketchSeconds)
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
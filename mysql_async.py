@@ -0,0 +1,189 @@
+# MySQL asyncio Access Layer
+
+# The MySQL scripts run one blocking execute()/fetchall() at a time. A job that looks up hundreds of addresses
+# (the "WHERE address = %s" filter in w3school_pythonmysqlwhere.py) spends nearly all of its time waiting on the network.
+# AsyncConnectionPool lets those lookups run concurrently from asyncio code. mysql.connector has no native async driver,
+# so each query runs on a pooled connection in a worker thread while the event loop carries on; a semaphore bounds how many run at once.
+
+# E.g.
+"""
+import asyncio
+import mysql_pool
+from mysql_async import AsyncConnectionPool
+
+async def main():
+    db = AsyncConnectionPool(mysql_pool.configurePool(size=20))    # 20 queries in flight, one per pooled connection
+    sql = "SELECT * FROM customers WHERE address = %s"
+
+    results = await db.gather(sql, [("Park Lane 38", ), ("Highway 21", ), ("Sky st 331", )])
+
+    async for x in db.iterate("SELECT * FROM customers ORDER BY name"):
+        print(x)
+
+    db.close()
+
+asyncio.run(main())
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql_pool
+from mysql_cache import invalidateTables, tablesIn
+from mysql_stream import streamBatches, DEFAULT_BATCH_SIZE
+
+
+class AsyncConnectionPool:
+    """
+    AsyncConnectionPool(pool=None, concurrency=None)
+
+    Parameters:
+    pool: The mysql_pool.ConnectionPool to draw connections from, defaults to the shared pool
+    concurrency: Maximum number of queries in flight at once, defaults to the pool size and cannot exceed it
+                 (further queries would only wait in checkout() and could raise PoolExhausted)
+    """
+
+    def __init__(self, pool=None, concurrency=None):
+        self.pool = pool or mysql_pool.getPool()
+        concurrency = self.pool.size if concurrency is None else concurrency
+        if not 1 <= concurrency <= self.pool.size:
+            raise Exception("concurrency must be between 1 and the pool size {}, got {}".format(self.pool.size, concurrency))
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mysql-async")
+        self._semaphores = weakref.WeakKeyDictionary()    # event loop -> its semaphore
+        self._semaphoresLock = threading.Lock()
+
+    async def fetchall(self, sql, params=None):
+        """
+        fetchall(sql, params=None) -> Runs a query on a pooled connection and returns all of its rows
+        """
+        async with self._limit():
+            return await self._run(self._fetchallBlocking, sql, params)
+
+    async def execute(self, sql, params=None):
+        """
+        execute(sql, params=None) -> Runs and commits an INSERT/UPDATE/DELETE, invalidates the cached reads of the tables
+        it touched and returns the rowcount
+        """
+        async with self._limit():
+            return await self._run(self._executeBlocking, sql, params)
+
+    async def gather(self, sql, paramsList):
+        """
+        gather(sql, paramsList) -> Runs the same query once per parameter tuple, concurrently, and returns the results in order
+        """
+        return await asyncio.gather(*(self.fetchall(sql, params) for params in paramsList))
+
+    async def iterate(self, sql, params=None, batchSize=DEFAULT_BATCH_SIZE):
+        """
+        iterate(sql, params=None, batchSize=1000) -> Async generator over the rows of a query, streamed in batches
+
+        Use it with "async for". The connection and a concurrency slot are held until the loop finishes;
+        wrap it in contextlib.aclosing() when the loop may break early so they are given back straight away.
+        """
+        async with self._limit():
+            connection = await self._run(self.pool.checkout)
+            batches = streamBatches(connection, sql, params, batchSize)
+            try:
+                while True:
+                    rows = await self._run(next, batches, None)
+                    if rows is None:
+                        return
+                    for row in rows:
+                        yield row
+            finally:
+                # Finishing the cursor may have to read the rest of the result, so it is done off the loop when possible
+                try:
+                    await self._run(batches.close)
+                except RuntimeError:
+                    batches.close()
+                connection.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _limit(self):
+        # An asyncio.Semaphore only works on the loop it was first used on, so each running loop gets its own.
+        # The concurrency bound is per loop; the executor still caps the queries running at once overall.
+        loop = asyncio.get_running_loop()
+        with self._semaphoresLock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _fetchallBlocking(self, sql, params):
+        with self.pool.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def _executeBlocking(self, sql, params):
+        with self.pool.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params)
+                rowcount = cursor.rowcount
+            finally:
+                cursor.close()
+            connection.commit()
+        invalidateTables(*tablesIn(sql))
+        return rowcount
+
+
+# Benchmark - the serial lookup loop against concurrent fan-out
+
+def benchmark(lookups=500, concurrency=20, pool=None):
+    """
+    benchmark(lookups=500, concurrency=20, pool=None) -> Prints lookups/sec for a serial loop and for AsyncConnectionPool.gather()
+
+    Pass a ConnectionPool built on a stand-in connect function to benchmark against a local stand-in server; its
+    size must be at least concurrency. Without one a local pool of concurrency connections is used, leaving the
+    shared pool as it is.
+    """
+    ownPool = pool is None
+    pool = pool or mysql_pool.ConnectionPool(size=concurrency)
+    if concurrency > pool.size:
+        raise Exception("concurrency {} is larger than the pool size {}".format(concurrency, pool.size))
+    sql = "SELECT * FROM customers WHERE address = %s"
+    paramsList = [("Highway {}".format(i), ) for i in range(lookups)]
+
+    start = time.perf_counter()
+    with pool.checkout() as mydb:
+        mycursor = mydb.cursor()
+        for params in paramsList:
+            mycursor.execute(sql, params)
+            mycursor.fetchall()
+        mycursor.close()
+    serialSeconds = time.perf_counter() - start
+
+    async def fanOut():
+        db = AsyncConnectionPool(pool, concurrency)
+        try:
+            start = time.perf_counter()
+            await db.gather(sql, paramsList)
+            return time.perf_counter() - start
+        finally:
+            db.close()
+
+    asyncSeconds = asyncio.run(fanOut())
+    if ownPool:
+        pool.closeAll()
+
+    print("serial:             {:>10.0f} lookups/sec".format(lookups / serialSeconds))
+    print("async x{:<3}         {:>10.0f} lookups/sec".format(concurrency, lookups / asyncSeconds))
+    print("Speedup: {:.2f}x".format(serialSeconds / asyncSeconds))
+    return serialSeconds, asyncSeconds
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,185 @@
+# MySQL Chunked UPDATE / DELETE
+
+# w3school_python_mysqlupdatetbl.py and w3school_python_mysqldelete.py run one unbounded UPDATE or DELETE.
+# On a big table that single statement holds its row locks until it finishes and fills the undo log with every changed row.
+# ChunkedMutation walks the primary key in ranges and applies the change one range at a time, each in its own transaction.
+# The range size grows or shrinks so every chunk takes about targetSeconds, progress is saved to a checkpoint file so an
+# interrupted run carries on where it stopped, and rows/sec is reported at the end.
+# The checkpoint is written after each chunk commits, not in the same transaction, so a crash between the two applies
+# that chunk again on the rerun. Resuming is only safe for changes that can be applied twice: SET to fixed values and
+# DELETE are fine, "SET count = count + 1" is not.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_batchmutate import ChunkedMutation
+
+mydb = mysql_pool.getConnection()
+
+mutation = ChunkedMutation(mydb, "customers", checkpointPath="update_address.json")
+mutation.update("address = %s", ("Canyon 123", ), where="address = %s", whereParams=("Valley 345", ))
+print(mutation.stats())
+
+mutation = ChunkedMutation(mydb, "customers")
+mutation.delete("address = %s", ("Mountain 21", ))
+
+mydb.close()
+"""
+
+import json
+import os
+import time
+
+from mysql_bulkload import RETRYABLE_ERRORS
+from mysql_cache import invalidateTables
+
+
+class ChunkedMutation:
+    """
+    ChunkedMutation(connection, table, keyColumn="id", chunkSize=1000, targetSeconds=0.5, minChunk=10, maxChunk=100000, checkpointPath=None, maxRetries=3)
+
+    Parameters:
+    connection: An open connection (plain or from mysql_pool)
+    table: The table to change
+    keyColumn: An integer primary key to walk, normally the AUTO_INCREMENT id
+    chunkSize: Width of the first key range
+    targetSeconds: How long each chunk should hold its locks; the range width is adjusted towards it
+    minChunk, maxChunk: Limits for the range width
+    checkpointPath: JSON file that records progress, so a rerun of the same change resumes after the last committed chunk;
+                    the last chunk may be applied twice, so use it only for idempotent changes
+    maxRetries: How many times a chunk is retried after a deadlock or lock wait timeout
+    """
+
+    def __init__(self, connection, table, keyColumn="id", chunkSize=1000, targetSeconds=0.5, minChunk=10, maxChunk=100000, checkpointPath=None, maxRetries=3):
+        self.connection = connection
+        self.table = table
+        self.keyColumn = keyColumn
+        self.chunkSize = chunkSize
+        self.targetSeconds = targetSeconds
+        self.minChunk = minChunk
+        self.maxChunk = maxChunk
+        self.checkpointPath = checkpointPath
+        self.maxRetries = maxRetries
+
+        self.rows = 0
+        self.chunks = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    def update(self, setClause, setParams=(), where=None, whereParams=()):
+        """
+        update(setClause, setParams=(), where=None, whereParams=()) -> Runs "UPDATE table SET setClause WHERE where" chunk by chunk and returns the rows changed
+        """
+        sql = "UPDATE `{}` SET {} WHERE `{}` >= %s AND `{}` < %s".format(self.table, setClause, self.keyColumn, self.keyColumn)
+        if where:
+            sql += " AND ({})".format(where)
+        return self._run(sql, tuple(setParams), tuple(whereParams))
+
+    def delete(self, where=None, whereParams=()):
+        """
+        delete(where=None, whereParams=()) -> Runs "DELETE FROM table WHERE where" chunk by chunk and returns the rows deleted
+        """
+        sql = "DELETE FROM `{}` WHERE `{}` >= %s AND `{}` < %s".format(self.table, self.keyColumn, self.keyColumn)
+        if where:
+            sql += " AND ({})".format(where)
+        return self._run(sql, (), tuple(whereParams))
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "retries": self.retries,
+            "seconds": self.seconds,
+            "rowsPerSecond": self.rows / self.seconds if self.seconds else 0.0,
+            "chunkSize": self.chunkSize
+        }
+
+    def _run(self, sql, leadingParams, trailingParams):
+        start = time.perf_counter()
+        changed = 0
+        lowest, highest = self._keyRange()
+        checkpointKey = json.loads(json.dumps([sql, leadingParams, trailingParams], default=str))
+
+        # The checkpoint is only used when it was written by the same statement with the same values
+        lower = lowest
+        saved = self._loadCheckpoint()
+        if saved is not None and saved.get("statement") == checkpointKey:
+            lower = max(lowest, saved["next"])
+            self.chunkSize = saved.get("chunkSize", self.chunkSize)
+
+        while highest is not None and lower <= highest:
+            chunkStart = time.perf_counter()
+            count, upper = self._applyChunk(sql, leadingParams, lower, trailingParams)
+            elapsed = time.perf_counter() - chunkStart
+
+            changed += count
+            self.rows += count
+            self.chunks += 1
+            lower = upper
+            self._adapt(elapsed)
+            self._saveCheckpoint({"statement": checkpointKey, "next": lower, "chunkSize": self.chunkSize})
+
+        self._clearCheckpoint()
+        self.seconds += time.perf_counter() - start
+        return changed
+
+    def _applyChunk(self, sql, leadingParams, lower, trailingParams):
+        # Returns (rows changed, upper end of the range applied); the range is taken again from chunkSize on every
+        # attempt, so a retry runs the narrower range
+        attempt = 0
+        while True:
+            upper = lower + self.chunkSize
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(sql, leadingParams + (lower, upper) + trailingParams)
+                count = cursor.rowcount
+                self.connection.commit()
+                invalidateTables(self.table)
+                return count, upper
+            except Exception as e:
+                self.connection.rollback()
+                if getattr(e, "errno", None) not in RETRYABLE_ERRORS or attempt >= self.maxRetries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                # A chunk that keeps losing lock races is too wide; the retry covers only the first half of it
+                self.chunkSize = max(self.minChunk, self.chunkSize // 2)
+                time.sleep(0.05 * 2 ** attempt)
+            finally:
+                cursor.close()
+
+    def _adapt(self, elapsed):
+        # Scale the range towards the target time, at most doubling or halving per chunk so one slow chunk does not swing it too far
+        if elapsed <= 0:
+            factor = 2.0
+        else:
+            factor = min(2.0, max(0.5, self.targetSeconds / elapsed))
+        self.chunkSize = int(min(self.maxChunk, max(self.minChunk, self.chunkSize * factor)))
+
+    def _keyRange(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT MIN(`{0}`), MAX(`{0}`) FROM `{1}`".format(self.keyColumn, self.table))
+            lowest, highest = cursor.fetchone()
+        finally:
+            cursor.close()
+        return (lowest or 0), highest
+
+    def _loadCheckpoint(self):
+        if not self.checkpointPath or not os.path.exists(self.checkpointPath):
+            return None
+        with open(self.checkpointPath) as f:
+            return json.load(f)
+
+    def _saveCheckpoint(self, state):
+        if not self.checkpointPath:
+            return
+        # Write then rename, so an interruption never leaves half a checkpoint behind
+        temporary = self.checkpointPath + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(state, f, default=str)
+        os.replace(temporary, self.checkpointPath)
+
+    def _clearCheckpoint(self):
+        if self.checkpointPath and os.path.exists(self.checkpointPath):
+            os.remove(self.checkpointPath)
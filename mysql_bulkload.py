@@ -0,0 +1,239 @@
+# MySQL Bulk Loader
+
+# w3school_pythonmysqlinsert.py loads rows with executemany() and a single commit() at the end.
+# For millions of name/address pairs that is one huge statement and one huge transaction.
+# BulkLoader chunks any iterable (or a CSV file) into multi-row INSERT statements sized to the server's max_allowed_packet,
+# commits each batch on its own (dropping any cached query results for the table), retries a batch when it loses a deadlock and reports rows/sec.
+# It can also hand each batch to LOAD DATA LOCAL INFILE, which is faster still when the server allows it.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_bulkload import BulkLoader
+
+mydb = mysql_pool.getConnection()
+
+loader = BulkLoader(mydb, "customers", ["name", "address"])
+loader.loadCsv("customers.csv")
+print(loader.stats())
+
+mydb.close()
+"""
+
+import csv
+import os
+import tempfile
+import time
+
+from mysql_cache import invalidateTables
+
+# MySQL error numbers worth retrying: ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT
+RETRYABLE_ERRORS = (1213, 1205)
+
+# Bytes per statement kept free for the INSERT prefix, protocol header and escaping that grows the values
+PACKET_HEADROOM = 0.9
+
+# Characters the connector backslash-escapes when it renders a value into the statement
+ESCAPED_CHARACTERS = ("\\", "'", '"', "\n", "\r", "\x00", "\x1a")
+
+
+class BulkLoader:
+    """
+    BulkLoader(connection, table, columns, maxPacket=None, maxRows=None, useLoadData=False, maxRetries=3)
+
+    Parameters:
+    connection: An open connection (plain or from mysql_pool)
+    table: The table to load into
+    columns: The column names, in the order values appear in each row
+    maxPacket: Statement size limit in bytes, defaults to the server's max_allowed_packet
+    maxRows: Optional cap on rows per batch
+    useLoadData: Send batches with LOAD DATA LOCAL INFILE instead of INSERT (the connection needs allow_local_infile=True)
+    maxRetries: How many times a batch is retried after a deadlock or lock wait timeout
+    """
+
+    def __init__(self, connection, table, columns, maxPacket=None, maxRows=None, useLoadData=False, maxRetries=3):
+        self.connection = connection
+        self.table = table
+        self.columns = list(columns)
+        self.maxPacket = maxPacket or self._serverMaxPacket()
+        self.maxRows = maxRows
+        self.useLoadData = useLoadData
+        self.maxRetries = maxRetries
+
+        self.rows = 0
+        self.batches = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+        columnList = ", ".join("`{}`".format(c) for c in self.columns)
+        self._insertPrefix = "INSERT INTO `{}` ({}) VALUES ".format(self.table, columnList)
+        self._rowPlaceholder = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        self._loadDataSql = ("LOAD DATA LOCAL INFILE %s INTO TABLE `{}` "
+                             "FIELDS TERMINATED BY ',' ENCLOSED BY '\"' ESCAPED BY '' "
+                             "LINES TERMINATED BY '\\n' ({})").format(self.table, columnList)
+
+    def load(self, rows):
+        """
+        load(rows) -> Loads an iterable of row tuples and returns the number of rows loaded
+        """
+        start = time.perf_counter()
+        loaded = 0
+        batch = []
+        batchBytes = len(self._insertPrefix)
+        limit = int(self.maxPacket * PACKET_HEADROOM)
+
+        for row in rows:
+            if len(row) != len(self.columns):
+                raise Exception("Expected {} values per row, got {}: {!r}".format(len(self.columns), len(row), row))
+            rowBytes = self._estimateBytes(row)
+            if batch and (batchBytes + rowBytes > limit or (self.maxRows and len(batch) >= self.maxRows)):
+                loaded += self._flush(batch)
+                batch = []
+                batchBytes = len(self._insertPrefix)
+            batch.append(row)
+            batchBytes += rowBytes
+
+        if batch:
+            loaded += self._flush(batch)
+
+        self.seconds += time.perf_counter() - start
+        return loaded
+
+    def loadCsv(self, path, skipHeader=True, encoding="utf-8"):
+        """
+        loadCsv(path, skipHeader=True, encoding="utf-8") -> Streams a CSV file through load() without reading it all into memory
+        """
+        with open(path, newline="", encoding=encoding) as f:
+            reader = csv.reader(f)
+            if skipHeader:
+                next(reader, None)
+            return self.load(reader)
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": self.seconds,
+            "rowsPerSecond": self.rows / self.seconds if self.seconds else 0.0
+        }
+
+    def _flush(self, batch):
+        attempt = 0
+        while True:
+            try:
+                if self.useLoadData:
+                    self._sendLoadData(batch)
+                else:
+                    self._sendInsert(batch)
+                self.connection.commit()
+                invalidateTables(self.table)
+                break
+            except Exception as e:
+                self.connection.rollback()
+                if getattr(e, "errno", None) not in RETRYABLE_ERRORS or attempt >= self.maxRetries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                time.sleep(0.05 * 2 ** attempt)
+
+        self.rows += len(batch)
+        self.batches += 1
+        return len(batch)
+
+    def _sendInsert(self, batch):
+        sql = self._insertPrefix + ", ".join([self._rowPlaceholder] * len(batch))
+        params = [value for row in batch for value in row]
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params)
+        finally:
+            cursor.close()
+
+    def _sendLoadData(self, batch):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                for row in batch:
+                    f.write(",".join(self._loadDataField(value) for value in row))
+                    f.write("\n")
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(self._loadDataSql, (path, ))
+            finally:
+                cursor.close()
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _loadDataField(value):
+        # With ESCAPED BY '' an unquoted NULL is read as SQL NULL and a doubled quote as a literal quote
+        if value is None:
+            return "NULL"
+        return '"' + str(value).replace('"', '""') + '"'
+
+    @staticmethod
+    def _estimateBytes(row):
+        # Quotes and separator per value, doubled for values that might need escaping
+        size = 4
+        for value in row:
+            text = "NULL" if value is None else str(value)
+            size += len(text.encode("utf-8")) + 4
+            if any(c in text for c in ESCAPED_CHARACTERS):
+                size += len(text)
+        return size
+
+    def _serverMaxPacket(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return int(row[1]) if row else 4 * 1024 * 1024
+
+
+# Benchmark - executemany() with one commit (as in w3school_pythonmysqlinsert.py) against BulkLoader
+
+BENCH_TABLE = "customers_bulkload_bench"
+
+
+def _benchRows(count):
+    for i in range(count):
+        yield ("Customer {}".format(i), "Highway {}".format(i % 1000))
+
+
+def benchmark(rowCount=200000, useLoadData=False):
+    """
+    benchmark(rowCount=200000, useLoadData=False) -> Loads rowCount rows into a scratch table both ways and prints the speedup
+    """
+    import mysql_pool
+
+    mydb = mysql_pool.getConnection()
+    mycursor = mydb.cursor()
+    mycursor.execute("DROP TABLE IF EXISTS {}".format(BENCH_TABLE))
+    mycursor.execute("CREATE TABLE {} (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255), address VARCHAR(255))".format(BENCH_TABLE))
+
+    start = time.perf_counter()
+    mycursor.executemany("INSERT INTO {} (name, address) VALUES (%s, %s)".format(BENCH_TABLE), list(_benchRows(rowCount)))
+    mydb.commit()
+    executemanySeconds = time.perf_counter() - start
+
+    mycursor.execute("TRUNCATE TABLE {}".format(BENCH_TABLE))
+
+    loader = BulkLoader(mydb, BENCH_TABLE, ["name", "address"], useLoadData=useLoadData)
+    loader.load(_benchRows(rowCount))
+    stats = loader.stats()
+
+    mycursor.execute("DROP TABLE {}".format(BENCH_TABLE))
+    mycursor.close()
+    mydb.close()
+
+    print("executemany: {:>12.0f} rows/sec".format(rowCount / executemanySeconds))
+    print("BulkLoader:  {:>12.0f} rows/sec in {} batches ({} retries)".format(stats["rowsPerSecond"], stats["batches"], stats["retries"]))
+    print("Speedup: {:.2f}x".format(executemanySeconds / stats["seconds"]))
+    return executemanySeconds, stats
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,249 @@
+# MySQL Query Result Cache
+
+# The lookups in w3school_pythonmysqlwhere.py and the join in w3school_pythonmysqljoin.py get re-run with the same parameters over and over.
+# QueryCache keeps their results in memory, keyed on the normalised SQL plus the parameters, so a repeated read never goes to the server.
+# Entries expire after a TTL, the least recently used ones are dropped when the cache goes over its memory budget,
+# and any write made through a cache (or a helper such as BulkLoader) throws away the cached results for the tables it touched.
+
+# E.g.
+"""
+import mysql_pool
+import mysql_cache
+
+mydb = mysql_pool.getConnection()
+cache = mysql_cache.getCache()
+
+rows = cache.query(mydb, "SELECT * FROM customers WHERE address = %s", ("Park Lane 38", ))    # goes to the server
+rows = cache.query(mydb, "SELECT * FROM customers WHERE address = %s", ("Park Lane 38", ))    # served from memory
+
+cache.execute(mydb, "UPDATE customers SET address = %s WHERE address = %s", ("Canyon 123", "Valley 345"))    # drops cached customers results
+print(cache.stats())
+
+mydb.close()
+"""
+
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# Quoted string literals and identifiers, which normalisation and table detection must leave alone
+_LITERAL = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`)""", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+# A table name, optionally schema-qualified, bare or in backticks
+_NAME = r"(?:`[^`]+`|\w+)(?:\s*\.\s*(?:`[^`]+`|\w+))?"
+# Keywords followed by exactly one table
+_SINGLE_TABLE = re.compile(r"\b(?:JOIN|INTO|TABLE)\s+(" + _NAME + ")", re.IGNORECASE)
+# FROM and UPDATE take a comma separated list of tables (each with an optional alias) up to the next clause
+_TABLE_LIST = re.compile(r"\b(?:FROM|UPDATE)\s+(.*?)(?=\b(?:WHERE|GROUP|ORDER|LIMIT|HAVING|JOIN|INNER|LEFT|RIGHT|CROSS|NATURAL|"
+                         r"STRAIGHT_JOIN|UNION|FOR|ON|USING|SET|WINDOW|LOCK|INTO|VALUES|SELECT)\b|[();]|$)", re.IGNORECASE | re.DOTALL)
+_LIST_ITEM = re.compile(r"\s*(" + _NAME + ")")
+
+_caches = weakref.WeakSet()
+
+
+def normaliseSql(sql):
+    """
+    normaliseSql(sql) -> The statement with runs of whitespace collapsed outside quoted literals and any trailing semicolon removed
+
+    Only used to build cache keys; the statement sent to the server is always the caller's own.
+    """
+    parts = _LITERAL.split(sql)
+    # split() with a capturing group puts the literals at the odd positions
+    for i in range(0, len(parts), 2):
+        parts[i] = _WHITESPACE.sub(" ", parts[i])
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def tableName(name):
+    """
+    tableName(name) -> Lower-case table name without schema or backticks, e.g. "mydatabase.`Customers`" -> "customers"
+    """
+    return name.split(".")[-1].strip().strip("`").lower()
+
+
+def tablesIn(sql):
+    """
+    tablesIn(sql) -> Lower-case names of the tables a statement reads or writes
+    """
+    # Literals become placeholders so their contents are not mistaken for SQL; backticked names stay
+    sql = _LITERAL.sub(lambda match: match.group(0) if match.group(0).startswith("`") else "?", sql)
+    tables = {tableName(name) for name in _SINGLE_TABLE.findall(sql)}
+    for tableList in _TABLE_LIST.findall(sql):
+        for item in tableList.split(","):
+            match = _LIST_ITEM.match(item)
+            if match:
+                tables.add(tableName(match.group(1)))
+    return frozenset(tables)
+
+
+def invalidateTables(*tables):
+    """
+    invalidateTables(*tables) -> Drops cached results that read any of the tables, in every live QueryCache
+    """
+    for cache in list(_caches):
+        cache.invalidate(*tables)
+
+
+def _copyRows(rows):
+    # Tuple rows are immutable and can be shared; dictionary rows (dictionary=True cursors) are copied
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+def _sizeOf(rows):
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """
+    QueryCache(maxBytes=64 * 1024 * 1024, ttl=300.0)
+
+    Parameters:
+    maxBytes: Approximate memory budget for cached rows
+    ttl: Seconds a result stays valid, None to keep results until they are invalidated or evicted
+    """
+
+    def __init__(self, maxBytes=64 * 1024 * 1024, ttl=300.0):
+        self.maxBytes = maxBytes
+        self.ttl = ttl
+        self._entries = OrderedDict()    # key -> (expiresAt, rows, size, tables), least recently used first
+        self._byTable = {}               # table -> set of keys
+        self._bytes = 0
+        self._generations = {}           # table -> number of times it has been invalidated
+        self._clears = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        _caches.add(self)
+
+    def query(self, connection, sql, params=None, ttl=None):
+        """
+        query(connection, sql, params=None, ttl=None) -> The rows of a SELECT, from the cache when possible
+        """
+        key = (normaliseSql(sql), tuple(params) if params is not None else None)
+        tables = tablesIn(sql)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copyRows(entry[1])
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            # Taken before the read, so a write that lands while the read runs keeps its result out of the cache
+            generation = self._generation(tables)
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, _copyRows(rows), None if ttl is None else now + ttl, tables, generation)
+        return rows
+
+    def execute(self, connection, sql, params=None, commit=True):
+        """
+        execute(connection, sql, params=None, commit=True) -> Runs an INSERT/UPDATE/DELETE, invalidates the tables it touched and returns the rowcount
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+        if commit:
+            connection.commit()
+        invalidateTables(*tablesIn(sql))
+        return rowcount
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in map(tableName, tables):
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in self._byTable.pop(table, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._byTable.clear()
+            self._bytes = 0
+            self._clears += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def _generation(self, tables):
+        return (self._clears, tuple(self._generations.get(table, 0) for table in sorted(tables)))
+
+    def _store(self, key, rows, expiresAt, tables, generation):
+        size = _sizeOf(rows)
+        if size > self.maxBytes:
+            return
+        with self._lock:
+            if self._generation(tables) != generation:
+                # One of the tables was written (or the cache cleared) after the read started
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expiresAt, rows, size, tables)
+            self._bytes += size
+            for table in tables:
+                self._byTable.setdefault(table, set()).add(key)
+            while self._bytes > self.maxBytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        expiresAt, rows, size, tables = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._byTable.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._byTable[table]
+
+
+_defaultCache = None
+_defaultCacheLock = threading.Lock()
+
+
+def getCache():
+    global _defaultCache
+    with _defaultCacheLock:
+        if _defaultCache is None:
+            _defaultCache = QueryCache()
+    return _defaultCache
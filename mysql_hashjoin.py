@@ -0,0 +1,168 @@
+# MySQL Client-Side Hash Join
+
+# w3school_pythonmysqljoin.py runs "users INNER JOIN products ON users.fav = products.id" on the server every time.
+# products is a small table that hardly ever changes, so it can be loaded once into a dict keyed on id (a hash index)
+# and the large side, users, streamed past it and joined locally.
+# DimensionTable keeps the small side in memory and reloads it only when a cheap version check says the table has changed.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_hashjoin import DimensionTable, hashJoin
+
+mydb = mysql_pool.getConnection()
+
+products = DimensionTable(mydb, "products", columns=["name", "url"])
+
+# (users.name, users.fav) + (products.name, products.url)
+for user, fav, favorite, url in hashJoin(mydb, "SELECT name, fav FROM users", products, keyIndex=1):
+    print(user, favorite, url)
+
+mydb.close()
+"""
+
+import time
+
+from mysql_stream import streamQuery
+
+
+class DimensionTable:
+    """
+    DimensionTable(connection, table, keyColumn="id", columns=None, checkInterval=5.0, versionSql=None)
+
+    Parameters:
+    connection: An open connection (plain or from mysql_pool)
+    table: The small table to keep in memory
+    keyColumn: The column the join matches on, normally the primary key
+    columns: Columns kept for each key, defaults to every column
+    checkInterval: Seconds between version checks; within that window the cached rows are used as they are
+    versionSql: Query whose result changes whenever the table does, defaults to CHECKSUM TABLE (cheap for a small table)
+    """
+
+    def __init__(self, connection, table, keyColumn="id", columns=None, checkInterval=5.0, versionSql=None):
+        self.connection = connection
+        self.table = table
+        self.keyColumn = keyColumn
+        self.columns = list(columns) if columns else None
+        self.checkInterval = checkInterval
+        self.versionSql = versionSql or "CHECKSUM TABLE `{}`".format(table)
+
+        self.rows = {}
+        # Number of columns kept per key, known from the column list or from the first load
+        self.width = len(self.columns) if self.columns else None
+        self.version = None
+        self.loads = 0
+        self._checkedAt = None
+
+    def refresh(self, force=False):
+        """
+        refresh(force=False) -> Reloads the table if its version changed (or force is set) and returns True when it did
+        """
+        now = time.monotonic()
+        if not force and self._checkedAt is not None and now - self._checkedAt < self.checkInterval:
+            return False
+        self._checkedAt = now
+
+        version = self._query(self.versionSql)[0]
+        if not force and version == self.version:
+            return False
+
+        select = ", ".join("`{}`".format(c) for c in self.columns) if self.columns else "`{}`.*".format(self.table)
+        rows, description = self._query("SELECT `{}`, {} FROM `{}`".format(self.keyColumn, select, self.table))
+        self.rows = {row[0]: tuple(row[1:]) for row in rows}
+        self.width = len(description) - 1
+        self.version = version
+        self.loads += 1
+        return True
+
+    def get(self, key, default=None):
+        return self.rows.get(key, default)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _query(self, sql):
+        # (rows, cursor.description); the description gives the column count even when there are no rows
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall(), cursor.description
+        finally:
+            cursor.close()
+
+
+def hashJoin(connection, sql, dimension, keyIndex, params=None, outer=False, batchSize=1000):
+    """
+    hashJoin(connection, sql, dimension, keyIndex, params=None, outer=False, batchSize=1000) -> Yields each row of sql joined to its dimension row
+
+    Parameters:
+    connection: Connection the large side is streamed from
+    sql: SELECT for the large side
+    dimension: A DimensionTable for the small side
+    keyIndex: Position of the join key in the rows of sql
+    outer: Keep rows with no match (LEFT JOIN), padding the dimension columns with None
+    """
+    dimension.refresh()
+    rows = dimension.rows
+    missing = None
+    for factRow in streamQuery(connection, sql, params, batchSize):
+        match = rows.get(factRow[keyIndex])
+        if match is None:
+            if not outer:
+                continue
+            if missing is None:
+                missing = (None, ) * dimension.width
+            match = missing
+        yield tuple(factRow) + match
+
+
+# Benchmark - server-side INNER JOIN against hashJoin for growing users tables
+
+def benchmark(sizes=(1000, 10000, 100000, 1000000), productCount=100):
+    """
+    benchmark(sizes=(1000, 10000, 100000, 1000000), productCount=100) -> Prints the time of both joins for each users table size
+    """
+    import mysql_pool
+    from mysql_bulkload import BulkLoader
+
+    mydb = mysql_pool.getConnection()
+    mycursor = mydb.cursor()
+    mycursor.execute("DROP TABLE IF EXISTS users_join_bench, products_join_bench")
+    mycursor.execute("CREATE TABLE products_join_bench (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255), url VARCHAR(255))")
+    mycursor.execute("CREATE TABLE users_join_bench (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255), fav INT)")
+    BulkLoader(mydb, "products_join_bench", ["name", "url"]).load(
+        ("Product {}".format(i), "https://example.com/{}".format(i)) for i in range(productCount))
+
+    serverSql = ("SELECT users_join_bench.name, products_join_bench.name, products_join_bench.url FROM users_join_bench "
+                 "INNER JOIN products_join_bench ON users_join_bench.fav = products_join_bench.id")
+    results = {}
+    loaded = 0
+    for size in sizes:
+        BulkLoader(mydb, "users_join_bench", ["name", "fav"]).load(
+            ("User {}".format(i), 1 + i % productCount) for i in range(loaded, size))
+        loaded = size
+
+        start = time.perf_counter()
+        mycursor.execute(serverSql)
+        serverRows = len(mycursor.fetchall())
+        serverSeconds = time.perf_counter() - start
+
+        # A fresh dimension each time, so the client side pays for loading products too
+        products = DimensionTable(mydb, "products_join_bench", columns=["name", "url"])
+        start = time.perf_counter()
+        clientRows = sum(1 for row in hashJoin(mydb, "SELECT name, fav FROM users_join_bench", products, keyIndex=1))
+        clientSeconds = time.perf_counter() - start
+
+        if serverRows != clientRows:
+            raise Exception("Join results differ: {} server rows, {} client rows".format(serverRows, clientRows))
+        results[size] = (serverSeconds, clientSeconds)
+        print("{:>9} users  server: {:8.3f} s  client: {:8.3f} s  ({:.2f}x)".format(size, serverSeconds, clientSeconds, serverSeconds / clientSeconds))
+
+    mycursor.execute("DROP TABLE users_join_bench, products_join_bench")
+    mycursor.close()
+    mydb.close()
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,175 @@
+# MySQL Keyset Pagination
+
+# w3school_pythonmysqllimit.py pages with "LIMIT 5 OFFSET 2". The server still reads and throws away every skipped row,
+# so the deeper the page the slower it gets.
+# Keyset (seek) pagination remembers the sort key of the last row on a page and asks for the rows after it:
+#     SELECT ... WHERE name > 'Hannah' OR (name = 'Hannah' AND id > 4) ORDER BY name, id LIMIT 5
+# With an index on the sort key every page costs the same, whether it is page 1 or page 10,000.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_paginate import KeysetPaginator
+
+mydb = mysql_pool.getConnection()
+
+paginator = KeysetPaginator(mydb, "customers", sortKey="name", pageSize=5)
+rows, token = paginator.page()          # first page
+rows, token = paginator.page(token)     # next page, token is None after the last page
+
+mydb.close()
+"""
+
+import base64
+import json
+import time
+
+
+class KeysetPaginator:
+    """
+    KeysetPaginator(connection, table, columns="*", sortKey="id", uniqueKey="id", pageSize=20, descending=False)
+
+    Parameters:
+    connection: An open connection (plain or from mysql_pool)
+    table: The table to page through
+    columns: The select list, defaults to every column
+    sortKey: An indexed column to order by, e.g. "name" (NULL values are not supported)
+    uniqueKey: A unique column that breaks ties between equal sort keys, normally the AUTO_INCREMENT primary key
+    pageSize: Rows per page
+    descending: Page from the largest sort key down
+    """
+
+    def __init__(self, connection, table, columns="*", sortKey="id", uniqueKey="id", pageSize=20, descending=False):
+        if pageSize < 1:
+            raise Exception("pageSize must be at least 1")
+        self.connection = connection
+        self.table = table
+        self.pageSize = pageSize
+        self.descending = descending
+
+        # The key columns are selected again at the end of every row so the next token can be read from the last row
+        self._keys = [sortKey] if sortKey == uniqueKey else [sortKey, uniqueKey]
+        direction = "DESC" if descending else "ASC"
+        compare = "<" if descending else ">"
+        select = "SELECT {}, {} FROM `{}`".format(columns, ", ".join("`{}`".format(k) for k in self._keys), table)
+        order = " ORDER BY " + ", ".join("`{}` {}".format(k, direction) for k in self._keys) + " LIMIT %s"
+
+        if len(self._keys) == 1:
+            seek = " WHERE `{0}` {1} %s".format(sortKey, compare)
+        else:
+            seek = " WHERE `{0}` {2} %s OR (`{0}` = %s AND `{1}` {2} %s)".format(sortKey, uniqueKey, compare)
+
+        self._firstSql = select + order
+        self._seekSql = select + seek + order
+
+    def page(self, token=None):
+        """
+        page(token=None) -> Returns (rows, nextToken) for the page after token, nextToken is None on the last page
+        """
+        if token is None:
+            sql, params = self._firstSql, (self.pageSize, )
+        else:
+            sql, params = self._seekSql, self._seekParams(decodeToken(token)) + (self.pageSize, )
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        keyCount = len(self._keys)
+        nextToken = encodeToken(rows[-1][-keyCount:]) if len(rows) == self.pageSize else None
+        return [tuple(row[:-keyCount]) for row in rows], nextToken
+
+    def pages(self, token=None):
+        """
+        pages(token=None) -> Yields every page (a list of rows) from token to the end of the table
+        """
+        while True:
+            rows, token = self.page(token)
+            if rows:
+                yield rows
+            if token is None:
+                return
+
+    def _seekParams(self, keyValues):
+        if len(keyValues) != len(self._keys):
+            raise Exception("Page token does not belong to this paginator")
+        if len(self._keys) == 1:
+            return (keyValues[0], )
+        return (keyValues[0], keyValues[0], keyValues[1])
+
+
+def encodeToken(keyValues):
+    """
+    encodeToken(keyValues) -> Opaque URL-safe string holding the sort key values of the last row on a page
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(keyValues), default=str).encode("utf-8")).decode("ascii")
+
+
+def decodeToken(token):
+    try:
+        return json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise Exception("Invalid page token: {!r}".format(token))
+
+
+# Benchmark - page 1 and a deep page with LIMIT/OFFSET against the keyset paginator
+
+BENCH_TABLE = "customers_paginate_bench"
+
+
+def _timeQuery(cursor, sql, params, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(pageSize=20, deepPage=10000, repeat=5):
+    """
+    benchmark(pageSize=20, deepPage=10000, repeat=5) -> Prints per-page latency at page 1 and page deepPage for both methods
+    """
+    if deepPage < 2:
+        raise Exception("deepPage must be at least 2, page 1 is always measured")
+    import mysql_pool
+    from mysql_bulkload import BulkLoader
+
+    rowCount = pageSize * (deepPage + 1)
+    mydb = mysql_pool.getConnection()
+    mycursor = mydb.cursor()
+    mycursor.execute("DROP TABLE IF EXISTS {}".format(BENCH_TABLE))
+    mycursor.execute("CREATE TABLE {} (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255), address VARCHAR(255), INDEX (name, id))".format(BENCH_TABLE))
+    BulkLoader(mydb, BENCH_TABLE, ["name", "address"]).load(
+        ("Customer {:08d}".format((i * 7919) % rowCount), "Highway {}".format(i)) for i in range(rowCount))
+
+    paginator = KeysetPaginator(mydb, BENCH_TABLE, sortKey="name", pageSize=pageSize)
+    offsetSql = "SELECT * FROM {} ORDER BY name, id LIMIT %s OFFSET %s".format(BENCH_TABLE)
+
+    # The token for the deep page is the key of the row just before it
+    mycursor.execute("SELECT name, id FROM {} ORDER BY name, id LIMIT 1 OFFSET %s".format(BENCH_TABLE), ((deepPage - 1) * pageSize - 1, ))
+    deepToken = encodeToken(mycursor.fetchone())
+
+    results = {
+        "offset": (_timeQuery(mycursor, offsetSql, (pageSize, 0), repeat),
+                   _timeQuery(mycursor, offsetSql, (pageSize, (deepPage - 1) * pageSize), repeat)),
+        "keyset": (_timeQuery(mycursor, paginator._firstSql, (pageSize, ), repeat),
+                   _timeQuery(mycursor, paginator._seekSql, paginator._seekParams(decodeToken(deepToken)) + (pageSize, ), repeat))
+    }
+
+    mycursor.execute("DROP TABLE {}".format(BENCH_TABLE))
+    mycursor.close()
+    mydb.close()
+
+    for name, (first, deep) in results.items():
+        print("{:<7} page 1: {:8.3f} ms   page {}: {:8.3f} ms".format(name, 1000 * first, deepPage, 1000 * deep))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,264 @@
+# MySQL Connection Pool
+
+# Every MySQL script used to open its own connection with mysql.connector.connect() at import time and never close it.
+# When the scripts run back to back as jobs the connect handshake (TCP, auth, database select) costs more than the short queries themselves.
+# This module keeps a shared pool of open connections: scripts check one out, use it like a normal connection and close() it to hand it back.
+# The pool lives in one Python process. Connections are reused by every thread of that process (and by scripts run one
+# after another inside it), but each separate process - a script started from the shell, a multiprocessing worker -
+# builds its own pool and pays for its own connects.
+
+# E.g.
+"""
+import mysql_pool
+
+mydb = mysql_pool.getConnection()
+mycursor = mydb.cursor()
+mycursor.execute("SELECT name, address FROM customers")
+print(mycursor.fetchall())
+mydb.close()    # returns the connection to the pool instead of closing it
+
+print(mysql_pool.getPool().stats())
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+
+# Connection details shared by all the scripts
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "mahanta1",
+    "database": "mydatabase"
+}
+
+
+def mysqlConnect(**config):
+    """
+    mysqlConnect(**config) -> Opens a real connection with mysql.connector
+
+    The import is done here so the pool can be used (and tested) with a stand-in connect function
+    on machines where mysql-connector-python is not installed.
+    """
+    import mysql.connector
+    return mysql.connector.connect(**config)
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class PooledConnection:
+    """
+    Wraps a connection checked out of a ConnectionPool.
+
+    Everything except close() is passed through to the real connection, so scripts keep using
+    mydb.cursor(), mydb.commit() etc. as before. close() hands the connection back to the pool.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise Exception("Connection has already been returned to the pool")
+        return getattr(self._connection, name)
+
+    @property
+    def raw(self):
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    ConnectionPool(size=5, connectFunction=None, healthCheckAfter=30.0, idleTimeout=300.0, checkoutTimeout=10.0, **config)
+
+    Parameters:
+    size: Maximum number of open connections
+    connectFunction: Callable used to open a connection, defaults to mysqlConnect (swap in a stand-in for testing)
+    healthCheckAfter: Seconds a connection may sit idle before it is checked with is_connected() on checkout
+    idleTimeout: Seconds after which an idle connection is closed and dropped from the pool
+    checkoutTimeout: Seconds to wait for a free connection before raising PoolExhausted
+    config: Connection arguments, defaults to DB_CONFIG
+    """
+
+    def __init__(self, size=5, connectFunction=None, healthCheckAfter=30.0, idleTimeout=300.0, checkoutTimeout=10.0, **config):
+        if size < 1:
+            raise Exception("Pool size must be at least 1")
+        self.size = size
+        self.connectFunction = connectFunction or mysqlConnect
+        self.healthCheckAfter = healthCheckAfter
+        self.idleTimeout = idleTimeout
+        self.checkoutTimeout = checkoutTimeout
+        self.config = config or dict(DB_CONFIG)
+
+        self._idle = deque()    # (connection, time it was returned)
+        self._open = 0
+        self._condition = threading.Condition()
+
+        # Metrics
+        self.checkouts = 0
+        self.connectsMade = 0
+        self.healthCheckFailures = 0
+        self.evictions = 0
+        self._checkoutTimes = deque(maxlen=1000)
+
+    def checkout(self):
+        start = time.perf_counter()
+        deadline = start + self.checkoutTimeout
+        connection = None
+
+        with self._condition:
+            while True:
+                self._evictIdle()
+                if self._idle:
+                    connection, returnedAt = self._idle.pop()   # most recently used connection first
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise PoolExhausted("No free connection after {} seconds (pool size {})".format(self.checkoutTimeout, self.size))
+                self._condition.wait(remaining)
+
+        if connection is not None and time.monotonic() - returnedAt > self.healthCheckAfter:
+            if not self._isHealthy(connection):
+                with self._condition:
+                    self.healthCheckFailures += 1
+                self._closeQuietly(connection)
+                connection = None
+
+        connected = connection is None
+        if connected:
+            try:
+                connection = self.connectFunction(**self.config)
+            except Exception:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+                raise
+
+        with self._condition:
+            self.connectsMade += connected
+            self.checkouts += 1
+            self._checkoutTimes.append(time.perf_counter() - start)
+        return PooledConnection(self, connection)
+
+    def release(self, connection):
+        # Anything left uncommitted belongs to the script that checked the connection out, not the next one
+        try:
+            if getattr(connection, "in_transaction", False):
+                connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def closeAll(self):
+        with self._condition:
+            while self._idle:
+                connection, returnedAt = self._idle.popleft()
+                self._open -= 1
+                self._closeQuietly(connection)
+
+    def stats(self):
+        with self._condition:
+            times = sorted(self._checkoutTimes)
+            idle = len(self._idle)
+            inUse = self._open - idle
+            counters = (self.checkouts, self.connectsMade, self.healthCheckFailures, self.evictions)
+        return {
+            "size": self.size,
+            "open": idle + inUse,
+            "idle": idle,
+            "inUse": inUse,
+            "checkouts": counters[0],
+            "connectsMade": counters[1],
+            "healthCheckFailures": counters[2],
+            "evictions": counters[3],
+            "avgCheckoutMs": 1000 * sum(times) / len(times) if times else 0.0,
+            "p95CheckoutMs": 1000 * times[int(0.95 * (len(times) - 1))] if times else 0.0,
+            "maxCheckoutMs": 1000 * times[-1] if times else 0.0
+        }
+
+    def _evictIdle(self):
+        # Called with the lock held. The oldest idle connections sit at the left of the deque.
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idleTimeout:
+            connection, returnedAt = self._idle.popleft()
+            self._open -= 1
+            self.evictions += 1
+            self._closeQuietly(connection)
+
+    def _discard(self, connection):
+        self._closeQuietly(connection)
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _isHealthy(connection):
+        try:
+            return connection.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _closeQuietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_defaultPool = None
+_defaultPoolLock = threading.Lock()
+
+
+def configurePool(**kwargs):
+    """
+    configurePool(**kwargs) -> Replaces the shared pool with one built from the given ConnectionPool arguments
+    """
+    global _defaultPool
+    with _defaultPoolLock:
+        if _defaultPool is not None:
+            _defaultPool.closeAll()
+        _defaultPool = ConnectionPool(**kwargs)
+    return _defaultPool
+
+
+def getPool():
+    global _defaultPool
+    with _defaultPoolLock:
+        if _defaultPool is None:
+            _defaultPool = ConnectionPool()
+    return _defaultPool
+
+
+def getConnection():
+    return getPool().checkout()
+
+
+def _closeDefaultPool():
+    if _defaultPool is not None:
+        _defaultPool.closeAll()
+
+
+atexit.register(_closeDefaultPool)
@@ -0,0 +1,216 @@
+# MySQL Prepared Statement Cache
+
+# The parameterised statements in w3school_pythonmysqlinsert.py ("INSERT INTO customers (name, address) VALUES (%s, %s)")
+# and w3school_pythonmysqlwhere.py ("SELECT * FROM customers WHERE address = %s") are sent as text and parsed again on every call.
+# A prepared cursor (cursor(prepared=True)) has the server parse the statement once and then sends only the parameter values,
+# bound in the binary protocol. StatementCache keeps one prepared cursor per statement for a connection,
+# closes the least recently used ones beyond maxStatements, and records the hit rate and latency percentiles per statement.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_prepared import getStatementCache
+
+mydb = mysql_pool.getConnection()
+statements = getStatementCache(mydb)
+
+for adr in ["Park Lane 38", "Highway 21", "Sky st 331"]:
+    print(statements.query("SELECT * FROM customers WHERE address = %s", (adr, )))
+
+statements.execute("INSERT INTO customers (name, address) VALUES (%s, %s)", ("Michelle", "Blue Village"))
+
+# Several writes in one transaction: commit through the cache so cached reads are dropped after the commit
+statements.execute("UPDATE customers SET address = %s WHERE name = %s", ("Canyon 123", "Michelle"), commit=False)
+statements.execute("DELETE FROM customers WHERE address = %s", ("Mountain 21", ), commit=False)
+statements.commit()
+
+print(statements.stats())
+mydb.close()
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+from mysql_cache import invalidateTables, tablesIn
+
+# Latency samples kept per statement for the percentiles
+SAMPLES_PER_STATEMENT = 1000
+
+
+class StatementCache:
+    """
+    StatementCache(connection, maxStatements=32)
+
+    Parameters:
+    connection: The connection the statements are prepared on (prepared statements belong to one server session)
+    maxStatements: Number of prepared statements kept open; the least recently used one is closed beyond that
+    """
+
+    def __init__(self, connection, maxStatements=32):
+        self.connection = connection
+        self.maxStatements = maxStatements
+        self._cursors = OrderedDict()    # sql -> prepared cursor, least recently used first
+        self._latency = {}               # sql -> deque of seconds
+        self._lock = threading.Lock()
+        self._uncommitted = set()        # tables written since the last commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def execute(self, sql, params=(), commit=True):
+        """
+        execute(sql, params=(), commit=True) -> Runs an INSERT/UPDATE/DELETE through its prepared statement and returns the rowcount
+
+        With commit=True the write is committed and then the cached reads of the tables it touched are invalidated.
+        With commit=False the tables are remembered until commit(); invalidating before the commit would let a
+        concurrent read cache the rows as they were before it.
+        """
+        with self._lock:
+            cursor = self._cursorFor(sql)
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            rowcount = cursor.rowcount
+            self._record(sql, time.perf_counter() - start)
+            self._uncommitted.update(tablesIn(sql))
+        if commit:
+            self.commit()
+        return rowcount
+
+    def commit(self):
+        """
+        commit() -> Commits the connection, then invalidates the cached reads of every table written since the last commit
+        """
+        with self._lock:
+            self.connection.commit()
+            tables, self._uncommitted = self._uncommitted, set()
+        invalidateTables(*tables)
+
+    def query(self, sql, params=()):
+        """
+        query(sql, params=()) -> Runs a SELECT through its prepared statement and returns all of its rows
+        """
+        with self._lock:
+            cursor = self._cursorFor(sql)
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            self._record(sql, time.perf_counter() - start)
+            return rows
+
+    def close(self):
+        with self._lock:
+            while self._cursors:
+                sql, cursor = self._cursors.popitem(last=False)
+                cursor.close()
+
+    def stats(self):
+        """
+        stats() -> Hit rate plus calls and p50/p95/p99 latency in milliseconds for each statement
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            statements = {}
+            for sql, samples in self._latency.items():
+                ordered = sorted(samples)
+                statements[sql] = {
+                    "calls": len(ordered),
+                    "p50Ms": 1000 * _percentile(ordered, 50),
+                    "p95Ms": 1000 * _percentile(ordered, 95),
+                    "p99Ms": 1000 * _percentile(ordered, 99)
+                }
+            return {
+                "prepared": len(self._cursors),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "statements": statements
+            }
+
+    def _cursorFor(self, sql):
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            self.hits += 1
+            return cursor
+
+        # The statement is prepared on the server the first time this cursor executes it
+        self.misses += 1
+        cursor = self.connection.cursor(prepared=True)
+        self._cursors[sql] = cursor
+        while len(self._cursors) > self.maxStatements:
+            oldSql, oldCursor = self._cursors.popitem(last=False)
+            oldCursor.close()    # deallocates the statement on the server
+            self.evictions += 1
+        return cursor
+
+    def _record(self, sql, seconds):
+        samples = self._latency.get(sql)
+        if samples is None:
+            samples = self._latency[sql] = deque(maxlen=SAMPLES_PER_STATEMENT)
+        samples.append(seconds)
+
+
+def _percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+# One cache per real connection, stored on the connection itself so it lives and dies with the server session.
+# Pooled connections are unwrapped so every checkout of the same connection shares it.
+_cachesLock = threading.Lock()
+
+
+def getStatementCache(connection, maxStatements=32):
+    """
+    getStatementCache(connection, maxStatements=32) -> The StatementCache belonging to a connection, created on first use
+    """
+    raw = getattr(connection, "raw", connection)
+    with _cachesLock:
+        cache = getattr(raw, "_statementCache", None)
+        if cache is None:
+            cache = StatementCache(raw, maxStatements)
+            raw._statementCache = cache
+        return cache
+
+
+# Benchmark - text protocol execute() against the prepared statement cache for the WHERE address lookup
+
+def benchmark(calls=5000):
+    """
+    benchmark(calls=5000) -> Prints calls/sec for the text and prepared paths and the cache stats
+    """
+    import mysql_pool
+
+    sql = "SELECT * FROM customers WHERE address = %s"
+    addresses = ["Highway {}".format(i % 100) for i in range(calls)]
+    mydb = mysql_pool.getConnection()
+
+    mycursor = mydb.cursor()
+    start = time.perf_counter()
+    for adr in addresses:
+        mycursor.execute(sql, (adr, ))
+        mycursor.fetchall()
+    textSeconds = time.perf_counter() - start
+    mycursor.close()
+
+    statements = getStatementCache(mydb)
+    start = time.perf_counter()
+    for adr in addresses:
+        statements.query(sql, (adr, ))
+    preparedSeconds = time.perf_counter() - start
+
+    stats = statements.stats()
+    mydb.close()
+
+    print("text:     {:>10.0f} calls/sec".format(calls / textSeconds))
+    print("prepared: {:>10.0f} calls/sec  hit rate {:.1%}  p50 {:.3f} ms  p99 {:.3f} ms".format(
+        calls / preparedSeconds, stats["hitRate"], stats["statements"][sql]["p50Ms"], stats["statements"][sql]["p99Ms"]))
+    return textSeconds, preparedSeconds, stats
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,390 @@
+# MySQL Query Profiler and Index Advisor
+
+# w3school_pythonmysqlcreatetbl.py creates customers with nothing but a primary key, yet the other scripts
+# filter on address (w3school_pythonmysqlwhere.py), sort on name (w3school_pythonmysqlorderby.py)
+# and join users.fav to products.id (w3school_pythonmysqljoin.py).
+# QueryProfiler records every statement run through a wrapped connection with its timing, runs EXPLAIN on it,
+# flags full table scans and filesorts, proposes covering indexes (and can create them) and
+# writes a report with the latency before and after.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_profiler import QueryProfiler
+
+profiler = QueryProfiler()
+mydb = profiler.wrap(mysql_pool.getConnection())
+
+mycursor = mydb.cursor()
+mycursor.execute("SELECT name, address FROM customers WHERE address = %s", ("Park Lane 38", ))
+mycursor.fetchall()
+
+print(profiler.report(mydb, apply=False))
+
+mydb.close()
+"""
+
+import re
+import time
+
+from mysql_cache import normaliseSql
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+_FROM_JOIN = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(?!(?:WHERE|ON|JOIN|INNER|LEFT|RIGHT|CROSS|ORDER|GROUP|LIMIT|SET)\b)(\w+))?", re.IGNORECASE)
+_SELECT_LIST = re.compile(r"^\s*SELECT\s+(.*?)\s+FROM\s", re.IGNORECASE | re.DOTALL)
+_WHERE = re.compile(r"\bWHERE\s+(.*?)(?=\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_ORDER = re.compile(r"\bORDER\s+BY\s+(.*?)(?=\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_JOIN_ON = re.compile(r"\bON\s+`?(\w+)`?\.`?(\w+)`?\s*=\s*`?(\w+)`?\.`?(\w+)`?", re.IGNORECASE)
+_PREDICATE = re.compile(r"((?:`?\w+`?\.)?`?\w+`?)\s*(=|<=|>=|<>|!=|<|>|\bLIKE\b|\bIN\b|\bBETWEEN\b)\s*('(?:[^']|'')*'|%s|\S+)", re.IGNORECASE)
+
+# Indexes wider than this stop being worth their write cost for the tutorial tables
+MAX_INDEX_COLUMNS = 5
+
+
+class StatementRecord:
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+        self.seconds = 0.0
+
+
+class ProfiledCursor:
+    """
+    Cursor wrapper that times execute() and the fetches that follow it.
+    """
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._current = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        self._current = self._profiler.record(sql, params)
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            self._current.seconds += time.perf_counter() - start
+
+    def executemany(self, sql, seqParams, *args, **kwargs):
+        self._current = self._profiler.record(sql, None)
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seqParams, *args, **kwargs)
+        finally:
+            self._current.seconds += time.perf_counter() - start
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def _timed(self, function, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if self._current is not None:
+                self._current.seconds += time.perf_counter() - start
+
+
+class ProfiledConnection:
+    """
+    Connection wrapper whose cursors report to a QueryProfiler. Everything else goes to the real connection.
+    """
+
+    def __init__(self, connection, profiler):
+        self._connection = connection
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._connection.cursor(*args, **kwargs), self._profiler)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class QueryProfiler:
+
+    def __init__(self):
+        self.statements = []
+
+    def wrap(self, connection):
+        return ProfiledConnection(connection, self)
+
+    def record(self, sql, params):
+        statement = StatementRecord(sql, params)
+        self.statements.append(statement)
+        return statement
+
+    def summary(self):
+        """
+        summary() -> {normalised sql: (calls, total seconds, first params seen)}, slowest first
+        """
+        totals = {}
+        for statement in self.statements:
+            sql = normaliseSql(statement.sql)
+            calls, seconds, params = totals.get(sql, (0, 0.0, statement.params))
+            totals[sql] = (calls + 1, seconds + statement.seconds, params)
+        return dict(sorted(totals.items(), key=lambda item: item[1][1], reverse=True))
+
+    def explain(self, connection, sql, params=None):
+        """
+        explain(connection, sql, params=None) -> EXPLAIN output as a list of dicts, one per table in the plan
+        """
+        cursor = _rawConnection(connection).cursor()
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            names = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        return [dict(zip(names, row)) for row in rows]
+
+    def problems(self, plan):
+        """
+        problems(plan) -> [(table, problem)] for full table scans, filesorts and temporary tables in an EXPLAIN plan
+        """
+        found = []
+        for step in plan:
+            table = step.get("table")
+            extra = step.get("Extra") or ""
+            if step.get("type") == "ALL":
+                found.append((table, "full table scan"))
+            if "Using filesort" in extra:
+                found.append((table, "filesort"))
+            if "Using temporary" in extra:
+                found.append((table, "temporary table"))
+        return found
+
+    def report(self, connection, apply=False, repeat=5):
+        """
+        report(connection, apply=False, repeat=5) -> Text report of every recorded statement: timing, plan problems and proposed indexes
+
+        With apply=True the proposed indexes are created and each statement is timed again.
+        """
+        lines = []
+        proposals = {}
+        findings = []
+
+        for sql, (calls, seconds, params) in self.summary().items():
+            if not sql.upper().startswith(EXPLAINABLE):
+                continue
+            plan = self.explain(connection, sql, params)
+            issues = self.problems(plan)
+            flaggedTables = {table for table, problem in issues}
+            statementProposals = [p for p in proposeIndexes(sql) if p[0] in flaggedTables]
+            statementProposals = [p for p in statementProposals if not _alreadyIndexed(connection, *p)]
+            for proposal in statementProposals:
+                proposals[proposal] = True
+            before = _timeStatement(connection, sql, params, repeat) if sql.upper().startswith("SELECT") else None
+            findings.append((sql, params, calls, seconds, issues, statementProposals, before))
+
+        if apply:
+            applyIndexes(connection, list(proposals))
+
+        for sql, params, calls, seconds, issues, statementProposals, before in findings:
+            lines.append(sql)
+            lines.append("    calls: {}  total: {:.3f} ms".format(calls, 1000 * seconds))
+            for table, problem in issues:
+                lines.append("    {}: {}".format(table, problem))
+            for table, columns in statementProposals:
+                lines.append("    proposed: {}".format(indexStatement(table, columns)))
+            if before is not None:
+                if apply and statementProposals:
+                    after = _timeStatement(connection, sql, params, repeat)
+                    lines.append("    latency: {:.3f} ms -> {:.3f} ms".format(1000 * before, 1000 * after))
+                else:
+                    lines.append("    latency: {:.3f} ms".format(1000 * before))
+            lines.append("")
+
+        return "\n".join(lines)
+
+
+def proposeIndexes(sql):
+    """
+    proposeIndexes(sql) -> [(table, (columns...))] - one covering index per table, equality columns first, then the
+    ORDER BY columns, or the first range column when there is a range the ORDER BY does not start with
+
+    The columns come from the statement text, so only columns that can be tied to a table are used:
+    qualified names (users.fav) or any name when the statement reads a single table.
+    A LIKE pattern with a leading wildcard cannot use an index and is skipped.
+    """
+    aliases = {}
+    for table, alias in _FROM_JOIN.findall(sql):
+        aliases[table.lower()] = table
+        if alias:
+            aliases[alias.lower()] = table
+    tables = list(dict.fromkeys(aliases.values()))
+    if not tables:
+        return []
+
+    def owner(name):
+        name = name.replace("`", "")
+        if "." in name:
+            qualifier, column = name.split(".", 1)
+            return aliases.get(qualifier.lower()), column
+        return (tables[0], name) if len(tables) == 1 else (None, name)
+
+    equality = {table: [] for table in tables}
+    ranges = {table: [] for table in tables}
+    ordering = {table: [] for table in tables}
+    selected = {table: [] for table in tables}
+
+    where = _WHERE.search(sql)
+    if where:
+        for column, operator, value in _PREDICATE.findall(where.group(1)):
+            table, column = owner(column)
+            if table is None or column.upper() in ("AND", "OR", "NOT"):
+                continue
+            operator = operator.upper()
+            if operator == "LIKE" and value.startswith("'%"):
+                continue
+            target = equality if operator in ("=", "IN") else ranges
+            target[table].append(column)
+
+    for leftTable, leftColumn, rightTable, rightColumn in _JOIN_ON.findall(sql):
+        # The table probed by the join needs an index on its side of the condition
+        for qualifier, column in ((leftTable, leftColumn), (rightTable, rightColumn)):
+            table = aliases.get(qualifier.lower())
+            if table is not None:
+                equality[table].append(column)
+
+    order = _ORDER.search(sql)
+    if order:
+        for part in order.group(1).split(","):
+            words = part.split()
+            if words:
+                table, column = owner(words[0])
+                if table is not None:
+                    ordering[table].append(column)
+
+    selectList = _SELECT_LIST.search(sql)
+    coverable = selectList is not None and "*" not in selectList.group(1)
+    if coverable:
+        for part in selectList.group(1).split(","):
+            words = part.split()
+            if words and re.match(r"^[`\w.]+$", words[0]):
+                table, column = owner(words[0])
+                if table is not None:
+                    selected[table].append(column)
+
+    proposals = []
+    for table in tables:
+        # Only the first range column can use the index. Rows matching it come out sorted by that column, so the
+        # index can still serve an ORDER BY that starts with it but no other; then ORDER BY is only for covering
+        sortable = not ranges[table] or ordering[table][:1] == ranges[table][:1]
+        columns = equality[table] + (ordering[table] if sortable and ordering[table] else ranges[table][:1])
+        if not columns:
+            continue
+        if coverable:
+            columns += ranges[table][1:] + ordering[table] + selected[table]
+        columns = tuple(dict.fromkeys(columns))
+        proposals.append((table, columns[:MAX_INDEX_COLUMNS]))
+    return proposals
+
+
+def indexStatement(table, columns):
+    name = "idx_{}_{}".format(table, "_".join(columns))[:64]
+    return "CREATE INDEX `{}` ON `{}` ({})".format(name, table, ", ".join("`{}`".format(c) for c in columns))
+
+
+def applyIndexes(connection, proposals):
+    cursor = _rawConnection(connection).cursor()
+    try:
+        for table, columns in proposals:
+            cursor.execute(indexStatement(table, columns))
+    finally:
+        cursor.close()
+
+
+def _alreadyIndexed(connection, table, columns):
+    # True when an existing index starts with the proposed columns, or the proposal starts with the primary key
+    # (InnoDB stores every column in the primary key index, so it already covers the rest)
+    cursor = _rawConnection(connection).cursor()
+    try:
+        cursor.execute("SHOW INDEX FROM `{}`".format(table))
+        names = [column[0] for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+    indexes = {}
+    for row in rows:
+        indexes.setdefault(row["Key_name"], {})[int(row["Seq_in_index"])] = row["Column_name"].lower()
+    wanted = [c.lower() for c in columns]
+    for name, positions in indexes.items():
+        existing = [positions[i] for i in sorted(positions)]
+        if existing[:len(wanted)] == wanted:
+            return True
+        if name == "PRIMARY" and wanted[:len(existing)] == existing:
+            return True
+    return False
+
+
+def _timeStatement(connection, sql, params, repeat):
+    cursor = _rawConnection(connection).cursor()
+    best = None
+    try:
+        for i in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        cursor.close()
+    return best
+
+
+def _rawConnection(connection):
+    # The profiler's own EXPLAIN and timing queries should not show up in its statement list
+    return connection._connection if isinstance(connection, ProfiledConnection) else connection
+
+
+# The read queries from the tutorial scripts
+TUTORIAL_QUERIES = [
+    ("SELECT * FROM customers WHERE address = %s", ("Yellow Garden 2", )),
+    ("SELECT * FROM customers WHERE address LIKE '%way%'", None),
+    ("SELECT * FROM customers ORDER BY name DESC", None),
+    ("SELECT users.name AS user, products.name AS favorite, products.url AS url FROM users INNER JOIN products ON users.fav = products.id", None)
+]
+
+
+def main():
+    import sys
+    import mysql_pool
+
+    profiler = QueryProfiler()
+    mydb = profiler.wrap(mysql_pool.getConnection())
+    mycursor = mydb.cursor()
+    for sql, params in TUTORIAL_QUERIES:
+        mycursor.execute(sql, params)
+        mycursor.fetchall()
+    mycursor.close()
+
+    print(profiler.report(mydb, apply="--apply" in sys.argv))
+    mydb.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# MySQL Streaming Queries
+
+# mycursor.fetchall() pulls the whole result set into a Python list before the first row can be printed.
+# On a large customers table that is millions of tuples in memory.
+# streamQuery() reads from an unbuffered cursor instead and yields the rows in fetchmany() batches,
+# so memory stays the size of one batch and the first row arrives as soon as the server sends it.
+
+# E.g.
+"""
+import mysql_pool
+from mysql_stream import streamQuery
+
+mydb = mysql_pool.getConnection()
+
+for x in streamQuery(mydb, "SELECT * FROM customers WHERE address = %s", ("Yellow Garden 2", )):
+    print(x)
+
+mydb.close()
+"""
+
+import resource
+import subprocess
+import sys
+import time
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def streamBatches(connection, sql, params=None, batchSize=DEFAULT_BATCH_SIZE):
+    """
+    streamBatches(connection, sql, params=None, batchSize=1000) -> Yields lists of at most batchSize rows
+
+    Parameters:
+    connection: An open connection (plain or from mysql_pool)
+    sql: The SELECT statement, with %s placeholders for params
+    params: Values for the placeholders, defaults to None
+    batchSize: Number of rows requested per fetchmany() call
+    """
+    if batchSize < 1:
+        raise Exception("batchSize must be at least 1")
+
+    cursor = connection.cursor(buffered=False)
+    exhausted = False
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                exhausted = True
+                return
+            yield rows
+    finally:
+        # An unbuffered cursor must read the rest of the result before the connection can run another statement
+        if not exhausted:
+            try:
+                while cursor.fetchmany(batchSize):
+                    pass
+            except Exception:
+                pass
+        cursor.close()
+
+
+def streamQuery(connection, sql, params=None, batchSize=DEFAULT_BATCH_SIZE):
+    """
+    streamQuery(connection, sql, params=None, batchSize=1000) -> Yields the rows of a SELECT one at a time
+    """
+    for rows in streamBatches(connection, sql, params, batchSize):
+        yield from rows
+
+
+# Benchmark
+# Peak RSS only ever goes up inside a process, so each mode is run in its own child process.
+
+def _peakRssKb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak    # macOS reports bytes, Linux kilobytes
+
+
+def _runMode(mode, sql, batchSize):
+    import mysql_pool
+
+    mydb = mysql_pool.getConnection()
+    baseline = _peakRssKb()
+    start = time.perf_counter()
+    firstRow = None
+    count = 0
+
+    if mode == "fetchall":
+        mycursor = mydb.cursor()
+        mycursor.execute(sql)
+        for x in mycursor.fetchall():
+            if firstRow is None:
+                firstRow = time.perf_counter() - start
+            count += 1
+    else:
+        for x in streamQuery(mydb, sql, batchSize=batchSize):
+            if firstRow is None:
+                firstRow = time.perf_counter() - start
+            count += 1
+
+    total = time.perf_counter() - start
+    mydb.close()
+    print(mode, count, _peakRssKb() - baseline, firstRow or 0.0, total)
+
+
+def benchmark(sql="SELECT * FROM customers", batchSize=DEFAULT_BATCH_SIZE):
+    """
+    benchmark(sql="SELECT * FROM customers", batchSize=1000) -> Compares peak RSS and latency of fetchall() against streamQuery()
+    """
+    results = {}
+    for mode in ("fetchall", "stream"):
+        output = subprocess.run([sys.executable, __file__, mode, sql, str(batchSize)], capture_output=True, text=True, check=True).stdout
+        name, rows, rssKb, firstRow, total = output.split()
+        results[name] = (int(rows), int(rssKb), float(firstRow), float(total))
+        print("{:<9} rows: {:>10}  peak RSS growth: {:>9} KB  first row: {:8.2f} ms  total: {:8.2f} s".format(
+            name, rows, rssKb, 1000 * float(firstRow), float(total)))
+    return results
+
+
+def main():
+    if len(sys.argv) == 4:
+        _runMode(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        benchmark(*sys.argv[1:2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Shared Arrays
+
+# Used by the modules that fan work out to worker processes (tree_ensemble.py, .vscode/model_validation.py).
+# SharedArray copies a NumPy array into a multiprocessing shared memory block once; workers attach to the block by name,
+# so a task carries a small descriptor instead of a pickled copy of the data.
+# DEFAULT_SEED is their root seed, as numpy.random.seed(2) in the tutorial scripts.
+
+# E.g.
+"""
+from shared_array import SharedArray
+
+shared = SharedArray.fromArray(x)
+pool.submit(work, shared.descriptor())    # in the worker: x = SharedArray.attach(descriptor).array
+shared.release()
+"""
+
+from multiprocessing import shared_memory
+
+import numpy
+
+DEFAULT_SEED = 2
+
+
+class SharedArray:
+    """
+    A NumPy array stored in a multiprocessing shared memory block. descriptor() is a small picklable handle that
+    attach() in another process turns back into an array over the same memory.
+    """
+
+    def __init__(self, memory, shape, dtype, owner):
+        self.memory = memory
+        self.array = numpy.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        self.owner = owner
+
+    @classmethod
+    def fromArray(cls, array):
+        array = numpy.ascontiguousarray(array)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        shared = cls(memory, array.shape, array.dtype, owner=True)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def empty(cls, shape, dtype):
+        """
+        empty(shape, dtype) -> A new uninitialised shared array, for filling in place without a temporary copy
+        """
+        dtype = numpy.dtype(dtype)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, int(numpy.prod(shape)) * dtype.itemsize))
+        return cls(memory, shape, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        name, shape, dtype = descriptor
+        return cls(shared_memory.SharedMemory(name=name), shape, numpy.dtype(dtype), owner=False)
+
+    def descriptor(self):
+        return (self.memory.name, self.array.shape, self.array.dtype.str)
+
+    def release(self):
+        self.array = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
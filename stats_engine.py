@@ -0,0 +1,316 @@
+# Stats Engine
+
+# w3school_pythonmeanmedianmode.py's basicStats() calls numpy.mean(), numpy.median() and stats.mode() one after another,
+# and the standard deviation and percentile scripts make more passes of their own for std(), var() and percentile().
+# StatsAccumulator gets all of them - count, mean, variance, std, min, max, mode and any percentiles - from one pass
+# over the data, chunk by chunk:
+# - Small-range integer data (speeds, ages) is kept as a count per value (numpy.bincount). Every statistic comes exactly
+#   from the counts, and memory is the size of the value range rather than of the data.
+# - Anything else keeps running mean/variance/min/max (Chan's merge) plus the values, which are sorted once at the end;
+#   the one sort gives the mode (longest run) and every percentile. This path holds a copy of every value, and
+#   result() briefly needs twice that while it joins the chunks into one array. For streams too long to keep, use
+#   .vscode/quantile_sketch.py, whose memory stays bounded at the cost of approximate percentiles.
+# Accumulators merge, so chunks can be summarised by separate workers. IntegerCounter, the counting path on its own, is
+# also used by frequency_engine.py.
+
+# E.g.
+"""
+from stats_engine import describe, StatsAccumulator
+
+summary = describe(speed, percentiles=(50, 90))
+print(summary.mean, summary.std, summary.mode, summary.percentiles[90])
+
+stats = StatsAccumulator(percentiles=(25, 50, 75))
+for chunk in chunks:
+    stats.update(chunk)
+print(stats.result())
+"""
+
+import time
+from collections import namedtuple
+
+import numpy
+
+# Integer data whose values span at most this many distinct values is counted instead of stored
+DEFAULT_COUNTING_RANGE = 1 << 20
+# Values scanned at a time when looking for the mode of stored data
+RUN_BLOCK_SIZE = 1 << 20
+
+Summary = namedtuple("Summary", ["count", "mean", "var", "std", "min", "max", "mode", "modeCount", "percentiles"])
+
+
+class IntegerCounter:
+    """
+    IntegerCounter(countingRange=1048576) -> Count per value of integer data, kept in one numpy.bincount array that
+    grows to cover new values
+
+    Callers check fits() first and move to another representation once the values span countingRange or more.
+    """
+
+    def __init__(self, countingRange=DEFAULT_COUNTING_RANGE):
+        self.countingRange = countingRange
+        self.n = 0
+        # counts[i] is the number of times offset + i was seen
+        self.offset = None
+        self.counts = None
+
+    def fits(self, low, high):
+        """
+        fits(low, high) -> True when values from low to high can be counted without the span reaching countingRange
+        """
+        if self.counts is not None:
+            low, high = min(low, self.offset), max(high, self.offset + len(self.counts) - 1)
+        return high - low < self.countingRange
+
+    def update(self, values, low, high):
+        """
+        update(values, low, high) -> Counts an int64 array whose smallest and largest values are low and high, returns self
+        """
+        self._cover(low, high)
+        self.counts += numpy.bincount(values - self.offset, minlength=len(self.counts))
+        self.n += len(values)
+        return self
+
+    def add(self, values, counts):
+        """
+        add(values, counts) -> Adds counts for distinct values in ascending order (e.g. another counter's items()), returns self
+        """
+        self._cover(int(values[0]), int(values[-1]))
+        self.counts[values - self.offset] += counts
+        self.n += int(counts.sum())
+        return self
+
+    def items(self):
+        """
+        items() -> (distinct values in ascending order, their counts)
+        """
+        if self.counts is None:
+            return numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.int64)
+        seen = numpy.flatnonzero(self.counts)
+        return self.offset + seen, self.counts[seen]
+
+    def _cover(self, low, high):
+        if self.counts is None:
+            self.offset, self.counts = low, numpy.zeros(high - low + 1, dtype=numpy.int64)
+        elif low < self.offset or high >= self.offset + len(self.counts):
+            newOffset = min(low, self.offset)
+            grown = numpy.zeros(max(high, self.offset + len(self.counts) - 1) - newOffset + 1, dtype=numpy.int64)
+            grown[self.offset - newOffset:self.offset - newOffset + len(self.counts)] = self.counts
+            self.offset, self.counts = newOffset, grown
+
+
+class StatsAccumulator:
+    """
+    StatsAccumulator(percentiles=(50,), ddof=0, countingRange=1048576) -> One-pass summary statistics over chunks
+
+    Parameters:
+    percentiles: Percentiles to report, 0-100, interpolated linearly as numpy.percentile does (50 is the median)
+    ddof: Delta degrees of freedom of var and std; 0 gives numpy.var/numpy.std, 1 the sample values
+    countingRange: Widest span of integer values kept as counts; wider or non-integer data is stored and sorted once
+
+    Stored data keeps a copy of every value, and needs up to twice that while result() sorts it.
+    """
+
+    def __init__(self, percentiles=(50,), ddof=0, countingRange=DEFAULT_COUNTING_RANGE):
+        self.percentiles = tuple(percentiles)
+        self.ddof = ddof
+        self.countingRange = countingRange
+        self.n = 0
+        # Counting path
+        self.counter = IntegerCounter(countingRange)
+        # Stored path
+        self.chunks = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    @property
+    def counting(self):
+        return self.chunks is None and self.counter.n > 0
+
+    def update(self, chunk):
+        """
+        update(chunk) -> Adds the values of chunk (any shape, flattened) and returns self
+        """
+        values = numpy.asarray(chunk).ravel()
+        if len(values) == 0:
+            return self
+        if values.dtype.kind == "b":
+            values = values.astype(numpy.int64)
+        if values.dtype.kind == "f" and numpy.isnan(values).any():
+            raise Exception("Data contains NaN")
+
+        low, high = values.min(), values.max()
+        if values.dtype.kind in "iu" and self.chunks is None and self.counter.fits(int(low), int(high)):
+            self.counter.update(values.astype(numpy.int64, copy=False), int(low), int(high))
+            self.n += len(values)
+        else:
+            self._store(values, low, high)
+        return self
+
+    def merge(self, other):
+        """
+        merge(other) -> Adds the data summarised by another StatsAccumulator and returns self
+        """
+        if other.n == 0:
+            return self
+        if other.counting:
+            values, counts = other.counter.items()
+            if self.chunks is None and self.counter.fits(int(values[0]), int(values[-1])):
+                self.counter.add(values, counts)
+                self.n += int(counts.sum())
+                return self
+            # The data no longer fits the counting path; carry on with the values themselves
+            return self._store(numpy.repeat(values, counts), values[0], values[-1])
+        for chunk in other.chunks:
+            self.update(chunk)
+        return self
+
+    def result(self):
+        """
+        result() -> Summary(count, mean, var, std, min, max, mode, modeCount, percentiles) with percentiles as {percentile: value}
+        """
+        if self.n == 0:
+            raise Exception("No data")
+        if self.counting:
+            values, counts = self.counter.items()
+            total = int((values * counts).sum())
+            mean = total / self.n
+            m2 = float((counts * (values - mean) ** 2).sum())
+            modeIndex = int(counts.argmax())    # the first maximum is the smallest value, as scipy.stats.mode picks
+            mode, modeCount = values[modeIndex], int(counts[modeIndex])
+            cumulative = numpy.cumsum(counts)
+            at = lambda rank: values[numpy.searchsorted(cumulative, rank, side="right")]
+            low, high = values[0], values[-1]
+        else:
+            # Join the chunks and sort in place, keeping the sorted array as the only chunk: the separate chunks are
+            # freed, and a later result() sorts already sorted data plus whatever was added since
+            data = numpy.concatenate(self.chunks) if len(self.chunks) > 1 else self.chunks[0]
+            data.sort()
+            self.chunks = [data]
+            mean, m2 = self.mean, self.m2
+            mode, modeCount = _longestRun(data)
+            at = lambda rank: data[rank]
+            low, high = self.min, self.max
+
+        percentiles = {}
+        for q in self.percentiles:
+            position = (self.n - 1) * q / 100.0
+            below = int(numpy.floor(position))
+            lower = at(below)
+            upper = at(min(below + 1, self.n - 1))
+            percentiles[q] = float(lower + (position - below) * (upper - lower))
+
+        var = m2 / (self.n - self.ddof) if self.n > self.ddof else float("nan")
+        return Summary(self.n, float(mean), var, float(numpy.sqrt(var)), _scalar(low), _scalar(high), _scalar(mode), modeCount, percentiles)
+
+    def _store(self, values, low, high):
+        if self.counting:
+            # Switch over: expand the counts into values, then continue on the stored path
+            stored = numpy.repeat(*self.counter.items())
+            self.counter = IntegerCounter(self.countingRange)
+            self.n = 0
+            self.chunks = []
+            self._store(stored, stored.min(), stored.max())
+        if self.chunks is None:
+            self.chunks = []
+        chunkMean = float(values.mean(dtype=numpy.float64))
+        chunkM2 = float(((values - chunkMean) ** 2).sum())
+        n = self.n + len(values)
+        delta = chunkMean - self.mean
+        self.m2 += chunkM2 + delta * delta * (self.n * len(values) / n)
+        self.mean += delta * (len(values) / n)
+        self.n = n
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        # A copy, because callers often refill the same buffer for the next chunk
+        self.chunks.append(numpy.array(values, copy=True))
+        return self
+
+
+def _longestRun(data, blockSize=RUN_BLOCK_SIZE):
+    # Longest run of equal values in sorted data (the first on ties), which is the mode. Runs are found a block at a
+    # time, so the temporary arrays are the size of a block and not 8 bytes for every distinct value
+    modeValue, modeCount = data[0], 0
+    runValue, runLength = data[0], 0
+    for start in range(0, len(data), blockSize):
+        block = data[start:start + blockSize]
+        starts = numpy.flatnonzero(numpy.concatenate(([block[0] != runValue], block[1:] != block[:-1])))
+        if len(starts) == 0:
+            runLength += len(block)
+            continue
+        # The block up to its first start continues the run carried over from the previous block, which ends there
+        runLength += int(starts[0])
+        if runLength > modeCount:
+            modeValue, modeCount = runValue, runLength
+        lengths = numpy.diff(starts)
+        if len(lengths):
+            longest = int(lengths.argmax())
+            if lengths[longest] > modeCount:
+                modeValue, modeCount = block[starts[longest]], int(lengths[longest])
+        runValue, runLength = block[starts[-1]], len(block) - int(starts[-1])
+    if runLength > modeCount:
+        modeValue, modeCount = runValue, runLength
+    return modeValue, modeCount
+
+
+def describe(data, percentiles=(50,), ddof=0, chunkSize=None):
+    """
+    describe(data, percentiles=(50,), ddof=0, chunkSize=None) -> Summary of an array, or of an iterable of chunks
+
+    Parameters:
+    data: A list or NumPy array, or an iterable of chunks (e.g. pieces of a memmap or a generator)
+    chunkSize: When data is one array, summarise it in slices of this many values
+    """
+    stats = StatsAccumulator(percentiles, ddof)
+    if isinstance(data, (list, tuple, numpy.ndarray)):
+        data = numpy.asarray(data).ravel()
+        step = chunkSize or max(1, len(data))
+        for start in range(0, len(data), step):
+            stats.update(data[start:start + step])
+    else:
+        for chunk in data:
+            stats.update(chunk)
+    return stats.result()
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, numpy.generic) else value
+
+
+# Benchmark - describe() against the separate numpy/scipy calls the tutorial scripts make
+
+def benchmark(size=10 ** 7):
+    """
+    benchmark(size=10**7) -> Prints the time of mean/median/mode/std/var/percentile calls against one describe(), for
+    small-integer data (ages) and for floats
+    """
+    from scipy import stats
+
+    rng = numpy.random.default_rng(2)
+    dataSets = {"integers 0-99": rng.integers(0, 100, size), "floats": rng.normal(50, 10, size)}
+    timings = {}
+    for name, data in dataSets.items():
+        start = time.perf_counter()
+        numpy.mean(data)
+        numpy.median(data)
+        stats.mode(data, keepdims=True)
+        numpy.std(data)
+        numpy.var(data)
+        numpy.percentile(data, 90)
+        separateSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        describe(data, percentiles=(50, 90))
+        describeSeconds = time.perf_counter() - start
+
+        timings[name] = (separateSeconds, describeSeconds)
+        print("{} ({} values)".format(name, size))
+        print("  separate calls: {:8.3f} s".format(separateSeconds))
+        print("  describe():     {:8.3f} s  ({:.1f}x)".format(describeSeconds, separateSeconds / describeSeconds))
+    return timings
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,163 @@
+# Bagged Decision Trees
+
+# w3school_pythondecisiontree.py trains one DecisionTreeClassifier, which fits its training rows exactly and overfits.
+# BaggedTrees trains many trees, each on a bootstrap sample of the rows, and lets them vote.
+# The trees are trained in worker processes. The training matrix is copied into shared memory once and every
+# worker attaches to it when it starts, so no task carries a pickled copy of the data; a task is just a tree's seed.
+# Each fitted tree comes back as a CompiledTree (flat arrays, see compiled_tree.py) and prediction counts the votes
+# of all trees with array operations. Tree i always gets the i-th child of SeedSequence(seed), so the forest is
+# the same whatever the number of processes.
+
+# E.g.
+"""
+from tree_ensemble import BaggedTrees
+
+forest = BaggedTrees(trees=200, processes=4).fit(X, y)
+print(forest.predict([[40, 10, 6, 1]]))
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+from sklearn.tree import DecisionTreeClassifier
+
+from compiled_tree import CompiledTree
+from shared_array import DEFAULT_SEED, SharedArray
+
+# Set in each worker process by _attachTrainingData()
+_training = None
+
+
+class BaggedTrees:
+    """
+    BaggedTrees(trees=100, processes=None, voting="hard", seed=2, **treeOptions) -> Bootstrap-aggregated decision trees
+
+    Parameters:
+    trees: Number of trees
+    processes: Number of worker processes to train in, None to train in this process
+    voting: "hard" - each tree votes for one class; "soft" - the trees' class probabilities are averaged
+    seed: Root seed of the bootstrap samples and of the trees' own randomness
+    treeOptions: Passed to each DecisionTreeClassifier, e.g. max_depth=5 or max_features="sqrt"
+    """
+
+    def __init__(self, trees=100, processes=None, voting="hard", seed=DEFAULT_SEED, **treeOptions):
+        if voting not in ("hard", "soft"):
+            raise Exception("voting must be 'hard' or 'soft', got {!r}".format(voting))
+        self.treeCount = trees
+        self.processes = processes
+        self.voting = voting
+        self.seed = seed
+        self.treeOptions = treeOptions
+        self.trees = []
+        self.classes = None
+        self.fitSeconds = None
+
+    def fit(self, X, y):
+        global _training
+        X = numpy.ascontiguousarray(X, dtype=numpy.float32)
+        self.classes, labels = numpy.unique(numpy.asarray(y), return_inverse=True)
+        labels = labels.astype(numpy.intp)
+        seeds = numpy.random.SeedSequence(self.seed).spawn(self.treeCount)
+        start = time.perf_counter()
+
+        if self.processes is None:
+            _training = (X, labels, len(self.classes), self.treeOptions)
+            try:
+                self.trees = [_fitTree(treeSeed) for treeSeed in seeds]
+            finally:
+                _training = None
+        else:
+            shared = [SharedArray.fromArray(X), SharedArray.fromArray(labels)]
+            try:
+                initargs = (shared[0].descriptor(), shared[1].descriptor(), len(self.classes), self.treeOptions)
+                with ProcessPoolExecutor(max_workers=self.processes, initializer=_attachTrainingData, initargs=initargs) as pool:
+                    self.trees = list(pool.map(_fitTree, seeds, chunksize=max(1, self.treeCount // (4 * self.processes))))
+            finally:
+                for array in shared:
+                    array.release()
+
+        self.fitSeconds = time.perf_counter() - start
+        return self
+
+    def votes(self, X):
+        """
+        votes(X) -> (rows, classes) array: the number of trees voting for each class ("hard"), or the summed class probabilities ("soft")
+        """
+        if not self.trees:
+            raise Exception("BaggedTrees has not been fitted yet")
+        X = numpy.ascontiguousarray(X, dtype=numpy.float32)
+        votes = numpy.zeros((len(X), len(self.classes)))
+        rows = numpy.arange(len(X))
+        for tree in self.trees:
+            leaves = tree.apply(X)
+            if self.voting == "hard":
+                votes[rows, tree.leafClass[leaves]] += 1.0
+            else:
+                value = tree.value[leaves]
+                votes += value / value.sum(axis=1, keepdims=True)
+        return votes
+
+    def predict(self, X):
+        # Ties go to the first class in sorted order
+        return self.classes[self.votes(X).argmax(axis=1)]
+
+    def predictProba(self, X):
+        votes = self.votes(X)
+        return votes / votes.sum(axis=1, keepdims=True)
+
+
+def _attachTrainingData(xDescriptor, yDescriptor, classCount, treeOptions):
+    # Runs once per worker; the shared blocks stay mapped until the worker exits
+    global _training
+    x = SharedArray.attach(xDescriptor)
+    y = SharedArray.attach(yDescriptor)
+    _training = (x.array, y.array, classCount, treeOptions, x, y)
+
+
+def _fitTree(treeSeed):
+    X, labels, classCount, treeOptions = _training[:4]
+    rng = numpy.random.default_rng(treeSeed)
+    sample = rng.integers(0, len(X), len(X))
+    tree = DecisionTreeClassifier(random_state=int(rng.integers(2 ** 31 - 1)), **treeOptions)
+    tree.fit(X[sample], labels[sample])
+
+    compiled = CompiledTree.fromSklearn(tree)
+    # A bootstrap sample can miss a class; spread the tree's value columns out over all the classes
+    value = numpy.zeros((len(compiled.value), classCount))
+    value[:, compiled.classes] = compiled.value
+    return CompiledTree(compiled.feature, compiled.threshold, compiled.left, compiled.right, value, numpy.arange(classCount))
+
+
+# Benchmark - training time of the same forest with 1 to all cores, all through the process pool so that the
+# speedups are not skewed by the pool's own start-up and transfer costs
+
+def benchmark(rows=100000, features=8, trees=64, maxProcesses=None):
+    """
+    benchmark(rows=100000, features=8, trees=64, maxProcesses=None) -> Prints training time and speedup per process count
+
+    The forests trained with different process counts are checked to predict identically.
+    """
+    maxProcesses = maxProcesses or os.cpu_count()
+    rng = numpy.random.default_rng(DEFAULT_SEED)
+    X = rng.normal(size=(rows, features))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(0, 0.5, rows) > 0).astype(numpy.int64)
+    test = rng.normal(size=(10000, features))
+
+    print("{} trees on {} rows x {} features".format(trees, rows, features))
+    baseline = None
+    reference = None
+    for processes in range(1, maxProcesses + 1):
+        forest = BaggedTrees(trees=trees, processes=processes, max_features="sqrt").fit(X, y)
+        predicted = forest.predict(test)
+        if reference is None:
+            baseline, reference = forest.fitSeconds, predicted
+        elif not numpy.array_equal(predicted, reference):
+            raise Exception("Forest trained with {} processes differs".format(processes))
+        print("{:>3} processes: {:8.2f} s  ({:.2f}x)".format(processes, forest.fitSeconds, baseline / forest.fitSeconds))
+    return baseline
+
+
+if __name__ == "__main__":
+    benchmark()
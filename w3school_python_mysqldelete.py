@@ -5,14 +5,9 @@
 
 # Example - Delete any record where the address is "Mountain 21":
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-) 
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
@@ -27,4 +22,19 @@ mycursor = mydb.cursor()
 
 # Prevent SQL Injection 
 # It is considered a good practice to escape the values of any query, also in delete statements. 
-# This is to prevent SQL injections, which is a common web hacking 
\ No newline at end of file
+# This is to prevent SQL injections, which is a common web hacking
+
+
+# Delete in Chunks 
+# A single DELETE on a big table holds its locks until every row is gone. ChunkedMutation deletes one id range per transaction: 
+"""
+from mysql_batchmutate import ChunkedMutation
+
+mutation = ChunkedMutation(mydb, "customers", checkpointPath="delete_mountain.json")
+rowcount = mutation.delete("address = %s", ("Mountain 21", ))
+
+print(rowcount, "record(s) deleted")
+print(mutation.stats())
+"""
+
+mydb.close() # hand the connection back to the pool
@@ -5,17 +5,14 @@
 
 # Example - Delete the "customers" table: 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-) 
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
 sql = "DROP TABLE IF EXISTS customers" 
 
-mycursor.execute(sql) 
\ No newline at end of file
+mycursor.execute(sql)
+
+mydb.close() # hand the connection back to the pool
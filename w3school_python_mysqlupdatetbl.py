@@ -5,14 +5,10 @@
 
 # Example - Update the address column from "Valley 345" to "Canyon 123": 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
+from mysql_batchmutate import ChunkedMutation # chunked UPDATE/DELETE with a commit per key range 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-) 
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor()
 
@@ -35,8 +31,19 @@ print(mycursor.rowcount, "record(s) affected")
 sql = "UPDATE customers SET address = %s WHERE address = %s" 
 val = ("Valley 345", "Canyon 123")
 
-mycursor.execute(sql, val) 
+# Running the update through the query cache commits it and drops any cached results for the customers table 
+# import mysql_cache # cache results of repeated read queries 
+# rowcount = mysql_cache.getCache().execute(mydb, sql, val) 
 
-mydb.commit() 
+# print(rowcount, "record(s) affected")
+
+# Update in Chunks 
+# On a big table a single UPDATE holds its locks for a long time. ChunkedMutation walks the id primary key in ranges 
+# and commits each range on its own (it also drops cached results for the table): 
+
+mutation = ChunkedMutation(mydb, "customers") 
+rowcount = mutation.update("address = %s", ("Valley 345", ), where="address = %s", whereParams=("Canyon 123", )) 
+
+print(rowcount, "record(s) affected")
 
-print(mycursor.rowcount, "record(s) affected") 
\ No newline at end of file
+mydb.close() # hand the connection back to the pool
@@ -23,6 +23,11 @@ df["Nationality"] = df["Nationality"].map(d)    # map() returns a list of the re
 d = {"YES":1, "NO":0}
 df["Go"] = df["Go"].map(d)  # map() returns a list of the results after applying the given function to each item of a given iterable (list, tuple etc.)
 
+# Alternatively, keep the code tables in one place, fail on unseen values instead of getting NaN, and cache the encoded file (see category_encoding.py)
+# from category_encoding import DatasetEncoder, loadEncoded
+# encoder = DatasetEncoder({"Nationality": {"UK":0, "USA":1, "N":2}, "Go": {"YES":1, "NO":0}})
+# df = loadEncoded("data2.csv", encoder)
+
 print(df) # test to see if data set is read correctly
 
 # Then separate the feature columns from the target column 
@@ -62,3 +67,13 @@ tree.plot_tree(dtree, feature_names=features)    # plot_tree() plots the decisio
 # Example: Should I go see a show starring 40 years old American comedian with 10 years of experience and a rank of 7? 
 
 print(dtree.predict([[40, 10, 6, 1]]))  # predict() predicts the class labels for the provided data.
+
+# To score many observations at once, compile the fitted tree into flat arrays (see compiled_tree.py)
+# from compiled_tree import CompiledTree
+# compiled = CompiledTree.fromSklearn(dtree)
+# print(compiled.predict([[40, 10, 6, 1], [36, 10, 9, 0]]))
+
+# A single tree overfits; an ensemble of trees trained on bootstrap samples in parallel votes instead (see tree_ensemble.py)
+# from tree_ensemble import BaggedTrees
+# forest = BaggedTrees(trees=200, processes=4).fit(X, y)
+# print(forest.predict([[40, 10, 6, 1]]))
@@ -4,18 +4,23 @@
 
 # E.g. Use the Numpy mean() method to find the average speed: 
 
-import numpy
-from scipy import stats 
 
 speed = [99,86,87,88,111,86,103,87,94,78,77,85,86]
 
 # avgSpeed = numpy.mean(speed)
 
+# def basicStats(dataSet): 
+#     meanValue = numpy.mean(dataSet)
+#     medianValue = numpy.median(dataSet) 
+#     modeValue = stats.mode(dataSet, keepdims=True)
+#     return meanValue, medianValue, modeValue[0][0]
+
+# The three calls above each make their own pass over the data; describe() gets all three (and std, var, min, max) in one (see stats_engine.py)
+from stats_engine import describe
+
 def basicStats(dataSet): 
-    meanValue = numpy.mean(dataSet)
-    medianValue = numpy.median(dataSet) 
-    modeValue = stats.mode(dataSet, keepdims=True)
-    return meanValue, medianValue, modeValue[0][0]
+    summary = describe(dataSet)
+    return summary.mean, summary.percentiles[50], summary.mode
 
 
 def printStats(stats): 
@@ -26,4 +31,10 @@ def printStats(stats):
 
 printStats(basicStats(speed))
 
+# For the most common values of a large or streaming data set, count them chunk by chunk (see frequency_engine.py)
+# from frequency_engine import mode, topK
+# print(mode(speed))    # (86, 3)
+# print(topK(speed, 3))
+# print(topK(chunks, 10, exact=False))    # bounded memory: (value, estimated count, guaranteed minimum count)
+
 # The Mean, Median, and Mode are techniques that are often used in Machine Learning, so it is important to understand the concept behind them. 
@@ -3,14 +3,9 @@
 # Make sure you define the name of the database when you create the connection. 
 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user="root",
-    password="mahanta1",
-    database="mydatabase"
-)
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor()
 
@@ -27,3 +22,4 @@ mycursor.execute("SHOW TABLES")
 for x in mycursor:
     print(x)
 
+mydb.close() # hand the connection back to the pool
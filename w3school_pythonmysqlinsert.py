@@ -5,14 +5,10 @@
 # To fill a table in MySQL, use the "INSERT INTO" statement.
 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
+from mysql_bulkload import BulkLoader # chunked multi-row loader for bulk imports 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase" 
-) 
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor()
 
@@ -48,11 +44,17 @@ val = [
     ('Viola', 'Sideway 1633')
 ]
 
-mycursor.executemany(sql, val)
+# mycursor.executemany(sql, val)
 
-mydb.commit()
+# mydb.commit()
 
-print(mycursor.rowcount, "was inserted.")
+# print(mycursor.rowcount, "was inserted.")
+
+# For bulk imports the BulkLoader sends packet-sized multi-row INSERTs and commits each batch 
+loader = BulkLoader(mydb, "customers", ["name", "address"])
+loader.load(val)
+
+print(loader.rows, "was inserted.")
 
 
 # Get Inserted ID
@@ -66,5 +68,6 @@ mycursor.execute(sql, val)
 mydb.commit() 
 
 print("1 record inserted, ID:", mycursor.lastrowid)
-""" 
+"""
 
+mydb.close() # hand the connection back to the pool
@@ -3,14 +3,10 @@
 # Join Two or More Tables 
 # You can combine rows from two or more tables, based on a related column between them, by using a JOIN statement. 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
+import mysql_cache # cache results of repeated read queries 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-)
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
@@ -51,9 +47,22 @@ sql = "SELECT \
     FROM users \
     INNER JOIN products ON users.fav = products.id"
 
-mycursor.execute(sql) 
-
-myresult = mycursor.fetchall() 
+# The same join is run again and again, so the result is served from the query cache after the first call 
+myresult = mysql_cache.getCache().query(mydb, sql) 
 
 for x in myresult:
-    print(x)
\ No newline at end of file
+    print(x)
+
+
+# Joining on the Client 
+# products is small and rarely changes, so it can be kept in memory and joined to users as they stream in: 
+"""
+from mysql_hashjoin import DimensionTable, hashJoin
+
+products = DimensionTable(mydb, "products", columns=["name", "url"])
+
+for user, fav, favorite, url in hashJoin(mydb, "SELECT name, fav FROM users", products, keyIndex=1):
+    print((user, favorite, url))
+"""
+
+mydb.close() # hand the connection back to the pool
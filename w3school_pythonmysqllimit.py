@@ -5,14 +5,9 @@
 
 # Example - Return the 5 first records of the "customers" table: 
 
-import mysql.connector # import MySQL Connector
+import mysql_pool # import the shared MySQL connection pool 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-) 
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
@@ -36,4 +31,22 @@ mycursor.execute("SELECT * FROM customers LIMIT 5 OFFSET 2")
 myresult = mycursor.fetchall()
 
 for x in myresult:
-    print(x) 
\ No newline at end of file
+    print(x)
+
+
+# Keyset Pagination 
+# OFFSET makes the server read and skip every row before the page, so deep pages get slower and slower.
+# Paging on the id primary key (or any indexed sort key) keeps every page as cheap as the first: 
+
+# Example - Return the customers five at a time, ordered by name: 
+"""
+from mysql_paginate import KeysetPaginator # constant cost paging on an indexed key 
+
+paginator = KeysetPaginator(mydb, "customers", sortKey="name", pageSize=5)
+
+for page in paginator.pages():
+    for x in page:
+        print(x)
+"""
+
+mydb.close() # hand the connection back to the pool
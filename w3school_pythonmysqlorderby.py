@@ -6,14 +6,10 @@
 
 # Example - Sort the result alphabetically by name: result: 
 
-import mysql.connector # import MySQL Connector
+import mysql_pool # import the shared MySQL connection pool 
+from mysql_stream import streamQuery # stream large result sets in batches 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-)
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
@@ -36,10 +32,7 @@ for x in myresult:
 
 sql = "SELECT * FROM customers ORDER BY name DESC" 
 
-mycursor.execute(sql)
-
-myresult = mycursor.fetchall()
-
-for x in myresult:
-    print(x) 
+for x in streamQuery(mydb, sql):
+    print(x)
 
+mydb.close() # hand the connection back to the pool
@@ -5,14 +5,10 @@
 
 # Example - Select all records from the "customers" table, and display the result: 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
+from mysql_stream import streamQuery # stream large result sets in batches 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-)
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor()
 
@@ -28,9 +24,8 @@ mycursor = mydb.cursor()
 # To select only some of the columns in a table, use the "SELECT" statement followed by the column name(s): 
 
 # Example - Select only the name and address columns: 
-mycursor.execute("SELECT name, address FROM customers") 
+# Rows are streamed in batches instead of fetchall(), so a large table never has to fit in memory
+for x in streamQuery(mydb, "SELECT name, address FROM customers"):
+    print(x)
 
-myresult = mycursor.fetchall() 
-
-for x in myresult:
-    print(x)
\ No newline at end of file
+mydb.close() # hand the connection back to the pool
@@ -5,14 +5,10 @@
 
 # Example - Select records where the address is "Park Lane 38": result: 
 
-import mysql.connector # import MySQL Connector 
+import mysql_pool # import the shared MySQL connection pool 
+from mysql_stream import streamQuery # stream large result sets in batches 
 
-mydb = mysql.connector.connect(
-    host = "localhost",
-    user = "root",
-    password = "mahanta1",
-    database = "mydatabase"
-)
+mydb = mysql_pool.getConnection() # check a connection out of the pool instead of connecting from scratch 
 
 mycursor = mydb.cursor() 
 
@@ -56,9 +52,21 @@ for x in myresult:
 sql = "SELECT * FROM customers WHERE address = %s"
 adr = ("Yellow Garden 2", )
 
-mycursor.execute(sql, adr) 
+# When the same lookup is repeated, the query cache answers it from memory instead of the server: 
+"""
+import mysql_cache
 
-myresult = mycursor.fetchall()
+myresult = mysql_cache.getCache().query(mydb, sql, adr)
+"""
 
-for x in myresult:
-    print(x)
\ No newline at end of file
+# A lookup that is repeated with different values can use a prepared statement, which the server parses only once: 
+"""
+from mysql_prepared import getStatementCache
+
+myresult = getStatementCache(mydb).query(sql, adr)
+"""
+
+for x in streamQuery(mydb, sql, adr):
+    print(x)
+
+mydb.close() # hand the connection back to the pool